@@ -1,19 +1,27 @@
 import os
 from flask import Flask, send_from_directory
 from flask_cors import CORS
-from .extensions import db, jwt, migrate, limiter
+from .extensions import db, jwt, migrate, limiter, browser_pool, scan_workers, http_fetcher, scan_cache, singleflight, site_monitor, rollups, pdf_cache, user_cache
 from .routes.auth import auth_bp
 from .routes.analysis import analysis_bp
 from .routes.policy import policy_bp
 from .routes.sitemap import sitemap_bp
 from .routes.blog import blog_bp
 from .routes.enhancer import enhancer_bp
+from .routes.admin import admin_bp
+from .cli import register_commands
+from utils.rules import rules
+from utils.score_stats import track_score_stats
+from utils.identity import track_queries
 
-def create_app():
+def create_app(config=None):
     from .config import Config
 
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config:
+        # Fx test-database og -mapper; overskriver Config før extensions initialiseres
+        app.config.update(config)
 
     CORS(
         app,
@@ -21,13 +29,23 @@ def create_app():
         origins=["http://localhost:3000"],
         methods=["GET", "POST", "OPTIONS", "PUT", "DELETE"],
         allow_headers=["Content-Type", "Authorization"],
-        expose_headers=["Content-Type", "Authorization"]
+        expose_headers=["Content-Type", "Authorization", "X-Next-Cursor", "ETag", "X-DB-Queries"]
     )
 
     db.init_app(app)
+    track_score_stats(db.session)
     jwt.init_app(app)
     migrate.init_app(app, db)
     limiter.init_app(app)
+    browser_pool.init_app(app)
+    scan_workers.init_app(app)
+    http_fetcher.init_app(app)
+    scan_cache.init_app(app)
+    singleflight.init_app(app)
+    site_monitor.init_app(app)
+    rollups.init_app(app)
+    pdf_cache.init_app(app)
+    user_cache.init_app(app)
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(analysis_bp, url_prefix="/api")
@@ -35,6 +53,13 @@ def create_app():
     app.register_blueprint(sitemap_bp)
     app.register_blueprint(blog_bp, url_prefix="/api/blog")
     app.register_blueprint(enhancer_bp, url_prefix="/api/enhancer")
+    app.register_blueprint(admin_bp, url_prefix="/api/admin")
+
+    register_commands(app)
+    track_queries(app)
+
+    # Alle keyword-regler samles i én matcher ved opstart
+    rules.compile()
 
     @app.route("/", defaults={"path": ""})
     @app.route("/<path:path>")
@@ -0,0 +1,108 @@
+import time
+import click
+
+
+def register_commands(app):
+    @app.cli.command("scan-worker")
+    @click.option("--workers", type=int, default=None, help="Antal samtidige scanninger")
+    def scan_worker(workers):
+        """Kør scan-jobs fra køen indtil processen stoppes."""
+        from app.extensions import scan_workers
+
+        if workers:
+            scan_workers.workers = workers
+        scan_workers.start()
+        click.echo(f"Scan-worker kører med {scan_workers.workers} tråde – Ctrl+C for at stoppe")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            scan_workers.stop(timeout=30)
+
+    @app.cli.command("monitor")
+    @click.option("--once", is_flag=True, help="Læg de sites der skal scannes nu i kø og afslut")
+    @click.option("--workers/--no-workers", default=True, help="Kør også scan-workers i denne proces")
+    def monitor(once, workers):
+        """Planlagt genscanning af brugernes websites."""
+        from app.extensions import site_monitor, scan_workers
+
+        if once:
+            count = site_monitor.run_due()
+            click.echo(f"{count} sites lagt i kø")
+            return
+
+        site_monitor.start()
+        if workers:
+            scan_workers.start()
+        click.echo("Overvågning kører – Ctrl+C for at stoppe")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            site_monitor.stop(timeout=5)
+            scan_workers.stop(timeout=30)
+
+    @app.cli.command("rescore")
+    @click.option("--workers", type=int, default=None, help="Antal processer (default RESCORE_WORKERS)")
+    @click.option("--since", type=click.DateTime(), default=None, help="Kun analyser oprettet efter denne dato")
+    @click.option("--dry-run", is_flag=True, help="Beregn uden at gemme")
+    def rescore(workers, since, dry_run):
+        """Genberegn score, fund og leverandører for gemte analyser ud fra deres snapshots."""
+        from utils.snapshots import rescore_all
+
+        totals = rescore_all(
+            workers=workers or app.config.get("RESCORE_WORKERS"),
+            batch_size=app.config.get("RESCORE_BATCH_SIZE", 500),
+            since=since,
+            dry_run=dry_run,
+            progress=lambda t: click.echo(f"{t['analyses']} analyser genberegnet, {t['changed']} med ny score")
+        )
+        click.echo(f"Færdig: {totals['analyses']} analyser, {totals['changed']} med ny score"
+                   + (" (dry-run, intet gemt)" if dry_run else ""))
+
+        if totals["changed"] and not dry_run:
+            from utils.score_stats import rebuild_score_stats
+            click.echo(f"Score-statistik genberegnet for {rebuild_score_stats()} brugere")
+        if totals["analyses"] and not dry_run:
+            # Fund og leverandører kan ændre sig uden at scoren gør
+            click.echo(f"Rollups genberegnet ud fra {app.extensions['rollups'].rebuild()} analyser")
+
+    @app.cli.command("score-stats")
+    def score_stats():
+        """Genberegn brugernes score-statistik fra alle analyser (backfill)."""
+        from utils.score_stats import rebuild_score_stats
+
+        click.echo(f"Score-statistik genberegnet for {rebuild_score_stats()} brugere")
+
+    @app.cli.command("rollups")
+    @click.option("--rebuild", is_flag=True, help="Tøm rollups og tæl alle analyser forfra")
+    def rollups(rebuild):
+        """Opdater de daglige rollups til admin-dashboardet."""
+        job = app.extensions["rollups"]
+        count = job.rebuild() if rebuild else job.run()
+        click.echo(f"{count} analyser talt med i rollups")
+
+    @app.cli.command("blob-report")
+    def blob_report():
+        """Vis hvor meget plads deduplikerede politik-blobs sparer."""
+        from utils.blobs import storage_report
+
+        report = storage_report()
+        click.echo(f"{report['references']} referencer -> {report['blobs']} unikke blobs")
+        click.echo(f"Ukomprimeret pr. række: {report['logical_bytes']} bytes, "
+                   f"unikt indhold: {report['unique_bytes']} bytes, gemt: {report['stored_bytes']} bytes")
+        click.echo(f"Sparet: {report['saved_bytes']} bytes"
+                   + (f" ({report['ratio']}x)" if report["ratio"] else ""))
+
+    @app.cli.command("trackers")
+    def trackers():
+        """Vis størrelsen på tracker-indekset (trackers.json + TRACKER_LISTS)."""
+        from collections import Counter
+        from utils.trackers import extra_lists, get_tracker_index
+
+        index = get_tracker_index()
+        click.echo("Lister: trackers.json" + "".join(f", {path}" for path in extra_lists()))
+        click.echo(f"{len(index.vendors)} leverandører, {len(index.domains)} domæner")
+        per_category = Counter(index.vendors[vendor_id][1] for vendor_id in index.domains.values())
+        for category, count in per_category.most_common():
+            click.echo(f"  {category}: {count} domæner")
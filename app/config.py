@@ -19,3 +19,98 @@ class Config:
     JWT_COOKIE_SECURE = False                  # True i production m. HTTPS
     JWT_COOKIE_SAMESITE = "Strict"
     JWT_COOKIE_HTTPONLY = True
+
+    # Browser-pulje til analyze_website
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", 2))
+    BROWSER_POOL_MAX_USES = int(os.getenv("BROWSER_POOL_MAX_USES", 50))       # genstart Chrome efter N scanninger
+    BROWSER_POOL_CHECKOUT_TIMEOUT = int(os.getenv("BROWSER_POOL_CHECKOUT_TIMEOUT", 60))
+    BROWSER_POOL_PREWARM = os.getenv("BROWSER_POOL_PREWARM", "false").lower() == "true"  # true i production
+    BROWSER_PAGE_LOAD_TIMEOUT = int(os.getenv("BROWSER_PAGE_LOAD_TIMEOUT", 30))
+
+    # Scan-jobs (kø i databasen, lokale workers)
+    SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", 2))
+    SCAN_WORKERS_AUTOSTART = os.getenv("SCAN_WORKERS_AUTOSTART", "false").lower() == "true"  # ellers: flask scan-worker
+    SCAN_JOB_POLL_INTERVAL = 2
+    SCAN_JOB_STALE_AFTER = 600                 # sek. før et "running" job regnes som forladt
+
+    # Ventetid efter driver.get(): readyState + stille netværk/DOM, eller et cookie-banner
+    SCAN_READY_MAX_WAIT = float(os.getenv("SCAN_READY_MAX_WAIT", 5))   # hårdt loft i sek.
+    SCAN_READY_QUIET_MS = int(os.getenv("SCAN_READY_QUIET_MS", 500))
+
+    # Scan-tiers: "http" (ingen browser), "auto" (HTTP + Chrome til runtime-tjek), "browser"
+    SCAN_DEFAULT_TIER = os.getenv("SCAN_DEFAULT_TIER", "browser")
+    SCAN_DEMO_TIER = os.getenv("SCAN_DEMO_TIER", "http")
+    HTTP_SCAN_TIMEOUT = int(os.getenv("HTTP_SCAN_TIMEOUT", 10))
+    HTTP_SCAN_POOL_SIZE = int(os.getenv("HTTP_SCAN_POOL_SIZE", 10))
+
+    # Cache af scanresultater (pr. proces)
+    SCAN_CACHE_TTL = int(os.getenv("SCAN_CACHE_TTL", 3600))                 # sek.
+    SCAN_CACHE_MAX_ENTRIES = int(os.getenv("SCAN_CACHE_MAX_ENTRIES", 500))
+
+    # Deduplikering af samtidige scanninger af samme URL (fil-lås på tværs af workers)
+    SCAN_LOCK_DIR = os.getenv("SCAN_LOCK_DIR")     # default: <instance>/scan-locks (oprettes med 0700)
+    SCAN_LOCK_TIMEOUT = int(os.getenv("SCAN_LOCK_TIMEOUT", 120))
+
+    # Netværksoptagelse via Chrome DevTools: alle requests + Set-Cookie før samtykke,
+    # og blokering af billeder/fonte/video som tjekkene ikke bruger
+    SCAN_NETWORK_CAPTURE = os.getenv("SCAN_NETWORK_CAPTURE", "false").lower() == "true"
+    SCAN_BLOCK_RESOURCES = os.getenv("SCAN_BLOCK_RESOURCES", "true").lower() == "true"
+
+    # Massescanning (/api/gdpr/analyze-bulk)
+    BULK_SCAN_MAX_URLS = int(os.getenv("BULK_SCAN_MAX_URLS", 200))
+    BULK_SCAN_CONCURRENCY = int(os.getenv("BULK_SCAN_CONCURRENCY", 4))
+    BULK_SCAN_HOST_INTERVAL = float(os.getenv("BULK_SCAN_HOST_INTERVAL", 2.0))  # sek. mellem scanninger af samme site
+    BULK_SCAN_SAVE_BATCH = 10                  # færdige scanninger pr. commit mens streamen kører
+
+    # Crawl-mode: følger interne links (og sitemap.xml) fra start-URL'en
+    CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", 2))
+    CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 20))
+    CRAWL_MAX_DEPTH_LIMIT = 4                  # loft for hvad en request kan bede om
+    CRAWL_MAX_PAGES_LIMIT = 100
+    CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", 2))   # hver worker holder én browser-session
+    CRAWL_USE_SITEMAP = os.getenv("CRAWL_USE_SITEMAP", "true").lower() == "true"
+
+    # Genbrug af sidste analyse når en betinget request viser at siden er uændret
+    SCAN_REUSE_MAX_AGE = int(os.getenv("SCAN_REUSE_MAX_AGE", 7 * 24 * 3600))  # sek. før fuld scanning alligevel
+
+    # Overvågning: planlagt genscanning af brugernes website_url
+    MONITOR_AUTOSTART = os.getenv("MONITOR_AUTOSTART", "false").lower() == "true"  # ellers: flask monitor
+    MONITOR_PERIOD = int(os.getenv("MONITOR_PERIOD", 7 * 24 * 3600))   # sek. mellem scanninger af samme site
+    MONITOR_TICK = 60                          # sek. mellem tjek for sites der skal scannes
+    MONITOR_CATCHUP = 3600                     # nye sites tages kun hvis deres slot er højst så gammelt
+    MONITOR_TIER = os.getenv("MONITOR_TIER", "browser")
+    MONITOR_BROWSER_BUDGET = int(os.getenv("MONITOR_BROWSER_BUDGET", 1))  # samtidige baggrundsscanninger i alt
+    MONITOR_REGRESSION_THRESHOLD = int(os.getenv("MONITOR_REGRESSION_THRESHOLD", 10))  # point
+
+    # Snapshots af scanningers input (HTML, cookies, scripts, netværkslog) til `flask rescore`
+    SCAN_SNAPSHOTS = os.getenv("SCAN_SNAPSHOTS", "true").lower() == "true"
+    RESCORE_WORKERS = int(os.getenv("RESCORE_WORKERS", os.cpu_count() or 2))
+    RESCORE_BATCH_SIZE = 500
+
+    # Generering af privatlivspolitikker: "template" (utils.policy_engine) eller "ai" (call_ai_model)
+    POLICY_GENERATOR = os.getenv("POLICY_GENERATOR", "template")
+    POLICY_BATCH_MAX_SIZE = int(os.getenv("POLICY_BATCH_MAX_SIZE", 100))   # politikker pr. /policy/generate/batch
+    POLICY_STREAM_DELAY = float(os.getenv("POLICY_STREAM_DELAY", 0.5))   # sek. mellem afsnit fra AI-stand-in'en
+
+    # Cache af den indloggede bruger (pr. proces; ændringer i andre workers ses efter TTL)
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))     # sek.
+    USER_CACHE_MAX_ENTRIES = 10000
+    DB_QUERY_HEADER = os.getenv("DB_QUERY_HEADER", "true").lower() == "true"  # antal SQL-kald i X-DB-Queries
+
+    # PDF'er af privatlivspolitikker: disk-cache nøglet på HTML + stylesheet-version
+    PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR")     # default: <instance>/pdf-cache (oprettes med 0700)
+    PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+    PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", 2))   # WeasyPrint-processer
+    PDF_RENDER_TIMEOUT = 60                    # sek. en download venter på rendering
+    PDF_STYLESHEET_VERSION = "1"               # øges når PDF-layoutet ændres (ugyldiggør cachen)
+
+    # Historik-endpoints: keyset-paginering (?limit=, ?cursor=, næste cursor i X-Next-Cursor)
+    HISTORY_PAGE_SIZE = 50
+    HISTORY_MAX_PAGE_SIZE = 200
+    EXPORT_BATCH_SIZE = 500                    # rækker pr. hentning ved streamet eksport (/history/export)
+
+    # Daglige rollups til admin-dashboardet (/api/admin/stats/...)
+    ROLLUP_AUTOSTART = os.getenv("ROLLUP_AUTOSTART", "false").lower() == "true"  # ellers: flask rollups
+    ROLLUP_INTERVAL = int(os.getenv("ROLLUP_INTERVAL", 300))   # sek. mellem kørsler
+    ROLLUP_LAG = 300                           # sek. – nyere analyser tælles først ved næste kørsel
+    ROLLUP_BATCH_SIZE = 1000
@@ -3,8 +3,26 @@ from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from utils.browser_pool import BrowserPool
+from utils.scan_jobs import ScanWorkerPool
+from utils.http_scanner import HttpFetcher
+from utils.scan_cache import ScanCache
+from utils.singleflight import SingleFlight
+from utils.monitor import SiteMonitor
+from utils.rollups import RollupJob
+from utils.pdf_cache import PdfCache
+from utils.identity import UserCache
 
 db = SQLAlchemy()
 jwt = JWTManager()
 migrate = Migrate()
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+limiter = Limiter(key_func=get_remote_address)
+browser_pool = BrowserPool()
+scan_workers = ScanWorkerPool()
+http_fetcher = HttpFetcher()
+scan_cache = ScanCache()
+singleflight = SingleFlight()
+site_monitor = SiteMonitor()
+rollups = RollupJob()
+pdf_cache = PdfCache()
+user_cache = UserCache()
@@ -1,6 +1,10 @@
 from app.extensions import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from utils.findings import render_missing, render_suggestions
+from utils.blobs import unpack
+import json
+import uuid
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -27,17 +31,73 @@ class Analysis(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
     url = db.Column(db.String(255), nullable=False)
     score = db.Column(db.Integer)
-    missing = db.Column(db.JSON)
-    suggestions = db.Column(db.JSON)
+    findings = db.Column(db.JSON)  # [{"code", "params"}] – se utils.findings
+    vendors = db.Column(db.JSON)  # navne på genkendte tredjeparter (utils.trackers)
+    pages = db.Column(db.JSON)  # crawl: [{url, depth, score, missing}] pr. scannet side, missing som koder
+    page_count = db.Column(db.Integer, default=1)
+    source = db.Column(db.String(20))  # None: brugerens egen scanning, "monitor": planlagt genscanning
+    snapshot_id = db.Column(db.Integer, db.ForeignKey("scan_snapshot.id"), nullable=True)
+    rescored_at = db.Column(db.DateTime)  # sat af `flask rescore`
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (db.Index("ix_analysis_user_id_created_at", "user_id", "created_at"),)
+
+    snapshot = db.relationship("ScanSnapshot")
+    finding_codes = db.relationship("AnalysisFinding", cascade="all, delete-orphan", lazy=True)
+
+    # Teksterne renderes fra koderne når de læses
+    @property
+    def missing(self):
+        return render_missing(self.findings)
+
+    @property
+    def suggestions(self):
+        return render_suggestions(self.findings)
+
+
+class AnalysisFinding(db.Model):
+    # Én række pr. fund-kode pr. analyse, så der kan søges/tælles på kode
+    id = db.Column(db.Integer, primary_key=True)
+    analysis_id = db.Column(db.Integer, db.ForeignKey("analysis.id"), nullable=False, index=True)
+    code = db.Column(db.String(40), nullable=False, index=True)
+
+class ContentBlob(db.Model):
+    # zlib-komprimeret indhold nøglet på sha256 af det ukomprimerede – se utils.blobs
+    hash = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.LargeBinary(length=2 ** 24), nullable=False)
+    size = db.Column(db.Integer, nullable=False)  # ukomprimeret, bytes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @property
+    def text(self):
+        return unpack(self.data)
+
+
 class PrivacyPolicy(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-    data = db.Column(db.JSON, nullable=False)  # form-input fra bruger
-    html_output = db.Column(db.Text, nullable=False)  # HTML-genereret resultat
+    data_hash = db.Column(db.String(64), db.ForeignKey("content_blob.hash"), nullable=False)  # form-input fra bruger
+    html_hash = db.Column(db.String(64), db.ForeignKey("content_blob.hash"), nullable=False)  # HTML-genereret resultat
+    virksomhed_navn = db.Column(db.String(255))  # til historikken, uden at pakke data ud
+    generator = db.Column(db.String(40))  # fx "template-1" eller "ai" – ens input genbruges kun med samme generator
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    data_blob = db.relationship("ContentBlob", foreign_keys=[data_hash])
+    html_blob = db.relationship("ContentBlob", foreign_keys=[html_hash])
+
+    __table_args__ = (
+        db.Index("ix_privacy_policy_user_id_created_at", "user_id", "created_at"),
+        db.Index("ix_privacy_policy_data_hash_generator", "data_hash", "generator"),
+    )
+
+    @property
+    def data(self):
+        return json.loads(self.data_blob.text)
+
+    @property
+    def html_output(self):
+        return self.html_blob.text
+
 
 class BlogPost(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -54,6 +114,122 @@ class BlogPost(db.Model):
 class PolicyLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
-    input_data = db.Column(db.JSON, nullable=False)
-    output_html = db.Column(db.Text, nullable=False)
+    input_hash = db.Column(db.String(64), db.ForeignKey("content_blob.hash"), nullable=False)
+    output_hash = db.Column(db.String(64), db.ForeignKey("content_blob.hash"), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    input_blob = db.relationship("ContentBlob", foreign_keys=[input_hash])
+    output_blob = db.relationship("ContentBlob", foreign_keys=[output_hash])
+
+    @property
+    def input_data(self):
+        return json.loads(self.input_blob.text)
+
+    @property
+    def output_html(self):
+        return self.output_blob.text
+
+
+class ScanJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
+    url = db.Column(db.String(255), nullable=False)
+    tier = db.Column(db.String(20), default="browser")  # http/auto/browser – se analyze_website
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)  # queued/running/done/failed
+    analysis_id = db.Column(db.Integer, db.ForeignKey("analysis.id"), nullable=True)
+    options = db.Column(db.JSON)  # fx {"crawl": {...}} – se crawl_site
+    source = db.Column(db.String(20))  # "monitor" for planlagte genscanninger
+    priority = db.Column(db.Integer, nullable=False, default=0)  # lavest hentes først
+    dedup_key = db.Column(db.String(100), unique=True)  # fx "monitor:<user>:<slot>" – højst ét job pr. nøgle
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    analysis = db.relationship("Analysis")
+
+
+class ScanFingerprint(db.Model):
+    # Seneste fulde scanning af en URL – bruges til at springe uændrede sider over
+    id = db.Column(db.Integer, primary_key=True)
+    url_key = db.Column(db.String(255), nullable=False)  # normalize_url(url)
+    tier = db.Column(db.String(20), nullable=False, default="browser")
+    etag = db.Column(db.String(255))
+    last_modified = db.Column(db.String(64))
+    html_hash = db.Column(db.String(64))
+    scripts_hash = db.Column(db.String(64))
+    analysis_id = db.Column(db.Integer, db.ForeignKey("analysis.id"), nullable=True)
+    scanned_at = db.Column(db.DateTime, default=datetime.utcnow)  # sidste fulde scanning
+    checked_at = db.Column(db.DateTime, default=datetime.utcnow)  # sidste betingede tjek
+
+    analysis = db.relationship("Analysis")
+
+    __table_args__ = (db.UniqueConstraint("url_key", "tier", name="uq_scan_fingerprint_url_tier"),)
+
+
+class ScoreAlert(db.Model):
+    # Oprettes når en planlagt genscanning giver en markant lavere score
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
+    url = db.Column(db.String(255), nullable=False)
+    analysis_id = db.Column(db.Integer, db.ForeignKey("analysis.id"), nullable=False)
+    previous_analysis_id = db.Column(db.Integer, db.ForeignKey("analysis.id"), nullable=True)
+    previous_score = db.Column(db.Integer)
+    score = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    seen_at = db.Column(db.DateTime)
+
+
+class ScanSnapshot(db.Model):
+    # zlib-komprimeret JSON med scanningens rå input – se utils.snapshots
+    id = db.Column(db.Integer, primary_key=True)
+    hash = db.Column(db.String(64), nullable=False, index=True)  # sha256 af data
+    url = db.Column(db.String(255), nullable=False)
+    data = db.Column(db.LargeBinary(length=2 ** 24), nullable=False)
+    size = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class UserScoreStats(db.Model):
+    # Løbende statistik over brugerens analyser – vedligeholdes af utils.score_stats
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    analysis_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+    min_score = db.Column(db.Integer)
+    max_score = db.Column(db.Integer)
+    last_score = db.Column(db.Integer)
+    previous_score = db.Column(db.Integer)
+    trend = db.Column(db.Float)  # eksponentielt glidende gennemsnit af scoren
+    last_scan_at = db.Column(db.DateTime)
+
+
+# --- Daglige rollups til admin-statistik (utils.rollups) ---
+class RollupState(db.Model):
+    name = db.Column(db.String(40), primary_key=True)
+    last_analysis_id = db.Column(db.Integer, nullable=False, default=0)  # vandmærke
+    updated_at = db.Column(db.DateTime)
+
+
+class DailyScanRollup(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    scans = db.Column(db.Integer, nullable=False, default=0)
+    scored = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyScoreBucket(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)  # 0, 10, ..., 90
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyFindingCount(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    code = db.Column(db.String(40), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyVendorCount(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    vendor = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,148 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.models import (
+    db, RollupState, DailyScanRollup, DailyScoreBucket, DailyFindingCount, DailyVendorCount
+)
+from app.extensions import user_cache
+from utils.permissions import require_admin_user
+from utils.findings import CATALOG, render
+from utils.rollups import ROLLUP
+from datetime import date, datetime, timedelta
+
+admin_bp = Blueprint("admin", __name__)
+
+DEFAULT_DAYS = 30
+
+
+def date_range():
+    # ?from=YYYY-MM-DD&to=YYYY-MM-DD (UTC, begge inklusive); default de sidste 30 dage
+    try:
+        end = date.fromisoformat(request.args["to"]) if request.args.get("to") else datetime.utcnow().date()
+        start = date.fromisoformat(request.args["from"]) if request.args.get("from") \
+            else end - timedelta(days=DEFAULT_DAYS - 1)
+    except ValueError:
+        return None
+    return (start, end) if start <= end else None
+
+
+def top_limit():
+    try:
+        return max(1, min(int(request.args.get("limit", 20)), 200))
+    except ValueError:
+        return 20
+
+
+def range_response(start, end, **data):
+    state = db.session.get(RollupState, ROLLUP)
+    return jsonify({
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        # Analyser efter dette tidspunkt er endnu ikke talt med
+        "updated_at": state.updated_at.isoformat() if state and state.updated_at else None,
+        **data
+    })
+
+
+# 🔒 Kun admin – scanninger og gennemsnitsscore pr. dag
+@admin_bp.get("/stats/scans")
+@jwt_required()
+def scans_per_day():
+    require_admin_user()
+    period = date_range()
+    if not period:
+        return jsonify({"msg": "Invalid date range"}), 400
+
+    rows = DailyScanRollup.query.filter(DailyScanRollup.day.between(*period)).order_by(DailyScanRollup.day).all()
+    scans = sum(r.scans for r in rows)
+    scored = sum(r.scored for r in rows)
+    return range_response(
+        *period,
+        total=scans,
+        average_score=round(sum(r.score_sum for r in rows) / scored, 1) if scored else None,
+        days=[
+            {
+                "day": r.day.isoformat(),
+                "scans": r.scans,
+                "average_score": round(r.score_sum / r.scored, 1) if r.scored else None
+            }
+            for r in rows
+        ]
+    )
+
+
+# 🔒 Kun admin – fordeling af scores i intervaller af 10
+@admin_bp.get("/stats/scores")
+@jwt_required()
+def score_distribution():
+    require_admin_user()
+    period = date_range()
+    if not period:
+        return jsonify({"msg": "Invalid date range"}), 400
+
+    rows = (
+        db.session.query(DailyScoreBucket.bucket, db.func.sum(DailyScoreBucket.count))
+        .filter(DailyScoreBucket.day.between(*period))
+        .group_by(DailyScoreBucket.bucket)
+        .order_by(DailyScoreBucket.bucket)
+        .all()
+    )
+    return range_response(*period, buckets=[
+        {"from": bucket, "to": bucket + 9 if bucket < 90 else 100, "count": int(count)}
+        for bucket, count in rows
+    ])
+
+
+# 🔒 Kun admin – hyppigste fund (?missing=1 for kun manglende krav)
+@admin_bp.get("/stats/findings")
+@jwt_required()
+def top_findings():
+    require_admin_user()
+    period = date_range()
+    if not period:
+        return jsonify({"msg": "Invalid date range"}), 400
+
+    total = db.func.sum(DailyFindingCount.count)
+    query = db.session.query(DailyFindingCount.code, total).filter(DailyFindingCount.day.between(*period))
+    if request.args.get("missing"):
+        query = query.filter(DailyFindingCount.code.in_([c for c, f in CATALOG.items() if f.label]))
+    rows = query.group_by(DailyFindingCount.code).order_by(total.desc()).limit(top_limit()).all()
+
+    return range_response(*period, findings=[
+        {
+            "code": code,
+            "label": CATALOG[code].label if code in CATALOG else None,
+            # Parametriserede fund vises uden parametre
+            "text": render({"code": code}) if code in CATALOG and not callable(CATALOG[code].template) else None,
+            "count": int(count)
+        }
+        for code, count in rows
+    ])
+
+
+# 🔒 Kun admin – hyppigste tredjeparter
+@admin_bp.get("/stats/vendors")
+@jwt_required()
+def top_vendors():
+    require_admin_user()
+    period = date_range()
+    if not period:
+        return jsonify({"msg": "Invalid date range"}), 400
+
+    total = db.func.sum(DailyVendorCount.count)
+    rows = (
+        db.session.query(DailyVendorCount.vendor, total)
+        .filter(DailyVendorCount.day.between(*period))
+        .group_by(DailyVendorCount.vendor)
+        .order_by(total.desc())
+        .limit(top_limit())
+        .all()
+    )
+    return range_response(*period, vendors=[{"vendor": vendor, "count": int(count)} for vendor, count in rows])
+
+
+# 🔒 Kun admin – cache af indloggede brugere (hits = sparede User-opslag)
+@admin_bp.get("/user-cache")
+@jwt_required()
+def user_cache_stats():
+    require_admin_user()
+    return jsonify(user_cache.stats()), 200
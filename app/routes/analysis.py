@@ -1,162 +1,396 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import User, Analysis
-from app.extensions import db
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
-from datetime import datetime
-import time
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from app.models import (
+    Analysis, AnalysisFinding, ScanJob, ScanFingerprint, ScoreAlert, ScanSnapshot, UserScoreStats
+)
+from app.extensions import db, browser_pool, scan_workers, http_fetcher, scan_cache, singleflight
+from utils.scan_jobs import serialize_job
+from utils.page_readiness import wait_until_ready
+from utils.network_capture import start_capture, collect_capture
+from utils.permissions import require_admin_user
+from utils.identity import load_current_user
+from utils.urls import normalize_url
+from utils.politeness import HostThrottle, interleave_by_host
+from utils.trackers import get_tracker_index
+from utils.crawler import SiteCrawler, sitemap_urls, aggregate_site
+from utils.fingerprints import probe_page
+from utils.snapshots import take_snapshot, decode_snapshot, snapshot_hash
+from utils.findings import codes, render_pages, render_missing, render_suggestions
+from utils.pagination import keyset_page, page_limit, CURSOR_HEADER
+from utils.export import export_format, export_response, stream_rows
+from utils.scanner import (
+    HTTP, BROWSER, extract_static, extract_runtime, looks_js_rendered, build_report, tier_map
+)
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+import json
+import logging
 
 analysis_bp = Blueprint("analysis", __name__)
+logger = logging.getLogger(__name__)
 
-def analyze_website(url):
+AUTO = "auto"
+TIERS = (HTTP, AUTO, BROWSER)
+
+def analyze_website(url, tier=BROWSER, page=None):
+    # tier="browser": alt via Chrome. tier="http": kun HTTP-tjek (cookies fra
+    # Set-Cookie, intet overlay-tjek). tier="auto": HTTP til markup-tjek og Chrome
+    # kun til runtime-tjek. JS-renderede sider eskaleres altid til Chrome.
+    # page er en side der allerede er hentet over HTTP (fx af probe_page).
     if not url.startswith("http"):
         url = "https://" + url
 
-    options = Options()
-    options.headless = True
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-blink-features=AutomationControlled")
+    try:
+        if tier in (HTTP, AUTO):
+            result = fast_scan(url, runtime_in_browser=(tier == AUTO), page=page)
+            if result:
+                return result
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+        with browser_pool.session() as driver:
+            return scan_page(driver, url)
+    except Exception as e:
+        return {"error": str(e)}
 
-    try:
-        driver.get(url)
-        time.sleep(5)
 
-        html = driver.page_source.lower()
-        soup = BeautifulSoup(html, "html.parser")
+def fast_scan(url, runtime_in_browser=False, page=None):
+    if page is None:
+        try:
+            page = http_fetcher.fetch(url)
+        except Exception as e:
+            logger.info("HTTP-tier fejlede for %s – eskalerer til Chrome: %s", url, e)
+            return None
+
+    static = extract_static(page["html"], url)
+    if looks_js_rendered(static):
+        logger.info("JS-renderet side – eskalerer til Chrome: %s", url)
+        return None
+
+    if not runtime_in_browser:
+        runtime = {
+            "early_cookies": [c for c in page["cookies"] if "consent" not in c.lower()],
+            "overlay_found": None
+        }
+        result = build_report(static, runtime, tier_map(HTTP, HTTP, None))
+        return attach_snapshot(result, url, page["html"], static, runtime, None)
 
-        scripts = soup.find_all("script")
-        script_sources = [s.get("src") for s in scripts if s.get("src")]
-        hostname = urlparse(url).hostname or ""
-        third_party = [src for src in script_sources if hostname not in src]
+    with browser_pool.session() as driver:
+        readiness = load_page(driver, url)
+        runtime = extract_runtime(driver)
+        network = capture_network(driver, url)
 
-        cookie_keywords = ["cookie", "accept", "afvis", "privacy", "samtykke"]
-        has_cookie_banner = any(kw in html for kw in cookie_keywords)
+    result = build_report(static, runtime, tier_map(HTTP, BROWSER, BROWSER))
+    attach_snapshot(result, url, page["html"], static, runtime, network)
+    return add_browser_details(result, readiness, network)
 
-        cookie_texts = soup.find_all(string=True)
-        cookie_text_combined = " ".join([t.strip().lower() for t in cookie_texts if t.strip()])
-        banner_keywords = ["nødvendige", "statistik", "marketing", "valg", "indstillinger"]
-        banner_advanced_ok = any(word in cookie_text_combined for word in banner_keywords)
 
-        known_frameworks = {
-            "Cookiebot": "cookiebot.com",
-            "Klaro": "klaro.js",
-            "Osano": "osano.com"
-        }
-        found_frameworks = []
-        for src in script_sources:
-            for name, signature in known_frameworks.items():
-                if signature in src:
-                    found_frameworks.append(name)
-
-        links = [a.text.lower() for a in soup.find_all("a")]
-        has_privacy = any("privat" in text or "policy" in text for text in links)
-
-        cookies = driver.get_cookies()
-        early_cookies = [c["name"] for c in cookies if "consent" not in c["name"].lower()]
-
-        forms = soup.find_all("form")
-        consent_near_form = any(
-            any(word in form.get_text().lower() for word in ["samtykke", "gdpr", "privatliv"])
-            for form in forms
-        )
+def load_page(driver, url):
+    if current_app.config.get("SCAN_NETWORK_CAPTURE"):
+        start_capture(driver, block=current_app.config.get("SCAN_BLOCK_RESOURCES", True))
 
-        overlay_found = False
-        try:
-            banners = driver.find_elements("xpath", "//*[contains(@style,'position:fixed') or contains(@class,'cookie')]")
-            for banner in banners:
-                size = banner.size
-                if size["height"] > 40 and size["width"] > 100:
-                    overlay_found = True
-                    break
-        except:
-            pass
+    driver.get(url)
+    readiness = wait_until_ready(
+        driver,
+        max_wait=current_app.config.get("SCAN_READY_MAX_WAIT", 5),
+        quiet_ms=current_app.config.get("SCAN_READY_QUIET_MS", 500)
+    )
+    logger.info("Side klar efter %.2fs (%s): %s", readiness["wait_time"], readiness["reason"], url)
+    return readiness
 
-        missing = []
-        suggestions = []
 
-        if not has_cookie_banner:
-            missing.append("Cookie-banner")
-            suggestions.append("Tilføj synligt cookie-banner med valgmuligheder")
-        elif not banner_advanced_ok:
-            suggestions.append("Cookie-banner mangler kategorier (nødvendige/statistik/marketing) og valg-muligheder")
+def scan_page(driver, url):
+    readiness = load_page(driver, url)
+    html = driver.page_source
+    static = extract_static(html, url)
+    runtime = extract_runtime(driver)
+    network = capture_network(driver, url)
 
-        if not overlay_found:
-            suggestions.append("Cookie-banner skal være visuelt synligt som overlay")
+    result = build_report(static, runtime, tier_map(BROWSER, BROWSER, BROWSER))
+    attach_snapshot(result, url, html, static, runtime, network)
+    return add_browser_details(result, readiness, network)
 
-        if not has_privacy:
-            missing.append("Privatlivspolitik")
-            suggestions.append("Tilføj link til privatlivspolitik (fx i footer)")
 
-        if early_cookies:
-            suggestions.append(f"Siden sætter cookies tidligt: {', '.join(early_cookies[:5])}… (kræver samtykke først)")
+def attach_snapshot(result, url, html, static, runtime, network):
+    # Snapshot af scanningens input – tages ud af resultatet igen i save_analysis
+    if current_app.config.get("SCAN_SNAPSHOTS", True):
+        result["snapshot"] = take_snapshot(url, html, static, runtime, network, result["tiers"])
+    return result
 
-        if not consent_near_form and forms:
-            suggestions.append("Formularer mangler samtykketekst i nærheden")
 
-        if not third_party:
-            suggestions.append("Ingen 3rd-party scripts fundet – overvej fx Analytics hvis relevant")
+def inspect_page(driver, url):
+    # Rå fund for én side i et crawl – rapporten bygges samlet for sitet
+    load_page(driver, url)
+    return extract_static(driver.page_source, url), extract_runtime(driver)
 
-        if found_frameworks:
-            suggestions.append(f"Samtykkestyring fundet via: {', '.join(found_frameworks)}")
-        else:
-            suggestions.append("Ingen kendt samtykkeplatform fundet – overvej Cookiebot eller Klaro for korrekt håndtering")
 
-        score = max(0, 100 - len(missing) * 20 - len([s for s in suggestions if "samtykke" in s.lower()]) * 5)
+def crawl_site(url, max_depth=None, max_pages=None, use_sitemap=None):
+    # Scanner startsiden og interne undersider (evt. fra sitemap.xml) og samler
+    # fundene i én rapport med score for hele sitet
+    if not url.startswith("http"):
+        url = "https://" + url
 
-        return {
-            "score": score,
-            "missing": missing,
-            "suggestions": suggestions,
-            "scripts": third_party,
-            "cookies": early_cookies
-        }
+    config = current_app.config
+    max_depth = min(max_depth if max_depth is not None else config.get("CRAWL_MAX_DEPTH", 2),
+                    config.get("CRAWL_MAX_DEPTH_LIMIT", 4))
+    max_pages = min(max_pages or config.get("CRAWL_MAX_PAGES", 20), config.get("CRAWL_MAX_PAGES_LIMIT", 100))
+    if use_sitemap is None:
+        use_sitemap = config.get("CRAWL_USE_SITEMAP", True)
 
+    try:
+        seeds = sitemap_urls(http_fetcher, url, limit=max_pages) if use_sitemap and max_depth else []
+        crawler = SiteCrawler(
+            current_app._get_current_object(),
+            browser_pool,
+            inspect_page,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            workers=config.get("CRAWL_WORKERS", 2)
+        )
+        return aggregate_site(crawler.crawl(url, seeds=seeds))
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        driver.quit()
+
+
+def capture_network(driver, url):
+    if not current_app.config.get("SCAN_NETWORK_CAPTURE"):
+        return None
+    return collect_capture(driver, url)
+
+
+def add_browser_details(result, readiness, network):
+    result["readiness"] = readiness
+    if network:
+        # Netværksloggen ser også tredjeparter der ikke er <script src>
+        result["network"] = network
+        known = {v["name"] for v in result["vendors"]}
+        result["vendors"] += [v for v in network["vendors"] if v["name"] not in known]
+    return result
+
+
+def cached_scan(url, tier=BROWSER, fresh=False, page=None):
+    # Slår op i scan-cachen først; fresh=True tvinger en ny scanning (og opdaterer cachen)
+    key = (normalize_url(url), tier)
+    if not fresh:
+        result = scan_cache.get(key)
+        if result is not None:
+            result["cached"] = True
+            return result
+
+    def scan():
+        # En anden tråd kan have fyldt cachen mens vi ventede på at blive leder
+        if not fresh:
+            hit = scan_cache.get(key)
+            if hit is not None:
+                return hit
+        return analyze_website(url, tier=tier, page=page)
+
+    # Samtidige scanninger af samme URL deler én browser-kørsel
+    result, shared = singleflight.do(f"{tier}:{key[0]}", scan)
+    if "error" not in result:
+        scan_cache.set(key, result)
+    result["cached"] = False
+    result["shared"] = shared
+    return result
+
+
+def conditional_scan(url, tier=BROWSER, fresh=False):
+    # Sender først en betinget request; er siden uændret siden sidste fulde
+    # scanning, genbruges den analyses fund uden at starte Chrome.
+    # Returnerer (result, probe) – probe gemmes med remember_scan
+    key = normalize_url(url)
+    previous = ScanFingerprint.query.filter_by(url_key=key, tier=tier).first()
+    probe = probe_page(http_fetcher, key, previous)
+
+    if not fresh and probe and probe["unchanged"] and reusable(previous):
+        analysis = previous.analysis
+        return {
+            "score": analysis.score,
+            "findings": analysis.findings,
+            "missing": analysis.missing,
+            "suggestions": analysis.suggestions,
+            "cached": False,
+            "reused": True,
+            "reused_from": analysis.id
+        }, probe
+
+    # Er siden ændret siden sidste fulde scanning, må scan-cachen ikke bruges –
+    # den kan indeholde resultatet fra før ændringen. Siden probe'en hentede,
+    # genbruges af HTTP-tieren i stedet for at blive hentet igen.
+    changed = previous is not None and probe is not None and not probe["unchanged"]
+    result = cached_scan(url, tier=tier, fresh=fresh or changed, page=probe.get("page") if probe else None)
+    result["reused"] = False
+    return result, probe
+
+
+def reusable(fingerprint):
+    if not fingerprint or not fingerprint.analysis or not fingerprint.scanned_at:
+        return False
+    max_age = timedelta(seconds=current_app.config.get("SCAN_REUSE_MAX_AGE", 7 * 24 * 3600))
+    return datetime.utcnow() - fingerprint.scanned_at < max_age
+
+
+def remember_scan(url, tier, result, probe, analysis):
+    # Opdaterer fingerprintet efter en scanning; kaldes efter analysen er committet.
+    # Et resultat fra scan-cachen eller fra en andens scanning er ikke nødvendigvis
+    # taget af den side probe'en så, og må ikke knyttes til dens hashes
+    if not probe or "error" in result:
+        return
+    if not result.get("reused") and (result.get("cached") or result.get("shared")):
+        return
+
+    key = normalize_url(url)
+    now = datetime.utcnow()
+    fingerprint = ScanFingerprint.query.filter_by(url_key=key, tier=tier).first()
+
+    if result.get("reused"):
+        if fingerprint:
+            fingerprint.checked_at = now
+    else:
+        if fingerprint is None:
+            fingerprint = ScanFingerprint(url_key=key, tier=tier)
+            db.session.add(fingerprint)
+        fingerprint.etag = probe["etag"]
+        fingerprint.last_modified = probe["last_modified"]
+        fingerprint.html_hash = probe["html_hash"]
+        fingerprint.scripts_hash = probe["scripts_hash"]
+        fingerprint.analysis = analysis
+        fingerprint.scanned_at = now
+        fingerprint.checked_at = now
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # En samtidig scanning af samme URL nåede at oprette fingerprintet først
+        db.session.rollback()
+
+
+def save_snapshot(url, encoded):
+    # Identiske snapshots (fx fra scan-cachen) gemmes kun én gang
+    data = decode_snapshot(encoded)
+    digest = snapshot_hash(data)
+    snapshot = ScanSnapshot.query.filter_by(hash=digest).first()
+    if snapshot is None:
+        snapshot = ScanSnapshot(hash=digest, url=url, data=data, size=len(data))
+        db.session.add(snapshot)
+    return snapshot
+
+
+# Felter i et scanresultat der kun bruges af save_analysis og aldrig sendes til klienten
+INTERNAL_FIELDS = ("snapshot", "reused_from")
+
+
+def save_analysis(url, result, user_id=None, source=None):
+    # Tilføjer rækken til sessionen – kalderen committer. Snapshottet og id'et
+    # på en genbrugt analyse (ofte en anden brugers) fjernes fra result, så de
+    # ikke sendes med i svaret
+    encoded = result.pop("snapshot", None)
+    reused_from = result.pop("reused_from", None)
+    previous = db.session.get(Analysis, reused_from) if reused_from else None
+    if encoded:
+        snapshot = save_snapshot(url, encoded)
+    else:
+        snapshot = previous.snapshot if previous else None
+
+    if "vendors" in result:
+        vendors = [v["name"] for v in result["vendors"]]
+    else:
+        vendors = previous.vendors if previous else None
+
+    analysis = Analysis(
+        user_id=user_id,
+        source=source,
+        url=url,
+        score=result["score"],
+        findings=result["findings"],
+        vendors=vendors,
+        finding_codes=[AnalysisFinding(code=code) for code in codes(result["findings"])],
+        pages=result.get("pages"),
+        page_count=result.get("page_count", 1),
+        snapshot=snapshot,
+        created_at=datetime.utcnow()
+    )
+    db.session.add(analysis)
+    return analysis
+
+
+def crawl_options(data):
+    # {"depth": 2, "max_pages": 20, "sitemap": true} – manglende felter tager config-defaults.
+    # Værdier over CRAWL_*_LIMIT sænkes til loftet; ValueError ved ugyldige værdier
+    options = data.get("crawl") if isinstance(data.get("crawl"), dict) else {}
+    config = current_app.config
+    return {
+        "max_depth": crawl_limit(options.get("depth"), "depth", 0, config.get("CRAWL_MAX_DEPTH_LIMIT", 4)),
+        "max_pages": crawl_limit(options.get("max_pages"), "max_pages", 1, config.get("CRAWL_MAX_PAGES_LIMIT", 100)),
+        "use_sitemap": bool(options["sitemap"]) if "sitemap" in options else None
+    }
+
+
+def crawl_limit(value, name, minimum, maximum):
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"crawl.{name} must be an integer")
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"crawl.{name} must be an integer")
+    if value < minimum:
+        raise ValueError(f"crawl.{name} must be at least {minimum}")
+    return min(value, maximum)
+
+
+def requested_tier(data, default):
+    tier = data.get("tier") or default
+    return tier if tier in TIERS else default
+
+
+def wants_job(data):
+    # Job-mode: {"async": true} i body eller ?mode=job
+    return bool(data.get("async")) or request.args.get("mode") == "job"
 
 
 @analysis_bp.route("/gdpr/analyze", methods=["POST"])
 @jwt_required(optional=True)
 def analyze_and_save():
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first() if user_email else None
+    user = load_current_user()
 
     data = request.json
     url = data.get("url")
     if not url:
         return jsonify({"msg": "URL is required"}), 400
 
-    result = analyze_website(url)
+    tier = requested_tier(data, current_app.config.get("SCAN_DEFAULT_TIER", BROWSER))
+
+    # Crawl-mode: {"crawl": true} eller {"crawl": {"depth": .., "max_pages": ..}}
+    try:
+        crawl = crawl_options(data) if data.get("crawl") else None
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    if wants_job(data):
+        job = scan_workers.enqueue(url, user_id=user.id if user else None, tier=tier, crawl=crawl)
+        return jsonify({"job_id": job.id, "status": job.status}), 202
+
+    probe = None
+    if crawl is not None:
+        result = crawl_site(url, **crawl)
+    else:
+        # Kun indloggede brugere må springe scan-cachen over med "fresh"
+        result, probe = conditional_scan(url, tier=tier, fresh=bool(user and data.get("fresh")))
     if "error" in result:
         return jsonify({"msg": result["error"]}), 500
 
-    analysis = Analysis(
-        user_id=user.id if user else None,
-        url=url,
-        score=result["score"],
-        missing=result["missing"],
-        suggestions=result["suggestions"],
-        created_at=datetime.utcnow()
-    )
-
-    db.session.add(analysis)
+    analysis = save_analysis(url, result, user_id=user.id if user else None)
     db.session.commit()
+    remember_scan(url, tier, result, probe, analysis)
 
     return jsonify({
         "id": analysis.id,
         "url": url,
         **result,
+        "pages": render_pages(result.get("pages")),
         "created_at": analysis.created_at.isoformat()
     }), 200
 
@@ -171,54 +405,315 @@ def analyze_demo():
         if not url:
             return jsonify({"error": "URL mangler"}), 400
 
-        result = analyze_website(url)
+        tier = current_app.config.get("SCAN_DEMO_TIER", HTTP)
+
+        if wants_job(data):
+            job = scan_workers.enqueue(url, tier=tier)
+            return jsonify({"job_id": job.id, "status": job.status}), 202
+
+        result = cached_scan(url, tier=tier)
 
         return jsonify({
             "score": result["score"],
             "missing": result["missing"],
-            "suggestions": result["suggestions"]
+            "suggestions": result["suggestions"],
+            "tiers": result["tiers"],
+            "cached": result["cached"]
         })
     except Exception as e:
         return jsonify({"error": "Noget gik galt", "details": str(e)}), 500
 
 
+# Massescanning: resultater streames som NDJSON efterhånden som de bliver
+# færdige; Analysis-rækkerne gemmes i bidder undervejs (BULK_SCAN_SAVE_BATCH)
+@analysis_bp.route("/gdpr/analyze-bulk", methods=["POST"])
+@jwt_required()
+def analyze_bulk():
+    user = load_current_user()
+    if not user:
+        return jsonify({"msg": "User not found"}), 404
+
+    data = request.get_json() or {}
+    urls = [u.strip() for u in data.get("urls", []) if isinstance(u, str) and u.strip()]
+    if not urls:
+        return jsonify({"msg": "URLs are required"}), 400
+
+    max_urls = current_app.config.get("BULK_SCAN_MAX_URLS", 200)
+    if len(urls) > max_urls:
+        return jsonify({"msg": f"Max {max_urls} URLs per request"}), 400
+
+    tier = requested_tier(data, current_app.config.get("SCAN_DEFAULT_TIER", BROWSER))
+    app = current_app._get_current_object()
+    throttle = HostThrottle(min_interval=current_app.config.get("BULK_SCAN_HOST_INTERVAL", 2.0))
+    index = get_tracker_index()
+
+    def host_of(url):
+        return index.registrable_domain(urlsplit(normalize_url(url)).hostname or "")
+
+    def scan(url):
+        with app.app_context(), throttle.slot(host_of(url)):
+            return conditional_scan(url, tier=tier)
+
+    def save(pending, ids):
+        # Gemmer færdige scanninger i én commit, mens streamen stadig kører
+        analyses = [(i, save_analysis(url, result, user_id=user.id)) for i, url, result, _ in pending]
+        db.session.commit()
+        for (_, url, result, probe), (i, analysis) in zip(pending, analyses):
+            remember_scan(url, tier, result, probe, analysis)
+            ids[str(i)] = analysis.id
+        pending.clear()
+
+    def generate():
+        ordered = interleave_by_host(list(enumerate(urls)), lambda item: host_of(item[1]))
+        save_batch = current_app.config.get("BULK_SCAN_SAVE_BATCH", 10)
+        pending = []
+        ids = {}
+        handled = set()
+
+        executor = ThreadPoolExecutor(max_workers=current_app.config.get("BULK_SCAN_CONCURRENCY", 4))
+        futures = {executor.submit(scan, url): (i, url) for i, url in ordered}
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                handled.add(future)
+                i, url = futures[future]
+                try:
+                    result, probe = future.result()
+                except Exception as e:
+                    result, probe = {"error": str(e)}, None
+
+                if "error" not in result:
+                    pending.append((i, url, result, probe))
+                    if len(pending) >= save_batch:
+                        save(pending, ids)
+                yield json.dumps({
+                    "index": i,
+                    "url": url,
+                    **{k: v for k, v in result.items() if k not in INTERNAL_FIELDS},
+                    "progress": {"done": done, "total": len(urls)}
+                }) + "\n"
+
+            save(pending, ids)
+            yield json.dumps({
+                "summary": True,
+                "total": len(urls),
+                "saved": len(ids),
+                "failed": len(urls) - len(ids),
+                "ids": ids
+            }) + "\n"
+        finally:
+            # Afbryder klienten streamen, annulleres scanninger der ikke er
+            # startet; de igangværende og dem der ikke nåede at blive sendt, gemmes
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, (i, url) in futures.items():
+                if future in handled or future.cancelled() or future.exception() is not None:
+                    continue
+                result, probe = future.result()
+                if "error" not in result:
+                    pending.append((i, url, result, probe))
+            if pending:
+                save(pending, ids)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@analysis_bp.route("/gdpr/jobs/<job_id>", methods=["GET"])
+@jwt_required(optional=True)
+def get_job(job_id):
+    job = db.session.get(ScanJob, job_id)
+    if not job:
+        return jsonify({"msg": "Job not found"}), 404
+
+    # Jobs oprettet af en bruger kan kun ses af samme bruger
+    if job.user_id:
+        user = load_current_user()
+        if not user or user.id != job.user_id:
+            return jsonify({"msg": "Job not found"}), 404
+
+    return jsonify(serialize_job(job)), 200
+
+
 @analysis_bp.route("/me/average-score", methods=["GET"])
 @jwt_required()
 def average_score():
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
+    user = load_current_user()
     if not user:
         return jsonify({"msg": "User not found"}), 404
 
-    analyses = user.analyses
-    if not analyses:
-        return jsonify({"average_score": None})
-
-    scores = [a.score for a in analyses if a.score is not None]
-    if not scores:
+    stats = db.session.get(UserScoreStats, user.id)
+    if not stats or not stats.analysis_count:
         return jsonify({"average_score": None})
 
-    avg = round(sum(scores) / len(scores), 1)
+    avg = round(stats.score_sum / stats.analysis_count, 1)
     return jsonify({"average_score": avg})
 
 
+@analysis_bp.route("/me/score-trend", methods=["GET"])
+@jwt_required()
+def score_trend():
+    user = load_current_user()
+    if not user:
+        return jsonify({"msg": "User not found"}), 404
+
+    stats = db.session.get(UserScoreStats, user.id)
+    if not stats or not stats.analysis_count:
+        return jsonify({"count": 0})
+
+    change = stats.last_score - stats.previous_score if stats.previous_score is not None else None
+    return jsonify({
+        "count": stats.analysis_count,
+        "average_score": round(stats.score_sum / stats.analysis_count, 1),
+        "min_score": stats.min_score,
+        "max_score": stats.max_score,
+        "last_score": stats.last_score,
+        "previous_score": stats.previous_score,
+        "change": change,
+        "trend": round(stats.trend, 1),  # glidende gennemsnit, vægtet mod nyeste scanninger
+        "last_scan_at": stats.last_scan_at.isoformat() if stats.last_scan_at else None
+    })
+
+
+@analysis_bp.route("/me/alerts", methods=["GET"])
+@jwt_required()
+def score_alerts():
+    user = load_current_user()
+    if not user:
+        return jsonify({"msg": "User not found"}), 404
+
+    query = ScoreAlert.query.filter_by(user_id=user.id)
+    if request.args.get("unseen"):
+        query = query.filter(ScoreAlert.seen_at.is_(None))
+    alerts = query.order_by(ScoreAlert.created_at.desc()).all()
+    return jsonify([
+        {
+            "id": a.id,
+            "url": a.url,
+            "analysis_id": a.analysis_id,
+            "previous_score": a.previous_score,
+            "score": a.score,
+            "created_at": a.created_at.isoformat(),
+            "seen_at": a.seen_at.isoformat() if a.seen_at else None
+        }
+        for a in alerts
+    ])
+
+
+@analysis_bp.route("/me/alerts/<int:alert_id>/seen", methods=["POST"])
+@jwt_required()
+def mark_alert_seen(alert_id):
+    user = load_current_user()
+    alert = db.session.get(ScoreAlert, alert_id)
+    if not user or not alert or alert.user_id != user.id:
+        return jsonify({"msg": "Alert not found"}), 404
+
+    alert.seen_at = alert.seen_at or datetime.utcnow()
+    db.session.commit()
+    return jsonify({"id": alert.id, "seen_at": alert.seen_at.isoformat()}), 200
+
+
+# 🔒 Kun admin
+@analysis_bp.route("/gdpr/browser-pool", methods=["GET"])
+@jwt_required()
+def browser_pool_stats():
+    require_admin_user()
+    return jsonify(browser_pool.stats()), 200
+
+
+# 🔒 Kun admin – hvor ofte hvert fund forekommer
+@analysis_bp.route("/gdpr/findings/stats", methods=["GET"])
+@jwt_required()
+def finding_stats():
+    require_admin_user()
+    rows = (
+        db.session.query(AnalysisFinding.code, db.func.count(AnalysisFinding.id))
+        .group_by(AnalysisFinding.code)
+        .order_by(db.func.count(AnalysisFinding.id).desc())
+        .all()
+    )
+    return jsonify({
+        "analyses": Analysis.query.count(),
+        "findings": [{"code": code, "count": count} for code, count in rows]
+    }), 200
+
+
+# 🔒 Kun admin
+@analysis_bp.route("/gdpr/scan-cache", methods=["GET"])
+@jwt_required()
+def scan_cache_stats():
+    require_admin_user()
+    return jsonify(scan_cache.stats()), 200
+
+
 @analysis_bp.route("/gdpr/history", methods=["GET"])
 @jwt_required()
 def get_history():
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
+    user = load_current_user()
     if not user:
         return jsonify({"msg": "User not found"}), 404
 
-    history = Analysis.query.filter_by(user_id=user.id).order_by(Analysis.created_at.desc()).all()
-    return jsonify([
+    # ?limit=N&cursor=<X-Next-Cursor fra forrige side>; crawl-sider og snapshot hentes ikke
+    query = Analysis.query.filter_by(user_id=user.id).options(load_only(
+        Analysis.id, Analysis.url, Analysis.score, Analysis.findings,
+        Analysis.page_count, Analysis.source, Analysis.created_at
+    ))
+    try:
+        history, next_cursor = keyset_page(
+            query, Analysis.created_at, Analysis.id,
+            cursor=request.args.get("cursor"),
+            limit=page_limit(
+                request.args.get("limit"),
+                current_app.config.get("HISTORY_PAGE_SIZE", 50),
+                current_app.config.get("HISTORY_MAX_PAGE_SIZE", 200)
+            )
+        )
+    except ValueError:
+        return jsonify({"msg": "Invalid cursor"}), 400
+
+    response = jsonify([
         {
             "id": a.id,
             "url": a.url,
             "score": a.score,
             "missing": a.missing,
             "suggestions": a.suggestions,
+            "page_count": a.page_count,
+            "source": a.source,
             "created_at": a.created_at.isoformat()
         }
         for a in history
     ])
+    if next_cursor:
+        response.headers[CURSOR_HEADER] = next_cursor
+    return response
+
+
+HISTORY_EXPORT_COLUMNS = ["id", "url", "score", "missing", "suggestions", "page_count", "source", "created_at"]
+
+
+@analysis_bp.route("/gdpr/history/export", methods=["GET"])
+@jwt_required()
+def export_history():
+    user = load_current_user()
+    if not user:
+        return jsonify({"msg": "User not found"}), 404
+
+    # ?format=ndjson|csv – hele historikken streames; crawl-sider og snapshot hentes ikke
+    fmt = export_format(request.args.get("format"))
+    if not fmt:
+        return jsonify({"msg": "format must be ndjson or csv"}), 400
+
+    query = db.session.query(
+        Analysis.id, Analysis.url, Analysis.score, Analysis.findings,
+        Analysis.page_count, Analysis.source, Analysis.created_at
+    ).filter(Analysis.user_id == user.id).order_by(Analysis.created_at.desc(), Analysis.id.desc())
+
+    records = stream_rows(query, lambda a: {
+        "id": a.id,
+        "url": a.url,
+        "score": a.score,
+        "missing": render_missing(a.findings),
+        "suggestions": render_suggestions(a.findings),
+        "page_count": a.page_count,
+        "source": a.source,
+        "created_at": a.created_at.isoformat()
+    }, batch_size=current_app.config.get("EXPORT_BATCH_SIZE", 500))
+    return export_response(records, fmt, HISTORY_EXPORT_COLUMNS, "analyser")
@@ -4,7 +4,8 @@ from flask_jwt_extended import (
     jwt_required, get_jwt_identity, get_jwt
 )
 from app.models import User
-from app.extensions import limiter, db
+from app.extensions import limiter, db, user_cache
+from utils.identity import load_current_user, identity_claims
 import re
 
 auth_bp = Blueprint("auth", __name__)
@@ -54,11 +55,9 @@ def login():
     if not user or not user.check_password(password):
         return jsonify({"msg": "Invalid credentials"}), 401
 
-    access_token = create_access_token(
-        identity=user.email,
-        additional_claims={"role": user.role, "company": user.company_name}
-    )
-    refresh_token = create_refresh_token(identity=user.email)
+    # uid og rolle i begge tokens, så beskyttede endpoints kan slå brugeren op på id
+    access_token = create_access_token(identity=user.email, additional_claims=identity_claims(user))
+    refresh_token = create_refresh_token(identity=user.email, additional_claims=identity_claims(user))
 
     response = make_response(jsonify(access_token=access_token))
     response.set_cookie(
@@ -74,16 +73,12 @@ def login():
 @auth_bp.route("/refresh", methods=["POST"])
 @jwt_required(refresh=True)
 def refresh():
-    identity = get_jwt_identity()
-    claims = get_jwt()
+    # Rolle og firmanavn tages fra brugeren (via cachen), ikke fra det gamle token
+    user = load_current_user()
+    if not user:
+        return jsonify({"msg": "User not found"}), 401
 
-    new_access_token = create_access_token(
-        identity=identity,
-        additional_claims={
-            "role": claims.get("role"),
-            "company": claims.get("company")
-        }
-    )
+    new_access_token = create_access_token(identity=user.email, additional_claims=identity_claims(user))
     return jsonify(access_token=new_access_token), 200
 
 # LOGOUT – sletter refresh cookie
@@ -111,8 +106,7 @@ def admin_route():
 @auth_bp.route("/me", methods=["GET"])
 @jwt_required()
 def get_profile():
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
+    user = load_current_user()
     if not user:
         return jsonify({"msg": "User not found"}), 404
 
@@ -129,8 +123,8 @@ def get_profile():
 @auth_bp.route("/me", methods=["PUT"])
 @jwt_required()
 def update_profile():
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
+    current = load_current_user()
+    user = db.session.get(User, current.id) if current else None
     if not user:
         return jsonify({"msg": "User not found"}), 404
 
@@ -141,5 +135,6 @@ def update_profile():
     user.contact_email = data.get("contact_email", user.contact_email)
 
     db.session.commit()
+    user_cache.invalidate(user.id)
     return jsonify({"msg": "Profil opdateret"}), 200
 
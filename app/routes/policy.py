@@ -1,18 +1,28 @@
 # Blueprint: /api/gdpr
-from flask import Blueprint, request, jsonify, send_file
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import User, PrivacyPolicy, PolicyLog
-from app.extensions import db
+from flask import Blueprint, request, jsonify, send_file, current_app, Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from app.models import PrivacyPolicy, PolicyLog, ContentBlob
+from app.extensions import db, pdf_cache
+from utils.pagination import keyset_page, page_limit, CURSOR_HEADER
+from utils.identity import load_current_user
+from utils.export import export_format, export_response, stream_rows
+from utils.blobs import store_json, store_text, unpack, canonical_json, content_hash
+from utils.policy_engine import render_policy, iter_policy, validate, ENGINE_VERSION
+from sqlalchemy.orm import aliased
 from datetime import datetime
-from weasyprint import HTML
 from flask_cors import cross_origin
-import io
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 policy_bp = Blueprint("policy", __name__)
 
 
 # --- Preflight routes (CORS) ---
 @policy_bp.route("/policy/generate", methods=["OPTIONS"])
+@policy_bp.route("/policy/generate/batch", methods=["OPTIONS"])
 @policy_bp.route("/policy/<int:policy_id>", methods=["OPTIONS"])
 @policy_bp.route("/policy/<int:policy_id>/pdf", methods=["OPTIONS"])
 @policy_bp.route("/policy/history", methods=["OPTIONS"])
@@ -22,42 +32,200 @@ def preflight_ok(**kwargs):
 
 
 # --- Generer politik ---
+def policy_generator():
+    # Id'et gemmes på politikken, så dedup kun genbruger HTML fra samme generator
+    if current_app.config.get("POLICY_GENERATOR", "template") == "ai":
+        return "ai"
+    return ENGINE_VERSION
+
+
+def iter_policy_html(data, generator):
+    # Politikken afsnit for afsnit – samlet giver de den færdige HTML
+    if generator == "ai":
+        return stream_ai_model(build_privacy_policy_prompt(data))
+    return iter_policy(data)
+
+
+def render_policy_html(data, generator):
+    if generator == "ai":
+        return call_ai_model(build_privacy_policy_prompt(data))
+    return render_policy(data)
+
+
+def reusable_policy(user_id, data_hash, generator):
+    # (brugerens egen politik med samme input, html_hash fra en anden brugers)
+    existing = PrivacyPolicy.query.filter_by(
+        user_id=user_id, data_hash=data_hash, generator=generator
+    ).order_by(PrivacyPolicy.id.desc()).first()
+    if existing:
+        return existing, existing.html_hash
+    same = db.session.query(PrivacyPolicy.html_hash).filter_by(data_hash=data_hash, generator=generator).first()
+    return None, same.html_hash if same else None
+
+
+def add_policy(user_id, data, data_hash, html_hash, generator):
+    # Input og HTML ligger som blobs, som både politik og log peger på
+    store_json(data)
+    navn = data.get("virksomhed_navn")
+
+    policy = PrivacyPolicy(
+        user_id=user_id,
+        data_hash=data_hash,
+        html_hash=html_hash,
+        virksomhed_navn=str(navn)[:255] if navn else None,
+        generator=generator,
+        created_at=datetime.utcnow()
+    )
+
+    log = PolicyLog(
+        user_id=user_id,
+        input_hash=data_hash,
+        output_hash=html_hash
+    )
+
+    db.session.add_all([policy, log])
+    return policy
+
+
+def create_policy(user, data, generator):
+    # Tilføjer politik og log til sessionen – kalderen committer. Returnerer
+    # (policy, html, reused); html er None når intet blev renderet.
+    # Samme input fra samme bruger giver den eksisterende politik; samme input
+    # fra en anden bruger genbruger HTML'en uden at rendere.
+    data_hash = content_hash(canonical_json(data))
+    existing, html_hash = reusable_policy(user.id, data_hash, generator)
+    if existing:
+        return existing, None, True
+
+    html = None
+    if html_hash is None:
+        html = render_policy_html(data, generator)
+        html_hash = store_text(html)
+    return add_policy(user.id, data, data_hash, html_hash, generator), html, False
+
+
+def sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def stream_policy(user, data, generator):
+    # Server-Sent Events: "section" med HTML pr. afsnit efterhånden som det
+    # produceres, til sidst "done" med id. Politikken gemmes først når hele
+    # dokumentet er genereret – afbryder klienten, gemmes intet.
+    user_id = user.id
+    data_hash = content_hash(canonical_json(data))
+
+    def generate():
+        existing, html_hash = reusable_policy(user_id, data_hash, generator)
+        if html_hash:
+            policy = existing or add_policy(user_id, data, data_hash, html_hash, generator)
+            db.session.commit()
+            yield sse("section", {"html": policy.html_output})
+            yield sse("done", {"id": policy.id, "cached": existing is not None})
+            return
+
+        # Ingen DB-forbindelse holdes åben mens afsnittene genereres
+        db.session.rollback()
+        parts = []
+        try:
+            for chunk in iter_policy_html(data, generator):
+                parts.append(chunk)
+                yield sse("section", {"html": chunk})
+        except Exception:
+            logger.exception("Streaming af politik fejlede")
+            yield sse("error", {"msg": "Policy generation failed"})
+            return
+
+        html = "".join(parts)
+        policy = add_policy(user_id, data, data_hash, store_text(html), generator)
+        db.session.commit()
+        pdf_cache.prefetch(html)
+        yield sse("done", {"id": policy.id, "cached": False})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def wants_stream():
+    # ?stream=1 eller Accept: text/event-stream
+    return request.args.get("stream") in ("1", "true") or \
+        "text/event-stream" in request.headers.get("Accept", "")
+
+
 @policy_bp.route("/policy/generate", methods=["POST"])
 @cross_origin(origins="http://localhost:3000", supports_credentials=True)
 @jwt_required()
 def generate_policy():
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
+    user = load_current_user()
     if not user:
         return jsonify({"msg": "User not found"}), 404
 
     data = request.get_json()
     if not data:
         return jsonify({"msg": "No data provided"}), 400
+    error = validate(data)
+    if error:
+        return jsonify({"msg": error}), 400
 
-    prompt = build_privacy_policy_prompt(data)
-    html = call_ai_model(prompt)
-
-    policy = PrivacyPolicy(
-        user_id=user.id,
-        data=data,
-        html_output=html,
-        created_at=datetime.utcnow()
-    )
+    if wants_stream():
+        return stream_policy(user, data, policy_generator())
 
-    db.session.add(policy)
+    policy, html, cached = create_policy(user, data, policy_generator())
     db.session.commit()
 
-    log = PolicyLog(
-        user_id=user.id,
-        input_data=data,
-        output_html=html
-    )
+    # PDF'en renderes i baggrunden, så den er klar når brugeren henter den
+    if html:
+        pdf_cache.prefetch(html)
+
+    return jsonify({ "html": html or policy.html_output, "id": policy.id, "cached": cached }), 200
+
+
+# --- Generer mange politikker på én gang ---
+@policy_bp.route("/policy/generate/batch", methods=["POST"])
+@cross_origin(origins="http://localhost:3000", supports_credentials=True)
+@jwt_required()
+def generate_policy_batch():
+    user = load_current_user()
+    if not user:
+        return jsonify({"msg": "User not found"}), 404
+
+    # {"policies": [{...form-input...}, ...]} – HTML hentes bagefter via /policy/<id>
+    items = (request.get_json(silent=True) or {}).get("policies")
+    if not isinstance(items, list) or not items:
+        return jsonify({"msg": "policies must be a non-empty list"}), 400
+    max_size = current_app.config.get("POLICY_BATCH_MAX_SIZE", 100)
+    if len(items) > max_size:
+        return jsonify({"msg": f"Max {max_size} policies per batch"}), 400
+    for i, data in enumerate(items):
+        error = validate(data)
+        if error:
+            return jsonify({"msg": error, "index": i}), 400
 
-    db.session.add(log)
+    generator = policy_generator()
+    results = []
+    rendered = []
+    for data in items:
+        # Ens input i samme batch findes via autoflush og genbruges
+        policy, html, cached = create_policy(user, data, generator)
+        results.append((policy, cached))
+        if html:
+            rendered.append(html)
     db.session.commit()
 
-    return jsonify({ "html": html, "id": policy.id }), 200
+    for html in rendered:
+        pdf_cache.prefetch(html)
+
+    return jsonify({
+        "policies": [
+            {"id": policy.id, "virksomhed_navn": policy.virksomhed_navn, "cached": cached}
+            for policy, cached in results
+        ],
+        "generated": len(rendered),
+        "reused": len(items) - len(rendered)
+    }), 200
 
 
 # --- Hent politik som HTML ---
@@ -65,8 +233,7 @@ def generate_policy():
 @cross_origin(origins="http://localhost:3000", supports_credentials=True)
 @jwt_required()
 def get_policy(policy_id):
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
+    user = load_current_user()
     policy = PrivacyPolicy.query.filter_by(id=policy_id, user_id=user.id).first()
     if not policy:
         return jsonify({"msg": "Policy not found"}), 404
@@ -75,41 +242,123 @@ def get_policy(policy_id):
 
 # --- Hent som PDF ---
 @policy_bp.route("/policy/<int:policy_id>/pdf", methods=["GET"])
-@cross_origin(origins="http://localhost:3000", supports_credentials=True)
+@cross_origin(origins="http://localhost:3000", supports_credentials=True, expose_headers=["ETag"])
 @jwt_required()
 def download_policy_pdf(policy_id):
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
+    user = load_current_user()
     policy = PrivacyPolicy.query.filter_by(id=policy_id, user_id=user.id).first()
     if not policy:
         return jsonify({"msg": "Policy not found"}), 404
 
-    pdf_io = io.BytesIO()
-    HTML(string=policy.html_output).write_pdf(pdf_io)
-    pdf_io.seek(0)
+    # Samme HTML giver samme PDF – nøglen er også ETag, så klienten kan genbruge sin kopi.
+    # HTML-bloben hentes først hvis PDF'en skal renderes
+    key = pdf_cache.key_for_hash(policy.html_hash)
+    if request.if_none_match.contains(key):
+        response = current_app.response_class(status=304)
+        response.set_etag(key)
+        return response
 
-    return send_file(pdf_io, mimetype="application/pdf", download_name=f"privatlivspolitik_{policy_id}.pdf", as_attachment=True)
+    try:
+        pdf = pdf_cache.render(policy.html_output, key)
+    except TimeoutError:
+        return jsonify({"msg": "PDF is still rendering, try again shortly"}), 503
+
+    return send_file(
+        pdf,
+        mimetype="application/pdf",
+        download_name=f"privatlivspolitik_{policy_id}.pdf",
+        as_attachment=True,
+        etag=key,
+        max_age=0
+    )
 
 
 # --- Historik ---
 @policy_bp.route("/policy/history", methods=["GET"])
-@cross_origin(origins="http://localhost:3000", supports_credentials=True)
+@cross_origin(origins="http://localhost:3000", supports_credentials=True, expose_headers=[CURSOR_HEADER])
 @jwt_required()
 def policy_history():
-    user_email = get_jwt_identity()
-    user = User.query.filter_by(email=user_email).first()
-    policies = PrivacyPolicy.query.filter_by(user_id=user.id).order_by(PrivacyPolicy.created_at.desc()).all()
+    user = load_current_user()
 
-    return jsonify([
+    # Kun virksomhedsnavnet hentes; input og HTML ligger i content_blob
+    query = db.session.query(
+        PrivacyPolicy.id,
+        PrivacyPolicy.created_at,
+        PrivacyPolicy.virksomhed_navn
+    ).filter(PrivacyPolicy.user_id == user.id)
+    try:
+        policies, next_cursor = keyset_page(
+            query, PrivacyPolicy.created_at, PrivacyPolicy.id,
+            cursor=request.args.get("cursor"),
+            limit=page_limit(
+                request.args.get("limit"),
+                current_app.config.get("HISTORY_PAGE_SIZE", 50),
+                current_app.config.get("HISTORY_MAX_PAGE_SIZE", 200)
+            )
+        )
+    except ValueError:
+        return jsonify({"msg": "Invalid cursor"}), 400
+
+    response = jsonify([
         {
             "id": p.id,
             "created_at": p.created_at.isoformat(),
-            "virksomhed_navn": p.data.get("virksomhed_navn", "Ukendt"),
+            "virksomhed_navn": p.virksomhed_navn or "Ukendt",
         } for p in policies
     ])
+    if next_cursor:
+        response.headers[CURSOR_HEADER] = next_cursor
+    return response
+
 
+POLICY_EXPORT_COLUMNS = ["id", "created_at", "virksomhed_navn", "data"]
 
-# --- Prompt builder og dummy AI ---
+
+@policy_bp.route("/policy/history/export", methods=["GET"])
+@cross_origin(origins="http://localhost:3000", supports_credentials=True)
+@jwt_required()
+def export_policy_history():
+    user = load_current_user()
+    if not user:
+        return jsonify({"msg": "User not found"}), 404
+
+    # ?format=ndjson|csv; ?html=1 tager den genererede HTML med
+    fmt = export_format(request.args.get("format"))
+    if not fmt:
+        return jsonify({"msg": "format must be ndjson or csv"}), 400
+    with_html = request.args.get("html", "").lower() in ("1", "true")
+
+    # Blobs joines ind, så hver række stadig kun er ét fetch fra cursoren
+    data_blob = aliased(ContentBlob)
+    columns = [PrivacyPolicy.id, PrivacyPolicy.created_at, PrivacyPolicy.virksomhed_navn, data_blob.data.label("data")]
+    query = db.session.query(*columns).join(data_blob, data_blob.hash == PrivacyPolicy.data_hash)
+    if with_html:
+        html_blob = aliased(ContentBlob)
+        query = query.add_columns(html_blob.data.label("html_output")).join(
+            html_blob, html_blob.hash == PrivacyPolicy.html_hash
+        )
+    query = query.filter(
+        PrivacyPolicy.user_id == user.id
+    ).order_by(PrivacyPolicy.created_at.desc(), PrivacyPolicy.id.desc())
+
+    def serialize(p):
+        record = {
+            "id": p.id,
+            "created_at": p.created_at.isoformat(),
+            "virksomhed_navn": p.virksomhed_navn or "Ukendt",
+            "data": json.loads(unpack(p.data))
+        }
+        if with_html:
+            record["html_output"] = unpack(p.html_output)
+        return record
+
+    records = stream_rows(query, serialize, batch_size=current_app.config.get("EXPORT_BATCH_SIZE", 500))
+    return export_response(
+        records, fmt, POLICY_EXPORT_COLUMNS + (["html_output"] if with_html else []), "privatlivspolitikker"
+    )
+
+
+# --- Prompt builder og dummy AI (POLICY_GENERATOR=ai) ---
 def build_privacy_policy_prompt(data):
     return f"""
 Du er juridisk ekspert i GDPR og dansk persondatalovgivning.
@@ -128,17 +377,26 @@ Cookies: {data.get('cookies')}
 """.strip()
 
 
+# Lokal stand-in for en model: afsnittene kommer med en forsinkelse
+# (POLICY_STREAM_DELAY), så streaming kan afprøves uden netværk
+AI_STUB_SECTIONS = [
+    "\n<h1>Privatlivspolitik</h1>\n",
+    "<h2>1. Hvem er vi?</h2>\n<p>Vi er Eksempelfirmaet – kontakt os på demo@example.com.</p>\n",
+    "<h2>2. Hvilke oplysninger indsamles?</h2>\n<p>Navn, e-mail, IP-adresse og browserdata.</p>\n",
+    "<h2>3. Brug af data</h2>\n<p>Vi bruger dine data til support og forbedring af siden.</p>\n",
+    "<h2>4. Cookies</h2>\n<p>Vi anvender cookies til statistik og funktionalitet.</p>\n",
+    "<h2>5. Dine rettigheder</h2>\n<p>Du har ret til indsigt og sletning. Kontakt os ved spørgsmål.</p>\n",
+]
+
+
+def stream_ai_model(prompt, delay=None):
+    if delay is None:
+        delay = current_app.config.get("POLICY_STREAM_DELAY", 0.5)
+    for i, chunk in enumerate(AI_STUB_SECTIONS):
+        if i and delay:
+            time.sleep(delay)
+        yield chunk
+
+
 def call_ai_model(prompt):
-    return """
-<h1>Privatlivspolitik</h1>
-<h2>1. Hvem er vi?</h2>
-<p>Vi er Eksempelfirmaet – kontakt os på demo@example.com.</p>
-<h2>2. Hvilke oplysninger indsamles?</h2>
-<p>Navn, e-mail, IP-adresse og browserdata.</p>
-<h2>3. Brug af data</h2>
-<p>Vi bruger dine data til support og forbedring af siden.</p>
-<h2>4. Cookies</h2>
-<p>Vi anvender cookies til statistik og funktionalitet.</p>
-<h2>5. Dine rettigheder</h2>
-<p>Du har ret til indsigt og sletning. Kontakt os ved spørgsmål.</p>
-"""
+    return "".join(stream_ai_model(prompt, delay=0))
@@ -0,0 +1,99 @@
+# Sammenligner single-pass feature-udtrækket (utils.dom_extract) med den
+# tidligere BeautifulSoup-baserede udtrækning fra analyze_website.
+#
+#   python benchmarks/bench_dom_extract.py                 # syntetisk tung side
+#   python benchmarks/bench_dom_extract.py side.html ...   # gemte sider
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from utils.dom_extract import extract_features
+
+
+def legacy_extract(html):
+    html = html.lower()
+    soup = BeautifulSoup(html, "html.parser")
+
+    scripts = soup.find_all("script")
+    script_sources = [s.get("src") for s in scripts if s.get("src")]
+
+    cookie_keywords = ["cookie", "accept", "afvis", "privacy", "samtykke"]
+    has_cookie_banner = any(kw in html for kw in cookie_keywords)
+
+    cookie_texts = soup.find_all(string=True)
+    cookie_text_combined = " ".join([t.strip().lower() for t in cookie_texts if t.strip()])
+    banner_keywords = ["nødvendige", "statistik", "marketing", "valg", "indstillinger"]
+    banner_advanced_ok = any(word in cookie_text_combined for word in banner_keywords)
+
+    links = [a.text.lower() for a in soup.find_all("a")]
+    has_privacy = any("privat" in text or "policy" in text for text in links)
+
+    forms = soup.find_all("form")
+    consent_near_form = any(
+        any(word in form.get_text().lower() for word in ["samtykke", "gdpr", "privatliv"])
+        for form in forms
+    )
+
+    return {
+        "script_sources": script_sources,
+        "script_count": len(scripts),
+        "has_cookie_banner": has_cookie_banner,
+        "banner_advanced_ok": banner_advanced_ok,
+        "has_privacy": has_privacy,
+        "form_count": len(forms),
+        "consent_near_form": consent_near_form,
+    }
+
+
+def synthetic_page(sections=4000):
+    parts = ["<!doctype html><html><head><title>Demo</title>"]
+    parts += [f'<script src="https://cdn{i}.example.com/lib.js"></script>' for i in range(40)]
+    parts.append("<style>body { font-family: sans-serif; }</style></head><body>")
+    for i in range(sections):
+        parts.append(
+            f'<div class="card"><h2>Produkt {i}</h2><p>Lorem ipsum dolor sit amet &amp; mere tekst {i}.</p>'
+            f'<a href="/p/{i}">Læs mere om <b>produkt {i}</b></a></div>'
+        )
+        if i % 500 == 0:
+            parts.append('<form><input name="email"><label>Tilmeld nyhedsbrev</label></form>')
+    parts.append('<form><input name="q"><p>Vi behandler data jf. vores privatlivspolitik</p></form>')
+    parts.append('<footer><a href="/privat">Privatlivspolitik</a> <span>Cookie-indstillinger</span></footer>')
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def measure(fn, html, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn(html)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main(paths):
+    pages = [(p, open(p, encoding="utf-8", errors="replace").read()) for p in paths] or [("syntetisk", synthetic_page())]
+
+    for name, html in pages:
+        legacy, legacy_time, legacy_peak = measure(legacy_extract, html, rounds=3)
+        current, current_time, current_peak = measure(extract_features, html, rounds=3)
+
+        mismatches = [k for k in legacy if legacy[k] != current[k]]
+        print(f"{name}: {len(html) / 1024:.0f} KB")
+        print(f"  BeautifulSoup : {legacy_time * 1000:8.1f} ms  peak {legacy_peak / 1024 / 1024:6.1f} MB")
+        print(f"  single-pass   : {current_time * 1000:8.1f} ms  peak {current_peak / 1024 / 1024:6.1f} MB")
+        print(f"  speedup       : {legacy_time / current_time:8.1f}x")
+        print(f"  samme fund    : {'ja' if not mismatches else 'NEJ – ' + ', '.join(mismatches)}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
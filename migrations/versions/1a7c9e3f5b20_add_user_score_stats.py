@@ -0,0 +1,38 @@
+"""Add user_score_stats
+
+Run `flask score-stats` after upgrading to fill in existing analyses.
+
+Revision ID: 1a7c9e3f5b20
+Revises: f08b2d4e6a19
+Create Date: 2026-10-18 15:36:04.582917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a7c9e3f5b20'
+down_revision = 'f08b2d4e6a19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_score_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('analysis_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Integer(), nullable=False),
+    sa.Column('min_score', sa.Integer(), nullable=True),
+    sa.Column('max_score', sa.Integer(), nullable=True),
+    sa.Column('last_score', sa.Integer(), nullable=True),
+    sa.Column('previous_score', sa.Integer(), nullable=True),
+    sa.Column('trend', sa.Float(), nullable=True),
+    sa.Column('last_scan_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_score_stats')
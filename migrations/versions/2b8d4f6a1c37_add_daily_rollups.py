@@ -0,0 +1,67 @@
+"""Add daily rollup tables and analysis.vendors
+
+Run `flask rollups` after upgrading to count existing analyses. Vendors are
+only recorded for analyses saved after this revision.
+
+Revision ID: 2b8d4f6a1c37
+Revises: 1a7c9e3f5b20
+Create Date: 2026-10-18 16:12:47.301855
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b8d4f6a1c37'
+down_revision = '1a7c9e3f5b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('vendors', sa.JSON(), nullable=True))
+
+    op.create_table('rollup_state',
+    sa.Column('name', sa.String(length=40), nullable=False),
+    sa.Column('last_analysis_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('daily_scan_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('scans', sa.Integer(), nullable=False),
+    sa.Column('scored', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('daily_score_bucket',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'bucket')
+    )
+    op.create_table('daily_finding_count',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('code', sa.String(length=40), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'code')
+    )
+    op.create_table('daily_vendor_count',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('vendor', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'vendor')
+    )
+
+
+def downgrade():
+    op.drop_table('daily_vendor_count')
+    op.drop_table('daily_finding_count')
+    op.drop_table('daily_score_bucket')
+    op.drop_table('daily_scan_rollup')
+    op.drop_table('rollup_state')
+
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.drop_column('vendors')
@@ -0,0 +1,39 @@
+"""Add scan_job queue table
+
+Revision ID: 3b9e4c2d7a10
+Revises: 24718856c1a2
+Create Date: 2026-10-18 09:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9e4c2d7a10'
+down_revision = '24718856c1a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scan_job',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('url', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('analysis_id', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['analysis_id'], ['analysis.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scan_job_status'), 'scan_job', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_scan_job_status'), table_name='scan_job')
+    op.drop_table('scan_job')
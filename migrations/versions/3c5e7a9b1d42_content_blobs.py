@@ -0,0 +1,225 @@
+"""Store policy input and HTML as deduplicated, compressed blobs
+
+Moves privacy_policy.data/html_output and policy_log.input_data/output_html
+into content_blob (zlib-compressed, keyed by sha256 of the uncompressed
+content) and replaces them with hash references. Identical payloads across
+rows are stored once. privacy_policy gains a virksomhed_navn column for the
+history list. A storage report is logged when the upgrade finishes; run
+`flask blob-report` to see it again later.
+
+Revision ID: 3c5e7a9b1d42
+Revises: 2b8d4f6a1c37
+Create Date: 2026-10-18 17:05:19.624310
+
+"""
+import hashlib
+import json
+import logging
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5e7a9b1d42'
+down_revision = '2b8d4f6a1c37'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+content_blob = sa.table(
+    'content_blob',
+    sa.column('hash', sa.String),
+    sa.column('data', sa.LargeBinary),
+    sa.column('size', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+)
+privacy_policy = sa.table(
+    'privacy_policy',
+    sa.column('id', sa.Integer),
+    sa.column('data', sa.JSON),
+    sa.column('html_output', sa.Text),
+    sa.column('data_hash', sa.String),
+    sa.column('html_hash', sa.String),
+    sa.column('virksomhed_navn', sa.String),
+    sa.column('created_at', sa.DateTime),
+)
+policy_log = sa.table(
+    'policy_log',
+    sa.column('id', sa.Integer),
+    sa.column('input_data', sa.JSON),
+    sa.column('output_html', sa.Text),
+    sa.column('input_hash', sa.String),
+    sa.column('output_hash', sa.String),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+# Som utils.blobs da migrationen blev skrevet
+def canonical_json(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class BlobWriter:
+    def __init__(self):
+        self.seen = set()
+        self.pending = []
+        self.references = 0
+        self.logical_bytes = 0
+        self.stored_bytes = 0
+
+    def store(self, text, created_at):
+        raw = text.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        self.references += 1
+        self.logical_bytes += len(raw)
+        if digest not in self.seen:
+            self.seen.add(digest)
+            data = zlib.compress(raw, 6)
+            self.stored_bytes += len(data)
+            self.pending.append({"hash": digest, "data": data, "size": len(raw), "created_at": created_at})
+        return digest
+
+    def flush(self):
+        if self.pending:
+            op.bulk_insert(content_blob, self.pending)
+            self.pending = []
+
+
+def backfill(conn, writer, table, json_col, text_col, json_hash, text_hash, extra=None):
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(table.c.id, table.c[json_col], table.c[text_col], table.c.created_at)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        updates = []
+        for row in rows:
+            data = row[1]
+            values = {
+                json_hash: writer.store(canonical_json(data), row.created_at),
+                text_hash: writer.store(row[2], row.created_at),
+            }
+            if extra:
+                values.update(extra(data))
+            updates.append((row.id, values))
+        writer.flush()
+        for id, values in updates:
+            conn.execute(table.update().where(table.c.id == id).values(**values))
+
+
+def company_name(data):
+    navn = data.get("virksomhed_navn") if isinstance(data, dict) else None
+    return {"virksomhed_navn": str(navn)[:255] if navn else None}
+
+
+def upgrade():
+    op.create_table('content_blob',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(length=16777216), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    with op.batch_alter_table('privacy_policy', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('html_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('virksomhed_navn', sa.String(length=255), nullable=True))
+    with op.batch_alter_table('policy_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('input_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('output_hash', sa.String(length=64), nullable=True))
+
+    conn = op.get_bind()
+    writer = BlobWriter()
+    backfill(conn, writer, privacy_policy, 'data', 'html_output', 'data_hash', 'html_hash', extra=company_name)
+    backfill(conn, writer, policy_log, 'input_data', 'output_html', 'input_hash', 'output_hash')
+
+    with op.batch_alter_table('privacy_policy', schema=None) as batch_op:
+        batch_op.alter_column('data_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.alter_column('html_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_foreign_key('fk_privacy_policy_data_hash', 'content_blob', ['data_hash'], ['hash'])
+        batch_op.create_foreign_key('fk_privacy_policy_html_hash', 'content_blob', ['html_hash'], ['hash'])
+        batch_op.drop_column('html_output')
+        batch_op.drop_column('data')
+    with op.batch_alter_table('policy_log', schema=None) as batch_op:
+        batch_op.alter_column('input_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.alter_column('output_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_foreign_key('fk_policy_log_input_hash', 'content_blob', ['input_hash'], ['hash'])
+        batch_op.create_foreign_key('fk_policy_log_output_hash', 'content_blob', ['output_hash'], ['hash'])
+        batch_op.drop_column('output_html')
+        batch_op.drop_column('input_data')
+
+    logger.info(
+        "content_blob: %d references -> %d blobs, %d bytes before, %d bytes stored (%d bytes saved)",
+        writer.references, len(writer.seen), writer.logical_bytes, writer.stored_bytes,
+        writer.logical_bytes - writer.stored_bytes
+    )
+
+
+def restore(conn, table, json_hash, text_hash, json_col, text_col):
+    blobs = content_blob.alias()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(table.c.id, table.c[json_hash], table.c[text_hash])
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        hashes = {row[1] for row in rows} | {row[2] for row in rows}
+        texts = {
+            digest: zlib.decompress(data).decode("utf-8")
+            for digest, data in conn.execute(
+                sa.select(blobs.c.hash, blobs.c.data).where(blobs.c.hash.in_(hashes))
+            )
+        }
+        for row in rows:
+            conn.execute(table.update().where(table.c.id == row.id).values(**{
+                json_col: json.loads(texts[row[1]]),
+                text_col: texts[row[2]],
+            }))
+
+
+def downgrade():
+    with op.batch_alter_table('privacy_policy', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('html_output', sa.Text(), nullable=True))
+    with op.batch_alter_table('policy_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('input_data', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('output_html', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    restore(conn, privacy_policy, 'data_hash', 'html_hash', 'data', 'html_output')
+    restore(conn, policy_log, 'input_hash', 'output_hash', 'input_data', 'output_html')
+
+    with op.batch_alter_table('policy_log', schema=None) as batch_op:
+        batch_op.alter_column('input_data', existing_type=sa.JSON(), nullable=False)
+        batch_op.alter_column('output_html', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_constraint('fk_policy_log_output_hash', type_='foreignkey')
+        batch_op.drop_constraint('fk_policy_log_input_hash', type_='foreignkey')
+        batch_op.drop_column('output_hash')
+        batch_op.drop_column('input_hash')
+    with op.batch_alter_table('privacy_policy', schema=None) as batch_op:
+        batch_op.alter_column('data', existing_type=sa.JSON(), nullable=False)
+        batch_op.alter_column('html_output', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_constraint('fk_privacy_policy_html_hash', type_='foreignkey')
+        batch_op.drop_constraint('fk_privacy_policy_data_hash', type_='foreignkey')
+        batch_op.drop_column('virksomhed_navn')
+        batch_op.drop_column('html_hash')
+        batch_op.drop_column('data_hash')
+
+    op.drop_table('content_blob')
@@ -0,0 +1,30 @@
+"""Add privacy_policy.generator for input-hash deduplication
+
+Existing policies have no generator and are never reused.
+
+Revision ID: 4d6f8b0c2e53
+Revises: 3c5e7a9b1d42
+Create Date: 2026-10-18 17:48:31.207734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d6f8b0c2e53'
+down_revision = '3c5e7a9b1d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('privacy_policy', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('generator', sa.String(length=40), nullable=True))
+        batch_op.create_index('ix_privacy_policy_data_hash_generator', ['data_hash', 'generator'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('privacy_policy', schema=None) as batch_op:
+        batch_op.drop_index('ix_privacy_policy_data_hash_generator')
+        batch_op.drop_column('generator')
@@ -0,0 +1,26 @@
+"""Add tier to scan_job
+
+Revision ID: 5f1a8d0c6e22
+Revises: 3b9e4c2d7a10
+Create Date: 2026-10-18 10:04:17.530811
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f1a8d0c6e22'
+down_revision = '3b9e4c2d7a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('scan_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tier', sa.String(length=20), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('scan_job', schema=None) as batch_op:
+        batch_op.drop_column('tier')
@@ -0,0 +1,28 @@
+"""Add dedup_key to scan_job
+
+Revision ID: 6a2c4e8f0b17
+Revises: 4d6f8b0c2e53
+Create Date: 2026-10-18 19:12:40.218305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a2c4e8f0b17'
+down_revision = '4d6f8b0c2e53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('scan_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('dedup_key', sa.String(length=100), nullable=True))
+        batch_op.create_unique_constraint('uq_scan_job_dedup_key', ['dedup_key'])
+
+
+def downgrade():
+    with op.batch_alter_table('scan_job', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_scan_job_dedup_key', type_='unique')
+        batch_op.drop_column('dedup_key')
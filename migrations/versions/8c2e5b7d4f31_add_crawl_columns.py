@@ -0,0 +1,34 @@
+"""Add crawl pages to analysis and options to scan_job
+
+Revision ID: 8c2e5b7d4f31
+Revises: 5f1a8d0c6e22
+Create Date: 2026-10-18 11:21:45.204718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e5b7d4f31'
+down_revision = '5f1a8d0c6e22'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('pages', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('page_count', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('scan_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('options', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('scan_job', schema=None) as batch_op:
+        batch_op.drop_column('options')
+
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.drop_column('pages')
+        batch_op.drop_column('page_count')
@@ -0,0 +1,38 @@
+"""Add scan_fingerprint
+
+Revision ID: a41d9e6b2c58
+Revises: 8c2e5b7d4f31
+Create Date: 2026-10-18 12:02:33.918204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41d9e6b2c58'
+down_revision = '8c2e5b7d4f31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scan_fingerprint',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('url_key', sa.String(length=255), nullable=False),
+    sa.Column('tier', sa.String(length=20), nullable=False),
+    sa.Column('etag', sa.String(length=255), nullable=True),
+    sa.Column('last_modified', sa.String(length=64), nullable=True),
+    sa.Column('html_hash', sa.String(length=64), nullable=True),
+    sa.Column('scripts_hash', sa.String(length=64), nullable=True),
+    sa.Column('analysis_id', sa.Integer(), nullable=True),
+    sa.Column('scanned_at', sa.DateTime(), nullable=True),
+    sa.Column('checked_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['analysis_id'], ['analysis.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url_key', 'tier', name='uq_scan_fingerprint_url_tier')
+    )
+
+
+def downgrade():
+    op.drop_table('scan_fingerprint')
@@ -0,0 +1,54 @@
+"""Add monitoring: job source/priority, analysis source and score_alert
+
+Revision ID: c7b3f18e9d04
+Revises: a41d9e6b2c58
+Create Date: 2026-10-18 12:47:09.661372
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7b3f18e9d04'
+down_revision = 'a41d9e6b2c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('scan_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('source', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('priority', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('source', sa.String(length=20), nullable=True))
+
+    op.create_table('score_alert',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(length=255), nullable=False),
+    sa.Column('analysis_id', sa.Integer(), nullable=False),
+    sa.Column('previous_analysis_id', sa.Integer(), nullable=True),
+    sa.Column('previous_score', sa.Integer(), nullable=True),
+    sa.Column('score', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('seen_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['analysis_id'], ['analysis.id'], ),
+    sa.ForeignKeyConstraint(['previous_analysis_id'], ['analysis.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_score_alert_user_id'), 'score_alert', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_score_alert_user_id'), table_name='score_alert')
+    op.drop_table('score_alert')
+
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.drop_column('source')
+
+    with op.batch_alter_table('scan_job', schema=None) as batch_op:
+        batch_op.drop_column('priority')
+        batch_op.drop_column('source')
@@ -0,0 +1,44 @@
+"""Add scan_snapshot and analysis snapshot reference
+
+Revision ID: d2f6a0c8b913
+Revises: c7b3f18e9d04
+Create Date: 2026-10-18 13:30:52.117446
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6a0c8b913'
+down_revision = 'c7b3f18e9d04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scan_snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('url', sa.String(length=255), nullable=False),
+    sa.Column('data', sa.LargeBinary(length=16777216), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scan_snapshot_hash'), 'scan_snapshot', ['hash'], unique=False)
+
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('snapshot_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('rescored_at', sa.DateTime(), nullable=True))
+        batch_op.create_foreign_key('fk_analysis_snapshot_id', 'scan_snapshot', ['snapshot_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_analysis_snapshot_id', type_='foreignkey')
+        batch_op.drop_column('rescored_at')
+        batch_op.drop_column('snapshot_id')
+
+    op.drop_index(op.f('ix_scan_snapshot_hash'), table_name='scan_snapshot')
+    op.drop_table('scan_snapshot')
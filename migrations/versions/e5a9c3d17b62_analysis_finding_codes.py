@@ -0,0 +1,169 @@
+"""Store analysis findings as codes
+
+Replaces analysis.missing/suggestions (Danish text) with analysis.findings
+(codes + params) and an indexed analysis_finding table. Existing rows are
+backfilled by mapping the stored texts back to codes; texts that cannot be
+recognised are kept verbatim as "legacy" findings.
+
+Revision ID: e5a9c3d17b62
+Revises: d2f6a0c8b913
+Create Date: 2026-10-18 14:12:40.390127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c3d17b62'
+down_revision = 'd2f6a0c8b913'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Teksterne som de så ud da migrationen blev skrevet
+TEXTS = {
+    "cookie_banner": "Tilføj synligt cookie-banner med valgmuligheder",
+    "banner_categories": "Cookie-banner mangler kategorier (nødvendige/statistik/marketing) og valg-muligheder",
+    "overlay": "Cookie-banner skal være visuelt synligt som overlay",
+    "privacy_link": "Tilføj link til privatlivspolitik (fx i footer)",
+    "form_consent": "Formularer mangler samtykketekst i nærheden",
+    "no_third_party": "Ingen 3rd-party scripts fundet – overvej fx Analytics hvis relevant",
+    "cmp_missing": "Ingen kendt samtykkeplatform fundet – overvej Cookiebot eller Klaro for korrekt håndtering",
+}
+CODES = {text: code for code, text in TEXTS.items()}
+LABELS = {"cookie_banner": "Cookie-banner", "privacy_link": "Privatlivspolitik"}
+LABEL_CODES = {label: code for code, label in LABELS.items()}
+
+EARLY_COOKIES = "Siden sætter cookies tidligt: "
+EARLY_COOKIES_END = "… (kræver samtykke først)"
+CMP_FOUND = "Samtykkestyring fundet via: "
+
+analysis = sa.table(
+    'analysis',
+    sa.column('id', sa.Integer),
+    sa.column('missing', sa.JSON),
+    sa.column('suggestions', sa.JSON),
+    sa.column('findings', sa.JSON),
+    sa.column('pages', sa.JSON),
+)
+analysis_finding = sa.table(
+    'analysis_finding',
+    sa.column('analysis_id', sa.Integer),
+    sa.column('code', sa.String),
+)
+
+
+def to_finding(text):
+    if text in CODES:
+        return {"code": CODES[text]}
+    if text.startswith(EARLY_COOKIES):
+        cookies = text[len(EARLY_COOKIES):].split(EARLY_COOKIES_END)[0]
+        return {"code": "early_cookies", "params": {"cookies": cookies.split(", ")}}
+    if text.startswith(CMP_FOUND):
+        return {"code": "cmp_found", "params": {"frameworks": text[len(CMP_FOUND):].split(", ")}}
+    return {"code": "legacy", "params": {"text": text}}
+
+
+def to_findings(missing, suggestions):
+    findings = [to_finding(text) for text in suggestions or []]
+    present = {f["code"] for f in findings}
+    for label in missing or []:
+        code = LABEL_CODES.get(label)
+        if code and code not in present:
+            findings.insert(0, {"code": code})
+    return findings
+
+
+def from_finding(finding):
+    code = finding["code"]
+    params = finding.get("params", {})
+    if code == "early_cookies":
+        return f"{EARLY_COOKIES}{', '.join(params['cookies'])}{EARLY_COOKIES_END}"
+    if code == "cmp_found":
+        return f"{CMP_FOUND}{', '.join(params['frameworks'])}"
+    if code == "legacy":
+        return params["text"]
+    return TEXTS.get(code, code)
+
+
+def pages_with(pages, convert):
+    if not pages:
+        return pages
+    return [{**page, "missing": [convert(m) for m in page["missing"]]} if "missing" in page else page
+            for page in pages]
+
+
+def upgrade():
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('findings', sa.JSON(), nullable=True))
+
+    op.create_table('analysis_finding',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('analysis_id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=40), nullable=False),
+    sa.ForeignKeyConstraint(['analysis_id'], ['analysis.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_analysis_finding_analysis_id'), 'analysis_finding', ['analysis_id'], unique=False)
+    op.create_index(op.f('ix_analysis_finding_code'), 'analysis_finding', ['code'], unique=False)
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(analysis.c.id, analysis.c.missing, analysis.c.suggestions, analysis.c.pages)
+            .where(analysis.c.id > last_id)
+            .order_by(analysis.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        code_rows = []
+        for row in rows:
+            findings = to_findings(row.missing, row.suggestions)
+            conn.execute(
+                analysis.update().where(analysis.c.id == row.id).values(
+                    findings=findings,
+                    pages=pages_with(row.pages, lambda label: LABEL_CODES.get(label, label))
+                )
+            )
+            codes = []
+            for f in findings:
+                if f["code"] not in codes:
+                    codes.append(f["code"])
+            code_rows += [{"analysis_id": row.id, "code": code} for code in codes]
+        if code_rows:
+            op.bulk_insert(analysis_finding, code_rows)
+
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.drop_column('suggestions')
+        batch_op.drop_column('missing')
+
+
+def downgrade():
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('missing', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('suggestions', sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(analysis.c.id, analysis.c.findings, analysis.c.pages)).fetchall()
+    for row in rows:
+        findings = row.findings or []
+        conn.execute(
+            analysis.update().where(analysis.c.id == row.id).values(
+                missing=[LABELS[f["code"]] for f in findings if f["code"] in LABELS],
+                suggestions=[from_finding(f) for f in findings],
+                pages=pages_with(row.pages, lambda code: LABELS.get(code, code))
+            )
+        )
+
+    op.drop_index(op.f('ix_analysis_finding_code'), table_name='analysis_finding')
+    op.drop_index(op.f('ix_analysis_finding_analysis_id'), table_name='analysis_finding')
+    op.drop_table('analysis_finding')
+
+    with op.batch_alter_table('analysis', schema=None) as batch_op:
+        batch_op.drop_column('findings')
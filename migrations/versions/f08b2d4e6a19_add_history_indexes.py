@@ -0,0 +1,26 @@
+"""Add (user_id, created_at) indexes for history pagination
+
+Revision ID: f08b2d4e6a19
+Revises: e5a9c3d17b62
+Create Date: 2026-10-18 14:58:21.746093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f08b2d4e6a19'
+down_revision = 'e5a9c3d17b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_analysis_user_id_created_at', 'analysis', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_privacy_policy_user_id_created_at', 'privacy_policy', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_privacy_policy_user_id_created_at', table_name='privacy_policy')
+    op.drop_index('ix_analysis_user_id_created_at', table_name='analysis')
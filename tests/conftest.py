@@ -0,0 +1,30 @@
+import pytest
+
+from app import create_app
+from app.extensions import db, scan_cache, user_cache
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+        "SCAN_LOCK_DIR": str(tmp_path / "scan-locks"),
+        "PDF_CACHE_DIR": str(tmp_path / "pdf-cache"),
+        "SCAN_SNAPSHOTS": False,
+        "RATELIMIT_STORAGE_URI": "memory://",
+        "JWT_SECRET_KEY": "test-secret-der-er-mindst-32-bytes-lang",
+    })
+    # Cachen er pr. proces og overlever derfor mellem tests
+    scan_cache.clear()
+    user_cache.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
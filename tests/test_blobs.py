@@ -0,0 +1,47 @@
+import pytest
+from flask import Flask
+
+from app.extensions import db
+from app.models import ContentBlob
+from utils.blobs import canonical_json, content_hash, pack, store_json, store_text, unpack
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def test_canonical_json_ignores_key_order():
+    assert canonical_json({"b": 1, "a": "æ"}) == canonical_json({"a": "æ", "b": 1}) == '{"a":"æ","b":1}'
+
+
+def test_pack_round_trip():
+    text = "<p>Privatlivspolitik</p>" * 100
+    assert unpack(pack(text)) == text
+    assert len(pack(text)) < len(text)
+
+
+def test_store_text_dedups(app):
+    first = store_text("<h1>Politik</h1>")
+    second = store_text("<h1>Politik</h1>")
+    other = store_text("<h1>Anden politik</h1>")
+    db.session.commit()
+
+    assert first == second == content_hash("<h1>Politik</h1>")
+    assert other != first
+    assert ContentBlob.query.count() == 2
+    blob = db.session.get(ContentBlob, first)
+    assert unpack(blob.data) == "<h1>Politik</h1>"
+    assert blob.size == len("<h1>Politik</h1>".encode("utf-8"))
+
+
+def test_store_json_uses_canonical_form(app):
+    assert store_json({"a": 1, "b": 2}) == store_json({"b": 2, "a": 1})
+    db.session.commit()
+    assert ContentBlob.query.count() == 1
@@ -0,0 +1,83 @@
+import pytest
+
+import app.routes.analysis as analysis
+from app.extensions import db
+from app.models import ScanFingerprint
+from app.routes.analysis import conditional_scan, remember_scan, save_analysis
+
+URL = "https://example.dk"
+
+
+class FakeFetcher:
+    # Serverer den aktuelle HTML og svarer 304 på If-None-Match med samme ETag
+    def __init__(self, html):
+        self.html = html
+        self.fetches = 0
+
+    def fetch(self, url, headers=None):
+        self.fetches += 1
+        etag = f'"{hash(self.html)}"'
+        if headers and headers.get("If-None-Match") == etag:
+            return {"url": url, "status": 304, "html": "", "cookies": [], "headers": {"ETag": etag}}
+        return {"url": url, "status": 200, "html": self.html, "cookies": [], "headers": {"ETag": etag}}
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    fetcher = FakeFetcher("<html><body><p>Ingen cookies her</p></body></html>")
+    monkeypatch.setattr(analysis, "http_fetcher", fetcher)
+    return fetcher
+
+
+def scan(tier="http"):
+    # Som /gdpr/analyze: scan, gem, commit og opdatér fingerprintet
+    result, probe = conditional_scan(URL, tier=tier)
+    analysis_row = save_analysis(URL, result)
+    db.session.commit()
+    remember_scan(URL, tier, result, probe, analysis_row)
+    return result, analysis_row
+
+
+def test_unchanged_page_reuses_last_analysis(app, fetcher):
+    first, first_row = scan()
+    assert not first["reused"]
+
+    second, second_row = scan()
+    assert second["reused"]
+    assert second["score"] == first["score"]
+    assert "reused_from" not in second
+    assert second_row.snapshot_id == first_row.snapshot_id
+
+
+def test_changed_page_bypasses_scan_cache(app, fetcher):
+    first, first_row = scan()
+
+    # Siden får et cookie-banner; scan-cachen har stadig resultatet fra før
+    fetcher.html = (
+        "<html><body><div class='cookie-banner'>Vi bruger cookies – accepter nødvendige eller statistik"
+        "</div><a href='/privatliv'>Privatlivspolitik</a></body></html>"
+    )
+    second, second_row = scan()
+    assert not second["reused"] and not second["cached"]
+    assert second["score"] != first["score"]
+
+    # Fingerprintet peger nu på den nye analyse, så næste scanning genbruger den
+    fingerprint = ScanFingerprint.query.filter_by(url_key=URL, tier="http").one()
+    assert fingerprint.analysis_id == second_row.id
+    third, _ = scan()
+    assert third["reused"] and third["score"] == second["score"]
+
+
+def test_cached_result_does_not_update_fingerprint(app, fetcher):
+    result = {"score": 10, "findings": [], "missing": [], "suggestions": [], "cached": True, "reused": False}
+    probe = {"unchanged": False, "etag": None, "last_modified": None, "html_hash": "h", "scripts_hash": "s"}
+    row = save_analysis(URL, result)
+    db.session.commit()
+    remember_scan(URL, "http", result, probe, row)
+    assert ScanFingerprint.query.count() == 0
+
+
+def test_http_tier_reuses_probe_html(app, fetcher):
+    scan()
+    # Én hentning til probe'en – HTTP-tieren genbruger siden i stedet for at hente igen
+    assert fetcher.fetches == 1
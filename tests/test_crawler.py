@@ -0,0 +1,45 @@
+from utils.crawler import internal_link, sitemap_urls
+
+
+class FakeFetcher:
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.fetched = []
+
+    def fetch(self, url, headers=None):
+        self.fetched.append(url)
+        if url not in self.bodies:
+            raise IOError("404")
+        return {"html": self.bodies[url]}
+
+
+def urlset(*locs):
+    return "<urlset>" + "".join(f"<url><loc>{loc}</loc></url>" for loc in locs) + "</urlset>"
+
+
+def test_internal_link():
+    assert internal_link("/om-os#team", "https://www.example.dk/", "example.dk") == "https://www.example.dk/om-os"
+    assert internal_link("https://andet.dk/", "https://example.dk/", "example.dk") is None
+    assert internal_link("/brochure.pdf", "https://example.dk/", "example.dk") is None
+    assert internal_link("mailto:a@example.dk", "https://example.dk/", "example.dk") is None
+
+
+def test_sitemap_index_is_limited_to_same_site():
+    fetcher = FakeFetcher({
+        "https://example.dk/sitemap.xml": (
+            "<sitemapindex><sitemap><loc>https://evil.example/sitemap.xml</loc></sitemap>"
+            "<sitemap><loc>https://www.example.dk/pages.xml</loc></sitemap></sitemapindex>"
+        ),
+        "https://evil.example/sitemap.xml": urlset("https://evil.example/a"),
+        "https://www.example.dk/pages.xml": urlset(
+            "https://www.example.dk/kontakt", "https://evil.example/b", "https://example.dk/fil.pdf"
+        ),
+    })
+    urls = sitemap_urls(fetcher, "https://example.dk", limit=10)
+    assert urls == ["https://www.example.dk/kontakt"]
+    assert "https://evil.example/sitemap.xml" not in fetcher.fetched
+
+
+def test_sitemap_limit():
+    fetcher = FakeFetcher({"https://example.dk/sitemap.xml": urlset(*(f"https://example.dk/{i}" for i in range(5)))})
+    assert sitemap_urls(fetcher, "https://example.dk/", limit=2) == ["https://example.dk/0", "https://example.dk/1"]
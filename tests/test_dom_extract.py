@@ -0,0 +1,34 @@
+import pytest
+
+from utils.dom_extract import extract_features
+
+
+@pytest.mark.parametrize("chunk_size", [3, 7, 64 * 1024])
+def test_features_do_not_depend_on_chunk_size(chunk_size):
+    html = (
+        "<html><body><script src='/JS/Klaro.js'></script>"
+        "<div>Vælg nødvendige cookies</div>"
+        "<a href='/Privatliv'>Læs vores privatlivspolitik</a>"
+        "<form><input name='email'> Jeg giver samtykke</form>"
+        "</body></html>"
+    )
+    features = extract_features(html, chunk_size=chunk_size)
+    assert features["script_sources"] == ["/js/klaro.js"]
+    assert features["links"] == ["/Privatliv"]
+    assert features["has_cookie_banner"]
+    assert features["banner_advanced_ok"]
+    assert features["has_privacy"]
+    assert features["form_count"] == 1
+    assert features["consent_near_form"]
+
+
+def test_keyword_split_across_feed_boundary():
+    # "statistik" starter få tegn før grænsen på 64 KB
+    html = "<p>" + "a" * (64 * 1024 - 10) + " statistik</p>"
+    assert extract_features(html)["banner_advanced_ok"]
+
+
+def test_hidden_text_is_not_visible():
+    features = extract_features("<script>var x = 1;</script><style>p {}</style><p>Hej</p>")
+    assert features["visible_text"] == len("hej")
+    assert features["script_count"] == 1
@@ -0,0 +1,30 @@
+from utils import findings
+from utils.findings import make, render, render_missing, render_suggestions, score
+
+
+def test_make_omits_empty_params():
+    assert make("overlay") == {"code": "overlay"}
+    assert make("early_cookies", cookies=["_ga"]) == {"code": "early_cookies", "params": {"cookies": ["_ga"]}}
+
+
+def test_render_fills_templates():
+    assert render(make("early_cookies", cookies=["_ga", "_fbp"])).startswith("Siden sætter cookies tidligt: _ga, _fbp")
+    assert render(make("cmp_found", frameworks=["Cookiebot"])) == "Samtykkestyring fundet via: Cookiebot"
+    assert render(make(findings.LEGACY, text="Gammel tekst")) == "Gammel tekst"
+
+
+def test_unknown_code_renders_as_code():
+    assert render({"code": "ukendt"}) == "ukendt"
+
+
+def test_missing_labels_only_for_required_checks():
+    items = [make("cookie_banner"), make("overlay"), make("privacy_link"), make("form_consent")]
+    assert render_missing(items) == ["Cookie-banner", "Privatlivspolitik"]
+    assert len(render_suggestions(items)) == len(items)
+
+
+def test_score_penalties():
+    assert score([]) == 100
+    assert score([make("cookie_banner")]) == 100 - findings.MISSING_PENALTY
+    assert score([make("form_consent"), make("cmp_missing")]) == 100 - 2 * findings.CONSENT_PENALTY
+    assert score([make("cookie_banner")] * 6) == 0
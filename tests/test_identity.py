@@ -0,0 +1,115 @@
+from collections import namedtuple
+
+import pytest
+from flask_jwt_extended import decode_token
+
+from app.extensions import db, user_cache
+from app.models import User
+from utils.identity import UserCache
+
+Entry = namedtuple("Entry", ["id"])
+PASSWORD = "hemmelig123"
+
+
+@pytest.fixture
+def api(app, client):
+    # Hver request i sin egen app-kontekst – ellers deler de fixturens g, og
+    # load_current_user returnerer brugeren fra den første request
+    def request(method, url, **kwargs):
+        with app.app_context():
+            return client.open(url, method=method, **kwargs)
+    return request
+
+
+def register(api, email="a@example.dk", company="Firma A/S"):
+    response = api("POST", "/api/auth/register", json={"company_name": company, "email": email, "password": PASSWORD})
+    assert response.status_code == 201
+
+
+def login(api, client, email="a@example.dk"):
+    response = api("POST", "/api/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200
+    return response.get_json()["access_token"], client.get_cookie("refresh_token").value
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_cache_expires_after_ttl(monkeypatch):
+    cache = UserCache()
+    cache.ttl = 10
+    now = [1000.0]
+    monkeypatch.setattr("utils.identity.time.monotonic", lambda: now[0])
+
+    cache.set(Entry(1))
+    assert cache.get(1) == Entry(1)
+    now[0] += 11
+    assert cache.get(1) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = UserCache()
+    cache.max_entries = 2
+    cache.set(Entry(1))
+    cache.set(Entry(2))
+    cache.get(1)
+    cache.set(Entry(3))
+    assert cache.get(2) is None
+    assert cache.get(1) and cache.get(3)
+
+
+def test_cache_disabled_with_zero_ttl():
+    cache = UserCache()
+    cache.ttl = 0
+    cache.set(Entry(1))
+    assert cache.get(1) is None
+
+
+def test_login_and_refresh_tokens_carry_claims(api, client):
+    register(api)
+    access, refresh = login(api, client)
+    user = User.query.filter_by(email="a@example.dk").one()
+
+    for token in (access, refresh):
+        claims = decode_token(token)
+        assert claims["sub"] == "a@example.dk"
+        assert (claims["uid"], claims["role"], claims["company"]) == (user.id, "user", "Firma A/S")
+
+    response = api("POST", "/api/auth/refresh", headers=auth(refresh))
+    assert response.status_code == 200
+    assert decode_token(response.get_json()["access_token"])["uid"] == user.id
+
+
+def test_refresh_uses_current_company_name(api, client):
+    register(api)
+    access, refresh = login(api, client)
+    assert api("PUT", "/api/auth/me", json={"company_name": "Nyt Navn ApS"}, headers=auth(access)).status_code == 200
+
+    response = api("POST", "/api/auth/refresh", headers=auth(refresh))
+    assert decode_token(response.get_json()["access_token"])["company"] == "Nyt Navn ApS"
+
+
+def test_profile_update_invalidates_cache(api, client):
+    register(api)
+    access, _ = login(api, client)
+    assert api("GET", "/api/auth/me", headers=auth(access)).get_json()["company_name"] == "Firma A/S"
+    hits = user_cache.hits
+
+    api("PUT", "/api/auth/me", json={"website_url": "https://firma.dk"}, headers=auth(access))
+    profile = api("GET", "/api/auth/me", headers=auth(access)).get_json()
+    assert profile["website_url"] == "https://firma.dk"
+    # PUT ramte cachen; GET bagefter måtte hente brugeren igen
+    assert user_cache.hits == hits + 1
+
+
+def test_token_for_changed_email_is_rejected(api, client):
+    register(api)
+    access, _ = login(api, client)
+    user = User.query.filter_by(email="a@example.dk").one()
+    user.email = "b@example.dk"
+    db.session.commit()
+    user_cache.clear()
+
+    assert api("GET", "/api/auth/me", headers=auth(access)).status_code == 404
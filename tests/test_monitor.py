@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db, scan_workers
+from app.models import ScanJob, User
+from utils.monitor import MONITOR, SiteMonitor, slot_start
+
+
+def make_user(email="a@example.dk"):
+    user = User(company_name="Firma", email=email, password="x", website_url="https://example.dk")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_two_monitors_in_the_same_slot_enqueue_once(app):
+    user = make_user()
+    now = slot_start(user.id, timedelta(days=7), datetime.utcnow()) + timedelta(minutes=1)
+    first, second = SiteMonitor(app), SiteMonitor(app)
+
+    # Begge "processer" ser brugeren som forfalden før nogen af dem har lagt et job
+    assert first.due_users(now) == [user] == second.due_users(now)
+    second.due_users = lambda now=None: [user]
+
+    assert first.run_due(now) == 1
+    assert second.run_due(now) == 0
+    assert ScanJob.query.filter_by(source=MONITOR).count() == 1
+
+
+def test_next_slot_gets_a_new_job(app):
+    user = make_user()
+    period = timedelta(days=7)
+    now = slot_start(user.id, period, datetime.utcnow()) + timedelta(minutes=1)
+    mon = SiteMonitor(app)
+
+    assert mon.run_due(now) == 1
+    assert mon.run_due(now + period) == 1
+    assert ScanJob.query.filter_by(source=MONITOR).count() == 2
+
+
+def test_enqueue_without_key_is_not_deduplicated(app):
+    assert scan_workers.enqueue("https://example.dk") is not None
+    assert scan_workers.enqueue("https://example.dk") is not None
+    assert ScanJob.query.count() == 2
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+import pytest
+
+from utils.pagination import decode_cursor, encode_cursor, page_limit
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 12, 30, 5, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "ikke-en-cursor", "%%%", encode_cursor(datetime(2026, 1, 1), 1)[:-3]])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("value, expected", [(None, 50), ("10", 10), ("x", 50), ("0", 1), ("-5", 1), ("1000", 200)])
+def test_page_limit(value, expected):
+    assert page_limit(value) == expected
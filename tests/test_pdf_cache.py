@@ -0,0 +1,60 @@
+import os
+import stat
+
+import pytest
+from flask import Flask
+
+from utils.pdf_cache import PdfCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    app = Flask(__name__, instance_path=str(tmp_path / "instance"))
+    return PdfCache(app)
+
+
+def store(cache, key, data=b"%PDF-1.7"):
+    path = cache.path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def test_default_dir_is_private_in_instance(cache, tmp_path):
+    assert cache.cache_dir == str(tmp_path / "instance" / "pdf-cache")
+    key = cache.key("<p>Politik</p>")
+    store(cache, key)
+
+    with cache.render("<p>Politik</p>", key) as pdf:
+        assert pdf.read() == b"%PDF-1.7"
+    assert stat.S_IMODE(os.stat(cache.cache_dir).st_mode) == 0o700
+    assert cache.renders == 0
+
+
+def test_existing_dir_is_made_private(cache):
+    os.makedirs(cache.cache_dir, mode=0o755)
+    os.chmod(cache.cache_dir, 0o755)
+    assert cache._private_dir()
+    assert stat.S_IMODE(os.stat(cache.cache_dir).st_mode) == 0o700
+
+
+def test_symlinked_dir_is_refused(cache, tmp_path):
+    os.makedirs(tmp_path / "andet")
+    os.makedirs(os.path.dirname(cache.cache_dir), exist_ok=True)
+    os.symlink(tmp_path / "andet", cache.cache_dir)
+
+    with pytest.raises(PermissionError):
+        cache.render("<p>Politik</p>")
+
+
+def test_symlinked_pdf_is_not_served(cache, tmp_path):
+    secret = tmp_path / "hemmelig.txt"
+    secret.write_text("hemmeligt")
+    key = cache.key("<p>Politik</p>")
+    path = cache.path(key)
+    os.makedirs(os.path.dirname(path))
+    os.symlink(secret, path)
+
+    assert cache.open(key) is None
+    assert cache.hits == 0
@@ -0,0 +1,75 @@
+import pytest
+
+import app.routes.policy as policy_routes
+from app.extensions import db
+from app.models import PrivacyPolicy, User
+from app.routes.policy import create_policy
+from utils.policy_engine import ENGINE_VERSION
+
+DATA = {"virksomhed_navn": "Firma A/S", "email": "info@firma.dk", "cookies": "ja"}
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    calls = []
+    render = policy_routes.render_policy_html
+
+    def counting(data, generator):
+        calls.append(data)
+        return render(data, generator)
+
+    monkeypatch.setattr(policy_routes, "render_policy_html", counting)
+    return calls
+
+
+def make_user(email):
+    user = User(company_name="Firma", email=email, password="x")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_same_input_from_same_user_returns_existing_policy(app, renders):
+    user = make_user("a@example.dk")
+    policy, html, reused = create_policy(user, DATA, ENGINE_VERSION)
+    db.session.commit()
+    assert html and not reused
+
+    # Nøglernes rækkefølge er ligegyldig (canonical_json)
+    again, html, reused = create_policy(user, dict(reversed(list(DATA.items()))), ENGINE_VERSION)
+    assert reused and html is None and again.id == policy.id
+    assert len(renders) == 1
+
+
+def test_same_input_from_other_user_reuses_html(app, renders):
+    first, html, _ = create_policy(make_user("a@example.dk"), DATA, ENGINE_VERSION)
+    db.session.commit()
+
+    other, other_html, reused = create_policy(make_user("b@example.dk"), DATA, ENGINE_VERSION)
+    db.session.commit()
+    assert not reused and other_html is None
+    assert other.id != first.id and other.html_hash == first.html_hash
+    assert other.html_output == html
+    assert len(renders) == 1
+
+
+def test_other_generator_is_not_reused(app, renders):
+    user = make_user("a@example.dk")
+    create_policy(user, DATA, ENGINE_VERSION)
+    db.session.commit()
+
+    _, html, reused = create_policy(user, DATA, "template-0")
+    db.session.commit()
+    assert html and not reused
+    assert len(renders) == 2
+    assert PrivacyPolicy.query.count() == 2
+
+
+def test_changed_input_renders_again(app, renders):
+    user = make_user("a@example.dk")
+    create_policy(user, DATA, ENGINE_VERSION)
+    db.session.commit()
+
+    _, html, reused = create_policy(user, {**DATA, "webshop": "ja"}, ENGINE_VERSION)
+    assert html and not reused
+    assert len(renders) == 2
@@ -0,0 +1,39 @@
+from utils.policy_engine import SECTIONS, cache_info, normalize, render_policy, render_section
+
+DATA = {"virksomhed_navn": "Firma A/S", "email": "info@firma.dk", "cookies": "ja", "webshop": True}
+
+
+def test_normalize_flags_and_branche():
+    options = normalize({**DATA, "nyhedsbrev": "nej", "branche": "Tandlægeklinik", "brugertyper": ["Børn"]})
+    assert options["cookies"] and options["webshop"] and not options["nyhedsbrev"]
+    assert options["branche"] == "sundhed"
+    assert options["boern"]
+
+
+def test_flag_only_sections_are_memoised():
+    render_section.cache_clear()
+    first = render_policy(DATA)
+    misses = cache_info()["misses"]
+    memo_sections = sum(1 for entry in SECTIONS if entry.memo)
+    assert misses == memo_sections
+
+    # Samme flag, anden virksomhed: kun de umemoiserede afsnit renderes igen
+    second = render_policy({**DATA, "virksomhed_navn": "Andet ApS", "email": "kontakt@andet.dk"})
+    info = cache_info()
+    assert info["misses"] == misses
+    assert info["hits"] == memo_sections
+    assert "Andet ApS" in second and "kontakt@andet.dk" in second and "Firma A/S" not in second
+    assert first.replace("Firma A/S", "").replace("info@firma.dk", "") == \
+        second.replace("Andet ApS", "").replace("kontakt@andet.dk", "")
+
+
+def test_company_fields_are_escaped():
+    html = render_policy({**DATA, "virksomhed_navn": "<script>x</script>"})
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
+
+
+def test_empty_sections_are_left_out_and_numbered():
+    html = render_policy(DATA)
+    assert "Helbredsoplysninger" not in html
+    assert "<h2>1. Hvem er vi?</h2>" in html
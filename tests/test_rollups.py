@@ -0,0 +1,82 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models import Analysis, AnalysisFinding, DailyFindingCount, DailyScanRollup, DailyVendorCount, RollupState
+from utils.rollups import ROLLUP, score_bucket
+
+NOW = datetime(2026, 3, 10, 12, 0)
+
+
+@pytest.fixture
+def rollups(app):
+    job = app.extensions["rollups"]
+    job.lag = timedelta(minutes=5)
+    job.batch_size = 1000
+    return job
+
+
+def add_analysis(created_at, score=50, vendors=None, codes=()):
+    analysis = Analysis(url="https://example.dk", score=score, vendors=vendors, created_at=created_at)
+    analysis.finding_codes = [AnalysisFinding(code=code) for code in codes]
+    db.session.add(analysis)
+    db.session.commit()
+    return analysis
+
+
+def watermark():
+    return db.session.get(RollupState, ROLLUP).last_analysis_id
+
+
+def scans(day):
+    row = db.session.get(DailyScanRollup, day)
+    return (row.scans, row.scored, row.score_sum) if row else None
+
+
+def test_score_bucket():
+    assert [score_bucket(s) for s in (0, 9, 10, 95, 100)] == [0, 0, 10, 90, 90]
+
+
+def test_watermark_counts_each_analysis_once(rollups):
+    last = add_analysis(NOW - timedelta(hours=1), score=40, vendors=["Google Analytics"], codes=["no_banner"])
+    assert rollups.run(NOW) == 1
+    assert watermark() == last.id
+
+    # Ingen nye analyser – intet tælles igen
+    assert rollups.run(NOW) == 0
+    assert scans(date(2026, 3, 10)) == (1, 1, 40)
+    assert db.session.get(DailyVendorCount, (date(2026, 3, 10), "Google Analytics")).count == 1
+    assert db.session.get(DailyFindingCount, (date(2026, 3, 10), "no_banner")).count == 1
+
+    add_analysis(NOW - timedelta(minutes=30), score=None)
+    assert rollups.run(NOW) == 1
+    assert scans(date(2026, 3, 10)) == (2, 1, 40)
+
+
+def test_recent_analyses_wait_for_the_lag(rollups):
+    first = add_analysis(NOW - timedelta(hours=1))
+    recent = add_analysis(NOW - timedelta(minutes=1))
+
+    assert rollups.run(NOW) == 1
+    assert watermark() == first.id
+
+    assert rollups.run(NOW + timedelta(minutes=10)) == 1
+    assert watermark() == recent.id
+    assert scans(date(2026, 3, 10)) == (2, 2, 100)
+
+
+def test_batches_advance_the_watermark(rollups):
+    rollups.batch_size = 2
+    for hour in range(5):
+        add_analysis(NOW - timedelta(days=1, hours=hour))
+
+    assert rollups.run(NOW) == 5
+    assert scans(date(2026, 3, 9)) == (5, 5, 250)
+
+
+def test_rebuild_counts_from_scratch(rollups):
+    add_analysis(NOW - timedelta(hours=1), score=70)
+    rollups.run(NOW)
+    assert rollups.rebuild(NOW) == 1
+    assert scans(date(2026, 3, 10)) == (1, 1, 70)
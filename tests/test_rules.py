@@ -0,0 +1,63 @@
+import pytest
+
+from utils.rules import KeywordMatcher, Rule, RuleRegistry
+
+
+def matcher(*rules):
+    return KeywordMatcher([Rule(id, patterns, "info", "") for id, patterns in rules])
+
+
+def test_finds_every_rule_in_one_pass():
+    m = matcher(("banner", ["cookie", "samtykke"]), ("policy", ["privatlivspolitik"]))
+    assert m.find("vi bruger cookies – læs vores privatlivspolitik") == {"banner", "policy"}
+    assert m.find("ingenting her") == set()
+    assert m.find("") == set()
+
+
+def test_contained_pattern_is_credited_by_longer_match():
+    # "privatliv" indeholder "privat" – et match på det lange mønster tæller for begge regler
+    m = matcher(("link", ["privat"]), ("consent", ["privatliv"]))
+    assert m.find("læs om privatliv") == {"link", "consent"}
+    assert m.find("privat område") == {"link"}
+
+
+def test_overlapping_patterns_are_all_found():
+    m = matcher(("a", ["abc"]), ("b", ["bcd"]))
+    assert m.find("abcd") == {"a", "b"}
+
+
+def test_patterns_are_literal_and_lowercased():
+    m = matcher(("cmp", ["Klaro.js"]))
+    assert m.find("/static/klaro.js") == {"cmp"}
+    assert m.find("/static/klaroxjs") == set()
+
+
+def test_matcher_without_patterns():
+    m = matcher()
+    assert m.find("cookie") == set()
+    assert m.stream().feed("cookie") == set()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 100])
+def test_stream_finds_keywords_across_chunks(size):
+    m = matcher(("banner", ["samtykke"]), ("link", ["privat"]), ("consent", ["privatliv"]))
+    text = "giv dit samtykke og læs om privatliv"
+    stream = m.stream()
+    for i in range(0, len(text), size):
+        stream.feed(text[i:i + size])
+    assert stream.hits == m.find(text) == {"banner", "link", "consent"}
+
+
+def test_registry_rejects_duplicate_rule():
+    registry = RuleRegistry()
+    registry.rule("cookie", ["cookie"])
+    with pytest.raises(ValueError):
+        registry.rule("cookie", ["cookie"])
+
+
+def test_registry_recompiles_after_new_rule():
+    registry = RuleRegistry()
+    registry.rule("cookie", ["cookie"])
+    assert registry.find("gdpr") == set()
+    registry.rule("gdpr", ["gdpr"])
+    assert registry.find("gdpr og cookies") == {"cookie", "gdpr"}
@@ -0,0 +1,55 @@
+import threading
+
+from app.extensions import db, scan_workers
+from app.models import ScanJob
+from utils.scan_jobs import BACKGROUND_PRIORITY, INTERACTIVE_PRIORITY, QUEUED, RUNNING
+
+
+def test_job_is_claimed_once(app):
+    job_id = scan_workers.enqueue("https://example.dk").id
+    claims = []
+    barrier = threading.Barrier(4)
+
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            claimed = scan_workers._claim()
+            claims.append(claimed.id if claimed else None)
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert claims.count(job_id) == 1
+    assert db.session.get(ScanJob, job_id).status == RUNNING
+
+
+def test_claimed_job_is_not_claimed_again(app):
+    scan_workers.enqueue("https://example.dk")
+    assert scan_workers._claim() is not None
+    assert scan_workers._claim() is None
+
+
+def test_background_budget(app):
+    scan_workers.background_budget = 1
+    first = scan_workers.enqueue("https://a.example", priority=BACKGROUND_PRIORITY)
+    second = scan_workers.enqueue("https://b.example", priority=BACKGROUND_PRIORITY)
+
+    assert scan_workers._claim().id == first.id
+    # Budgettet er brugt – det næste baggrundsjob bliver i køen
+    assert scan_workers._claim() is None
+    assert db.session.get(ScanJob, second.id).status == QUEUED
+
+
+def test_interactive_jobs_run_while_budget_is_used(app):
+    scan_workers.background_budget = 1
+    scan_workers.enqueue("https://a.example", priority=BACKGROUND_PRIORITY)
+    waiting = scan_workers.enqueue("https://b.example", priority=BACKGROUND_PRIORITY)
+    assert scan_workers._claim() is not None
+
+    interactive = scan_workers.enqueue("https://c.example", priority=INTERACTIVE_PRIORITY)
+    assert scan_workers._claim().id == interactive.id
+    assert db.session.get(ScanJob, waiting.id).status == QUEUED
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from app import create_app
+from app.extensions import db
+from app.models import Analysis, User, UserScoreStats
+from utils.score_stats import TREND_ALPHA, rebuild_score_stats
+
+
+def make_user():
+    user = User(company_name="Firma", email="a@example.dk", password="x")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_analysis(user, score, day):
+    db.session.add(Analysis(user_id=user.id, url="https://example.dk", score=score,
+                            created_at=datetime(2026, 1, day)))
+    db.session.commit()
+
+
+def test_stats_follow_each_new_analysis(app):
+    user = make_user()
+    for day, score in enumerate((40, 80, 60), start=1):
+        add_analysis(user, score, day)
+
+    stats = db.session.get(UserScoreStats, user.id)
+    assert (stats.analysis_count, stats.score_sum) == (3, 180)
+    assert (stats.min_score, stats.max_score) == (40, 80)
+    assert (stats.previous_score, stats.last_score) == (80, 60)
+    trend = (40 * (1 - TREND_ALPHA) + 80 * TREND_ALPHA) * (1 - TREND_ALPHA) + 60 * TREND_ALPHA
+    assert abs(stats.trend - trend) < 1e-9
+    assert stats.last_scan_at == datetime(2026, 1, 3)
+
+
+def test_analysis_without_user_or_score_is_ignored(app):
+    user = make_user()
+    db.session.add(Analysis(url="https://example.dk", score=50))
+    db.session.add(Analysis(user_id=user.id, url="https://example.dk", score=None))
+    db.session.commit()
+    assert UserScoreStats.query.count() == 0
+
+
+def test_listener_is_registered_once(app, tmp_path):
+    # create_app flere gange i samme proces (fx i tests) må ikke tælle dobbelt
+    create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'andet.db'}", "RATELIMIT_STORAGE_URI": "memory://"})
+    user = make_user()
+    add_analysis(user, 70, 1)
+    assert db.session.get(UserScoreStats, user.id).analysis_count == 1
+
+
+def test_rebuild_matches_incremental_stats(app):
+    user = make_user()
+    for day, score in enumerate((90, 30), start=1):
+        add_analysis(user, score, day)
+    before = db.session.get(UserScoreStats, user.id)
+    before = (before.analysis_count, before.score_sum, before.last_score, before.trend)
+    db.session.expire_all()
+
+    assert rebuild_score_stats() == 1
+    after = db.session.get(UserScoreStats, user.id)
+    assert (after.analysis_count, after.score_sum, after.last_score, after.trend) == before
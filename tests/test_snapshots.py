@@ -0,0 +1,45 @@
+from app.extensions import db
+from app.models import Analysis, ScanSnapshot
+from utils.scanner import BROWSER, tier_map
+from utils.snapshots import decode_snapshot, rescore_all, snapshot_hash, take_snapshot
+
+URL = "https://example.dk"
+HTML = '<html><body><script src="https://www.google-analytics.com/analytics.js"></script></body></html>'
+
+
+def stored_analysis(network=None):
+    static = {"script_sources": ["https://www.google-analytics.com/analytics.js"]}
+    runtime = {"early_cookies": [], "overlay_found": None}
+    data = decode_snapshot(take_snapshot(URL, HTML, static, runtime, network, tier_map(BROWSER, BROWSER, BROWSER)))
+    snapshot = ScanSnapshot(hash=snapshot_hash(data), url=URL, data=data, size=len(data))
+    # Leverandørerne er gemt med en ældre trackerliste
+    analysis = Analysis(url=URL, score=0, findings=[], vendors=["Forældet"], snapshot=snapshot)
+    db.session.add(analysis)
+    db.session.commit()
+    return analysis
+
+
+def test_rescore_recomputes_vendors_from_snapshot(app):
+    analysis = stored_analysis()
+    totals = rescore_all(workers=1)
+
+    db.session.refresh(analysis)
+    assert totals["analyses"] == 1
+    assert analysis.vendors == ["Google Analytics"]
+    assert analysis.rescored_at is not None
+
+
+def test_rescore_includes_network_vendors(app):
+    analysis = stored_analysis(network={"third_party_hosts": ["connect.facebook.net", "www.google-analytics.com"]})
+    rescore_all(workers=1)
+
+    db.session.refresh(analysis)
+    assert analysis.vendors == ["Google Analytics", "Meta Pixel"]
+
+
+def test_dry_run_keeps_vendors(app):
+    analysis = stored_analysis()
+    rescore_all(workers=1, dry_run=True)
+
+    db.session.refresh(analysis)
+    assert analysis.vendors == ["Forældet"]
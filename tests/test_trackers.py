@@ -0,0 +1,37 @@
+import json
+
+from utils.trackers import SUFFIXES_FILE, TRACKERS_FILE, TrackerIndex, get_tracker_index
+
+
+def test_registrable_domain():
+    index = get_tracker_index()
+    assert index.registrable_domain("www.example.dk") == "example.dk"
+    assert index.registrable_domain("shop.example.co.uk") == "example.co.uk"
+    assert index.registrable_domain("127.0.0.1") == "127.0.0.1"
+
+
+def test_lookup_matches_subdomains():
+    index = get_tracker_index()
+    match = index.lookup("ssl.google-analytics.com")
+    assert match["vendor"] == "Google Analytics"
+    assert index.lookup("example.dk") is None
+
+
+def test_classify_third_party():
+    index = get_tracker_index()
+    assert index.classify("/js/app.js", "example.dk") is None
+    result = index.classify("https://www.googletagmanager.com/gtm.js", "example.dk")
+    assert result["third_party"] and result["category"] == "tag_manager"
+    assert not index.classify("https://cdn.example.dk/a.js", "example.dk")["third_party"]
+
+
+def test_extra_list_in_disconnect_format(tmp_path):
+    path = tmp_path / "services.json"
+    path.write_text(json.dumps({"categories": {
+        "Advertising": [{"AdCo": {"https://adco.example/": ["adco.example"], "performance": "true"}}],
+        "Analytics": [{"Dublet": {"https://x.example/": ["google-analytics.com"]}}],
+    }}))
+    index = TrackerIndex.from_files(TRACKERS_FILE, SUFFIXES_FILE, extra_paths=[str(path)])
+    assert index.lookup("cdn.adco.example")["category"] == "advertising"
+    # trackers.json vinder ved dubletter
+    assert index.lookup("google-analytics.com")["vendor"] == "Google Analytics"
@@ -0,0 +1,35 @@
+import pytest
+
+from utils.urls import normalize_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("example.dk", "https://example.dk"),
+    ("  https://example.dk/  ", "https://example.dk"),
+    ("https://Example.DK/Om-Os/", "https://example.dk/Om-Os"),
+    ("http://example.dk:80/", "http://example.dk"),
+    ("https://example.dk:443/", "https://example.dk"),
+    ("https://example.dk:8443/", "https://example.dk:8443"),
+    ("http://example.dk:443/", "http://example.dk:443"),
+    ("https://example.dk/side#kontakt", "https://example.dk/side"),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_tracking_params_are_removed():
+    url = "https://example.dk/?utm_source=nyhedsbrev&UTM_Medium=mail&fbclid=abc&gclid=x&_ga=1&side=2"
+    assert normalize_url(url) == "https://example.dk?side=2"
+
+
+def test_query_is_sorted_and_blank_values_kept():
+    assert normalize_url("https://example.dk/s?b=2&a=1&tom=") == "https://example.dk/s?a=1&b=2&tom="
+
+
+def test_equivalent_urls_share_key():
+    keys = {
+        normalize_url("example.dk"),
+        normalize_url("https://EXAMPLE.dk/"),
+        normalize_url("https://example.dk/?utm_campaign=x#top"),
+    }
+    assert len(keys) == 1
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import zlib
+
+from sqlalchemy.exc import IntegrityError
+
+
+# Indholdsadresseret lager til politik-HTML og form-input: hvert unikt indhold
+# gemmes én gang, zlib-komprimeret, under sha256 af det ukomprimerede indhold.
+# PrivacyPolicy og PolicyLog peger på blobs via hash.
+def canonical_json(data):
+    # Samme input giver samme bytes uanset nøglernes rækkefølge
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def pack(text):
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def unpack(data):
+    return zlib.decompress(data).decode("utf-8")
+
+
+def store_text(text):
+    # Tilføjer bloben til sessionen hvis den ikke findes – kalderen committer.
+    # Returnerer hashen.
+    from app.extensions import db
+    from app.models import ContentBlob
+
+    digest = content_hash(text)
+    if db.session.get(ContentBlob, digest) is None:
+        # Savepoint, så en samtidig indsættelse af samme blob ikke ruller
+        # kalderens transaktion tilbage
+        try:
+            with db.session.begin_nested():
+                db.session.add(ContentBlob(hash=digest, data=pack(text), size=len(text.encode("utf-8"))))
+        except IntegrityError:
+            pass
+    return digest
+
+
+def store_json(data):
+    return store_text(canonical_json(data))
+
+
+def storage_report():
+    # Logisk størrelse (som hvis hver række havde sin egen kopi) mod det der
+    # faktisk ligger i content_blob
+    from app.extensions import db
+    from app.models import ContentBlob, PrivacyPolicy, PolicyLog
+
+    references = [
+        (PrivacyPolicy, PrivacyPolicy.data_hash),
+        (PrivacyPolicy, PrivacyPolicy.html_hash),
+        (PolicyLog, PolicyLog.input_hash),
+        (PolicyLog, PolicyLog.output_hash),
+    ]
+    logical = 0
+    refs = 0
+    for model, column in references:
+        count, size = db.session.query(db.func.count(), db.func.coalesce(db.func.sum(ContentBlob.size), 0)).select_from(
+            model
+        ).join(ContentBlob, ContentBlob.hash == column).one()
+        refs += count
+        logical += int(size)
+
+    blobs, raw, stored = db.session.query(
+        db.func.count(),
+        db.func.coalesce(db.func.sum(ContentBlob.size), 0),
+        db.func.coalesce(db.func.sum(db.func.length(ContentBlob.data)), 0)
+    ).one()
+    return {
+        "references": refs,
+        "blobs": blobs,
+        "logical_bytes": logical,
+        "unique_bytes": int(raw),
+        "stored_bytes": int(stored),
+        "saved_bytes": logical - int(stored),
+        "ratio": round(logical / int(stored), 1) if stored else None
+    }
@@ -0,0 +1,263 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from utils.network_capture import stop_capture
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPoolTimeout(Exception):
+    pass
+
+
+class BrowserSession:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.broken = False
+        self.created_at = time.monotonic()
+
+
+# Begrænset pulje af genbrugelige headless Chrome-sessioner.
+# Sessioner lånes ud pr. scanning via session() og nulstilles (cookies, storage,
+# faner) inden de lægges tilbage. En session kasseres efter max_uses scanninger,
+# eller hvis Chrome er gået ned undervejs.
+class BrowserPool:
+    def __init__(self, app=None):
+        self.size = 2
+        self.max_uses = 50
+        self.checkout_timeout = 60
+        self.page_load_timeout = 30
+        self.network_log = False
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._driver_path = None
+        self._alive = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._checkouts = 0
+        self._launched = 0
+        self._recycled = 0
+        self._crashed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.size = app.config.get("BROWSER_POOL_SIZE", self.size)
+        self.max_uses = app.config.get("BROWSER_POOL_MAX_USES", self.max_uses)
+        self.checkout_timeout = app.config.get("BROWSER_POOL_CHECKOUT_TIMEOUT", self.checkout_timeout)
+        self.page_load_timeout = app.config.get("BROWSER_PAGE_LOAD_TIMEOUT", self.page_load_timeout)
+        self.network_log = app.config.get("SCAN_NETWORK_CAPTURE", self.network_log)
+        self._slots = threading.BoundedSemaphore(self.size)
+
+        app.extensions["browser_pool"] = self
+        atexit.register(self.shutdown)
+
+        if app.config.get("BROWSER_POOL_PREWARM"):
+            threading.Thread(target=self.warm, name="browser-pool-warm", daemon=True).start()
+
+    # --- Chrome ---
+    def _options(self):
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        if self.network_log:
+            # CDP-netværksevents til utils.network_capture
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        return options
+
+    def _launch(self):
+        if self._driver_path is None:
+            # ChromeDriverManager slår op på nettet – kør det kun én gang pr. proces
+            self._driver_path = ChromeDriverManager().install()
+
+        driver = webdriver.Chrome(service=Service(self._driver_path), options=self._options())
+        driver.set_page_load_timeout(self.page_load_timeout)
+        with self._lock:
+            self._launched += 1
+        return BrowserSession(driver)
+
+    def _quit(self, session):
+        try:
+            session.driver.quit()
+        except Exception:
+            logger.warning("Kunne ikke lukke Chrome-session", exc_info=True)
+        with self._lock:
+            self._alive -= 1
+
+    def _reset(self, session):
+        driver = session.driver
+
+        # Luk ekstra faner/vinduer som siden har åbnet
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        origin = driver.execute_script("return window.location.origin")
+        if origin and origin.startswith("http"):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                "origin": origin,
+                "storageTypes": "local_storage,indexeddb,websql,service_workers,cache_storage",
+            })
+        try:
+            driver.execute_script("window.sessionStorage.clear();")
+        except WebDriverException:
+            # about:blank og fejlsider har ingen storage
+            pass
+
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.get("about:blank")
+        if self.network_log:
+            stop_capture(driver)
+
+    # --- Udlån ---
+    def _take(self, deadline):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_launch = self._alive < self.size
+                if can_launch:
+                    self._alive += 1
+
+            if can_launch:
+                try:
+                    return self._launch()
+                except Exception:
+                    with self._lock:
+                        self._alive -= 1
+                    raise
+
+            # En anden tråd (fx warm) er ved at starte den sidste session
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise BrowserPoolTimeout("Ingen ledig browser-session")
+            try:
+                return self._idle.get(timeout=remaining)
+            except queue.Empty:
+                raise BrowserPoolTimeout("Ingen ledig browser-session")
+
+    def checkout(self):
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+
+        with self._lock:
+            self._waiting += 1
+        try:
+            if not self._slots.acquire(timeout=self.checkout_timeout):
+                raise BrowserPoolTimeout("Ingen ledig browser-session")
+            try:
+                session = self._take(deadline)
+            except Exception:
+                self._slots.release()
+                raise
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        waited = time.monotonic() - started
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        session.uses += 1
+        return session
+
+    def release(self, session):
+        try:
+            if session.broken:
+                with self._lock:
+                    self._crashed += 1
+                self._quit(session)
+            elif session.uses >= self.max_uses:
+                with self._lock:
+                    self._recycled += 1
+                self._quit(session)
+            else:
+                try:
+                    self._reset(session)
+                except Exception:
+                    logger.warning("Nulstilling af Chrome-session fejlede – kasserer den", exc_info=True)
+                    with self._lock:
+                        self._crashed += 1
+                    self._quit(session)
+                else:
+                    self._idle.put(session)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def session(self):
+        session = self.checkout()
+        try:
+            yield session.driver
+        except WebDriverException:
+            session.broken = True
+            raise
+        finally:
+            self.release(session)
+
+    # --- Drift ---
+    def warm(self):
+        while True:
+            with self._lock:
+                if self._alive >= self.size:
+                    return
+                self._alive += 1
+            try:
+                self._idle.put(self._launch())
+            except Exception:
+                with self._lock:
+                    self._alive -= 1
+                logger.exception("Kunne ikke forvarme browser-pulje")
+                return
+
+    def shutdown(self):
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._quit(session)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "alive": self._alive,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "launched": self._launched,
+                "recycled": self._recycled,
+                "crashed": self._crashed,
+                "avg_wait_ms": round(self._wait_total / self._checkouts * 1000, 1) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 1),
+            }
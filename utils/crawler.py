@@ -0,0 +1,231 @@
+import logging
+import queue
+import re
+import threading
+from urllib.parse import urljoin, urlsplit
+
+from utils.scanner import build_report, tier_map, BROWSER
+from utils.urls import normalize_url
+from utils.findings import missing_codes
+
+logger = logging.getLogger(__name__)
+
+# Links til filer der ikke er HTML-sider følges ikke
+SKIPPED_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".zip", ".rar",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".csv", ".xml", ".json", ".txt",
+    ".css", ".js", ".mp3", ".mp4", ".mov", ".webm", ".woff", ".woff2",
+)
+
+SITEMAP_LOC = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.IGNORECASE)
+MAX_CHILD_SITEMAPS = 3
+
+
+def site_host(url):
+    # www.example.dk og example.dk regnes som samme site
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def same_site(url, host):
+    return urlsplit(url).scheme in ("http", "https") and site_host(url) == host
+
+
+def internal_link(href, page_url, host):
+    # Absolut URL uden fragment hvis linket peger på en HTML-side på samme site
+    if href.startswith(("mailto:", "tel:", "javascript:", "#")):
+        return None
+    url = urljoin(page_url, href.strip()).split("#", 1)[0]
+    if not same_site(url, host):
+        return None
+    if urlsplit(url).path.lower().endswith(SKIPPED_EXTENSIONS):
+        return None
+    return url
+
+
+def sitemap_urls(fetcher, url, limit):
+    # URL'er fra /sitemap.xml (og de første under-sitemaps i et sitemap-index).
+    # Alle <loc> – også under-sitemaps – skal ligge på samme site som url
+    parts = urlsplit(url)
+    host = site_host(url)
+    headers = {"Accept": "application/xml,text/xml;q=0.9,*/*;q=0.8"}
+    pending = [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+    children = 0
+    urls = []
+
+    while pending and len(urls) < limit:
+        try:
+            body = fetcher.fetch(pending.pop(0), headers=headers)["html"]
+        except Exception as e:
+            logger.info("Intet sitemap for %s: %s", url, e)
+            continue
+
+        locs = SITEMAP_LOC.findall(body)
+        if "<sitemapindex" in body.lower():
+            for loc in locs:
+                if children < MAX_CHILD_SITEMAPS and same_site(loc, host):
+                    pending.append(loc)
+                    children += 1
+            continue
+        pages = [link for link in (internal_link(loc, url, host) for loc in locs) if link]
+        urls += pages[:limit - len(urls)]
+
+    return urls
+
+
+# Crawler et site fra en start-URL: sider scannes parallelt af et antal
+# workers, der hver låner én browser-session fra puljen for hele crawlet.
+# Nye interne links lægges i køen indtil max_depth eller max_pages er nået;
+# URL'er dedupliceres på normalize_url.
+class SiteCrawler:
+    def __init__(self, app, pool, inspect, max_depth=2, max_pages=20, workers=2):
+        self.app = app
+        self.pool = pool
+        self.inspect = inspect      # (driver, url) -> (static, runtime)
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = workers
+
+        self._frontier = queue.Queue()
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._pending = 0
+        self._pages = []
+        self._host = None
+
+    def crawl(self, start_url, seeds=()):
+        self._host = site_host(start_url)
+        self._add(start_url, 0)
+        for url in seeds:
+            if same_site(url, self._host):
+                self._add(url, 1)
+
+        threads = [
+            threading.Thread(target=self._worker, name=f"crawl-worker-{i}", daemon=True)
+            for i in range(max(1, self.workers))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Sider der stadig ligger i køen, fordi ingen worker fik en browser
+        while not self._frontier.empty():
+            url, depth = self._frontier.get_nowait()
+            self._pages.append({"url": url, "depth": depth, "error": "Ingen ledig browser-session"})
+
+        # Startsiden først, derefter efter dybde
+        return sorted(self._pages, key=lambda p: p["depth"])
+
+    def _add(self, url, depth):
+        key = normalize_url(url)
+        with self._lock:
+            if key in self._seen or len(self._seen) >= self.max_pages:
+                return
+            self._seen.add(key)
+            self._pending += 1
+        self._frontier.put((url, depth))
+
+    def _done(self, page):
+        with self._lock:
+            self._pages.append(page)
+            self._pending -= 1
+
+    def _worker(self):
+        with self.app.app_context():
+            while True:
+                acquired = False
+                try:
+                    with self.pool.session() as driver:
+                        acquired = True
+                        self._drain(driver)
+                    return
+                except Exception:
+                    if not acquired:
+                        logger.warning("Crawl-worker fik ingen browser-session", exc_info=True)
+                        return
+                    # Chrome gik ned midt i en side – fortsæt med en ny session
+
+    def _drain(self, driver):
+        while True:
+            try:
+                url, depth = self._frontier.get(timeout=0.2)
+            except queue.Empty:
+                with self._lock:
+                    if not self._pending:
+                        return
+                continue
+
+            try:
+                static, runtime = self.inspect(driver, url)
+            except Exception as e:
+                logger.info("Crawl af %s fejlede: %s", url, e)
+                self._done({"url": url, "depth": depth, "error": str(e)})
+                raise
+
+            if depth < self.max_depth:
+                for href in static["links"]:
+                    link = internal_link(href, url, self._host)
+                    if link:
+                        self._add(link, depth + 1)
+
+            self._done({"url": url, "depth": depth, "static": static, "runtime": runtime})
+
+
+def aggregate_site(pages):
+    # Samler fund fra alle sider til én rapport: et krav er opfyldt hvis det
+    # findes på mindst én side (fx privatlivslink i footer på en underside),
+    # mens formularer uden samtykketekst og tidlige cookies tæller fra alle sider
+    scanned = [p for p in pages if "error" not in p]
+    if not scanned:
+        return {"error": pages[0]["error"] if pages else "Ingen sider scannet"}
+
+    statics = [p["static"] for p in scanned]
+    runtimes = [p["runtime"] for p in scanned]
+
+    def union(lists):
+        merged = []
+        for items in lists:
+            for item in items:
+                if item not in merged:
+                    merged.append(item)
+        return merged
+
+    vendors = {}
+    for static in statics:
+        for vendor in static["vendors"]:
+            vendors.setdefault(vendor["name"], vendor)
+
+    overlays = [r["overlay_found"] for r in runtimes]
+    static = {
+        "has_cookie_banner": any(s["has_cookie_banner"] for s in statics),
+        "banner_advanced_ok": any(s["banner_advanced_ok"] for s in statics),
+        "has_privacy": any(s["has_privacy"] for s in statics),
+        "form_count": sum(s["form_count"] for s in statics),
+        "consent_near_form": all(s["consent_near_form"] or not s["form_count"] for s in statics),
+        "third_party": union(s["third_party"] for s in statics),
+        "vendors": list(vendors.values()),
+        "found_frameworks": union(s["found_frameworks"] for s in statics)
+    }
+    runtime = {
+        "early_cookies": union(r["early_cookies"] for r in runtimes),
+        "overlay_found": True if True in overlays else (False if False in overlays else None)
+    }
+
+    report = build_report(static, runtime, tier_map(BROWSER, BROWSER, BROWSER))
+    report["pages"] = [page_summary(p) for p in pages]
+    report["page_count"] = len(scanned)
+    return report
+
+
+def page_summary(page):
+    if "error" in page:
+        return {"url": page["url"], "depth": page["depth"], "error": page["error"]}
+
+    report = build_report(page["static"], page["runtime"], tier_map(BROWSER, BROWSER, BROWSER))
+    return {
+        "url": page["url"],
+        "depth": page["depth"],
+        "score": report["score"],
+        "missing": missing_codes(report["findings"])
+    }
@@ -0,0 +1,139 @@
+from html.parser import HTMLParser
+from utils.rules import rules
+
+# Tekst i disse tags tæller ikke som synlig tekst
+HIDDEN_TAGS = {"script", "style", "noscript"}
+
+CHUNK_SIZE = 64 * 1024
+
+
+# Ét gennemløb over markup: samler script-srcs, links, linktekster,
+# formulartekster og keyword-hits mens parseren kører, i stedet for at bygge et
+# BeautifulSoup-træ og gå det igennem flere gange. Tekst og script-srcs
+# lowercases undervejs; link-hrefs beholder deres casing (bruges til crawl).
+class FeatureParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.script_sources = []
+        self.script_count = 0
+        self.links = []
+        self.banner_advanced_ok = False
+        self.visible_text = 0
+        self.has_privacy = False
+        self.form_count = 0
+        self.consent_near_form = False
+
+        self._hidden_depth = 0
+        self._anchors = []   # tekstbuffere for åbne <a>
+        self._forms = []     # tekstbuffere for åbne <form>
+        self._text = []      # den aktuelle tekstnode – kan komme i flere bidder
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag == "script":
+            self.script_count += 1
+            src = dict(attrs).get("src")
+            if src:
+                self.script_sources.append(src.lower())
+
+        if tag in HIDDEN_TAGS:
+            self._hidden_depth += 1
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+            self._anchors.append([])
+        elif tag == "form":
+            self.form_count += 1
+            self._forms.append([])
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag in HIDDEN_TAGS:
+            if self._hidden_depth:
+                self._hidden_depth -= 1
+        elif tag == "a" and self._anchors:
+            self._close_anchor()
+        elif tag == "form" and self._forms:
+            self._close_form()
+
+    def handle_data(self, data):
+        # Parseren afleverer en tekstnode i flere kald, når den krydser en
+        # feed-grænse; teksten samles og behandles først ved næste tag
+        self._text.append(data)
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        data = "".join(self._text).lower()
+        self._text = []
+
+        # Teksten i et element tælles med i alle omsluttende <a>/<form>
+        if self._anchors:
+            self._anchors[-1].append(data)
+        if self._forms:
+            self._forms[-1].append(data)
+
+        stripped = data.strip()
+        if not stripped:
+            return
+        if not self.banner_advanced_ok:
+            self.banner_advanced_ok = "banner_categories" in rules.find(stripped)
+        if not self._hidden_depth:
+            self.visible_text += len(stripped)
+
+    def handle_comment(self, data):
+        self._flush_text()
+        # Kommentarer indgik i den gamle find_all(string=True)-tekst
+        if not self.banner_advanced_ok:
+            self.banner_advanced_ok = "banner_categories" in rules.find(data.strip().lower())
+
+    def _close_anchor(self):
+        text = "".join(self._anchors.pop())
+        if self._anchors:
+            self._anchors[-1].append(text)
+        if not self.has_privacy:
+            self.has_privacy = "privacy_link" in rules.find(text)
+
+    def _close_form(self):
+        text = "".join(self._forms.pop())
+        if self._forms:
+            self._forms[-1].append(text)
+        if not self.consent_near_form:
+            self.consent_near_form = "form_consent" in rules.find(text)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        # Uafsluttede <a>/<form> lukkes ved dokumentets slutning
+        while self._anchors:
+            self._close_anchor()
+        while self._forms:
+            self._close_form()
+
+
+def extract_features(html, chunk_size=CHUNK_SIZE):
+    parser = FeatureParser()
+
+    # Keyword-søgning i rå markup (inkl. attributter) chunk for chunk
+    markup = rules.matcher.stream()
+    has_cookie_banner = False
+
+    for start in range(0, len(html), chunk_size):
+        chunk = html[start:start + chunk_size]
+        if not has_cookie_banner:
+            has_cookie_banner = "cookie_banner" in markup.feed(chunk.lower())
+        parser.feed(chunk)
+    parser.close()
+
+    return {
+        "script_sources": parser.script_sources,
+        "script_count": parser.script_count,
+        "links": parser.links,
+        "has_cookie_banner": has_cookie_banner,
+        "banner_advanced_ok": parser.banner_advanced_ok,
+        "has_privacy": parser.has_privacy,
+        "form_count": parser.form_count,
+        "consent_near_form": parser.consent_near_form,
+        "visible_text": parser.visible_text
+    }
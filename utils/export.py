@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from flask import Response, stream_with_context
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+# Eksport af historik: rækkerne streames fra databasen med en server-side
+# cursor (stream_results) i bidder af yield_per, og hver række skrives ud så
+# snart den er læst. Hukommelsen er derfor konstant uanset antal rækker.
+def export_format(value):
+    # None ved ukendt format
+    value = (value or "ndjson").lower()
+    return value if value in FORMATS else None
+
+
+def stream_rows(query, serialize, batch_size=500):
+    rows = query.execution_options(stream_results=True, yield_per=batch_size)
+    for row in rows:
+        yield serialize(row)
+
+
+def ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+
+def csv_lines(records, columns):
+    # Ét linjeskift pr. række – bufferen tømmes efter hver linje
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return line
+
+    # BOM, så Excel åbner filen som UTF-8
+    writer.writerow(columns)
+    yield "﻿" + flush()
+    for record in records:
+        writer.writerow([csv_value(record.get(column)) for column in columns])
+        yield flush()
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def export_response(records, fmt, columns, name):
+    lines = csv_lines(records, columns) if fmt == "csv" else ndjson_lines(records)
+    filename = f"{name}-{datetime.utcnow():%Y-%m-%d}.{fmt}"
+    return Response(
+        stream_with_context(lines),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,85 @@
+from collections import namedtuple
+
+from utils.rules import rules
+
+# Et fund gemmes som {"code": ..., "params": {...}} og renderes til dansk tekst
+# først når det vises. label er teksten i "missing" (et manglende krav koster 20
+# point); consent markerer forslag der tæller med i samtykke-fradraget (5 point).
+Finding = namedtuple("Finding", ["code", "template", "label", "consent"])
+
+CATALOG = {}
+
+MISSING_PENALTY = 20
+CONSENT_PENALTY = 5
+
+# Backfillede tekster der ikke kunne genkendes, gemmes ordret
+LEGACY = "legacy"
+
+
+def finding(code, template, label=None, consent=False):
+    CATALOG[code] = Finding(code, template, label, consent)
+
+
+finding("cookie_banner", rules["cookie_banner"].message, label="Cookie-banner")
+finding("banner_categories", rules["banner_categories"].message)
+finding("overlay", "Cookie-banner skal være visuelt synligt som overlay")
+finding("privacy_link", rules["privacy_link"].message, label="Privatlivspolitik")
+finding("early_cookies",
+        lambda p: f"Siden sætter cookies tidligt: {', '.join(p['cookies'])}… (kræver samtykke først)",
+        consent=True)
+finding("form_consent", rules["form_consent"].message, consent=True)
+finding("no_third_party", "Ingen 3rd-party scripts fundet – overvej fx Analytics hvis relevant")
+finding("cmp_found", lambda p: f"Samtykkestyring fundet via: {', '.join(p['frameworks'])}", consent=True)
+finding("cmp_missing", "Ingen kendt samtykkeplatform fundet – overvej Cookiebot eller Klaro for korrekt håndtering",
+        consent=True)
+finding(LEGACY, lambda p: p["text"])
+
+
+def make(code, **params):
+    return {"code": code, "params": params} if params else {"code": code}
+
+
+def render(item):
+    entry = CATALOG.get(item["code"])
+    if entry is None:
+        return item["code"]
+    if callable(entry.template):
+        return entry.template(item.get("params", {}))
+    return entry.template
+
+
+def render_missing(findings):
+    return [CATALOG[f["code"]].label for f in findings or [] if f["code"] in CATALOG and CATALOG[f["code"]].label]
+
+
+def render_suggestions(findings):
+    return [render(f) for f in findings or []]
+
+
+def missing_codes(findings):
+    return [f["code"] for f in findings or [] if f["code"] in CATALOG and CATALOG[f["code"]].label]
+
+
+def render_pages(pages):
+    # Crawl-sider gemmer manglende krav som koder
+    if not pages:
+        return pages
+    return [
+        {**page, "missing": [CATALOG[code].label for code in page["missing"]]} if "missing" in page else page
+        for page in pages
+    ]
+
+
+def score(findings):
+    missing = sum(1 for f in findings if CATALOG[f["code"]].label)
+    consent = sum(1 for f in findings if CATALOG[f["code"]].consent)
+    return max(0, 100 - missing * MISSING_PENALTY - consent * CONSENT_PENALTY)
+
+
+def codes(findings):
+    # Unikke koder i rækkefølge – til analysis_finding-tabellen
+    seen = []
+    for f in findings or []:
+        if f["code"] not in seen:
+            seen.append(f["code"])
+    return seen
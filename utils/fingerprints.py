@@ -0,0 +1,63 @@
+import hashlib
+import re
+
+from utils.dom_extract import extract_features
+
+# Dele af markup der skifter ved hver visning uden at siden er ændret
+VOLATILE_PATTERNS = [
+    re.compile(r"\snonce=(\"[^\"]*\"|'[^']*'|[^\s>]+)", re.IGNORECASE),
+    re.compile(r"<input[^>]+name=[\"']?[^\"'>]*(csrf|token)[^>]*>", re.IGNORECASE),
+    re.compile(r"<!--.*?-->", re.DOTALL),
+]
+WHITESPACE = re.compile(r"\s+")
+
+
+def html_hash(html):
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub("", html)
+    html = WHITESPACE.sub(" ", html).strip()
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def scripts_hash(sources):
+    # Rækkefølgen af script-tags betyder ikke noget for fundene
+    return hashlib.sha256("\n".join(sorted(set(sources))).encode("utf-8")).hexdigest()
+
+
+def probe_page(fetcher, url, previous=None):
+    # Billig betinget GET før en ny scanning. previous er sidste ScanFingerprint;
+    # "unchanged" er True ved 304, eller når både markup og script-srcs har
+    # samme hash som sidst. Returnerer None hvis siden ikke kan hentes over HTTP.
+    # Ved 200 ligger den hentede side i "page", så HTTP-tieren kan genbruge den.
+    headers = {}
+    if previous is not None:
+        if previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+
+    try:
+        page = fetcher.fetch(url, headers=headers)
+    except Exception:
+        return None
+
+    if page["status"] == 304 and previous is not None:
+        return {
+            "unchanged": True,
+            "etag": previous.etag,
+            "last_modified": previous.last_modified,
+            "html_hash": previous.html_hash,
+            "scripts_hash": previous.scripts_hash
+        }
+
+    fingerprint = {
+        "etag": page["headers"].get("ETag"),
+        "last_modified": page["headers"].get("Last-Modified"),
+        "html_hash": html_hash(page["html"]),
+        "scripts_hash": scripts_hash(extract_features(page["html"])["script_sources"])
+    }
+    fingerprint["page"] = page
+    fingerprint["unchanged"] = previous is not None and (
+        previous.html_hash == fingerprint["html_hash"] and previous.scripts_hash == fingerprint["scripts_hash"]
+    )
+    return fingerprint
@@ -0,0 +1,66 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+
+# Browserløs hentning af sider til HTTP-tieret i analyze_website.
+# Én delt requests.Session med connection pooling; sessionens egen cookie-jar
+# afviser alt, så cookies fra én scanning aldrig sendes med til den næste.
+class HttpFetcher:
+    def __init__(self, app=None):
+        self.timeout = 10
+        self.pool_size = 10
+        self._session = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.timeout = app.config.get("HTTP_SCAN_TIMEOUT", self.timeout)
+        self.pool_size = app.config.get("HTTP_SCAN_POOL_SIZE", self.pool_size)
+        app.extensions["http_fetcher"] = self
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=1)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers.update({
+                        "User-Agent": USER_AGENT,
+                        "Accept": "text/html,application/xhtml+xml",
+                        "Accept-Language": "da,en;q=0.8"
+                    })
+                    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                    self._session = session
+        return self._session
+
+    def fetch(self, url, headers=None):
+        response = self.session.get(url, headers=headers, timeout=(min(5, self.timeout), self.timeout))
+        response.raise_for_status()
+
+        # Cookies sat via Set-Cookie, også undervejs i redirects
+        cookie_names = []
+        for r in response.history + [response]:
+            for cookie in r.cookies:
+                if cookie.name not in cookie_names:
+                    cookie_names.append(cookie.name)
+
+        return {
+            "url": response.url,
+            "status": response.status_code,  # 304 ved betinget request uden ændringer
+            "html": response.text,
+            "cookies": cookie_names,
+            "headers": response.headers
+        }
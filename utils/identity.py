@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app, g, has_request_context
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_HEADER = "X-DB-Queries"
+
+# Uforanderlig kopi af brugerens felter – kan deles mellem requests og tråde,
+# i modsætning til en ORM-instans der hører til én session
+UserSnapshot = namedtuple("UserSnapshot", [
+    "id", "email", "role", "company_name", "website_url", "cvr", "contact_email"
+])
+
+
+def snapshot(user):
+    return UserSnapshot(
+        user.id, user.email, user.role, user.company_name, user.website_url, user.cvr, user.contact_email
+    )
+
+
+def identity_claims(user):
+    # Claims i access- og refresh-tokens: uid gør opslaget til et primærnøgleopslag
+    return {"uid": user.id, "role": user.role, "company": user.company_name}
+
+
+# Proces-cache af brugere nøglet på id (fra JWT-claimet "uid"). Hvert opslag
+# gemmes desuden på g, så samme request kun slår op én gang. Ændringer via
+# /me invaliderer brugeren i denne proces; andre workers ser ændringen senest
+# efter ttl sekunder.
+class UserCache:
+    def __init__(self, app=None):
+        self.ttl = 60
+        self.max_entries = 10000
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("USER_CACHE_TTL", self.ttl)
+        self.max_entries = app.config.get("USER_CACHE_MAX_ENTRIES", self.max_entries)
+        app.extensions["user_cache"] = self
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, user = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return user
+
+    def set(self, user):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic(), user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                # Hvert hit er et User-opslag der ikke ramte databasen
+                "queries_saved": self.hits,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None
+            }
+
+
+def load_current_user():
+    # Brugeren bag JWT'en som UserSnapshot, eller None (ingen/ukendt identitet).
+    # Tokens uden uid (udstedt før claimet fandtes) slås op på e-mail.
+    if "current_user" in g:
+        return g.current_user
+
+    from app.extensions import db
+    from app.models import User
+
+    email = get_jwt_identity()
+    user = None
+    if email:
+        cache = current_app.extensions["user_cache"]
+        user_id = get_jwt().get("uid")
+        user = cache.get(user_id) if user_id is not None else None
+        if user is None:
+            row = db.session.get(User, user_id) if user_id is not None else User.query.filter_by(email=email).first()
+            user = snapshot(row) if row else None
+            if user:
+                cache.set(user)
+        # Et token må kun give adgang til den bruger det blev udstedt til
+        if user and user.email != email:
+            user = None
+
+    g.current_user = user
+    return user
+
+
+def track_queries(app):
+    # Tæller SQL-kald pr. request og sender antallet i X-DB-Queries
+    if not event.contains(Engine, "before_cursor_execute", _count_query):
+        event.listen(Engine, "before_cursor_execute", _count_query)
+
+    @app.after_request
+    def add_query_header(response):
+        if app.config.get("DB_QUERY_HEADER", True):
+            response.headers[QUERY_HEADER] = str(g.get("db_queries", 0))
+        return response
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.db_queries = g.get("db_queries", 0) + 1
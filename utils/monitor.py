@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from utils.scan_jobs import DONE, BACKGROUND_PRIORITY
+
+logger = logging.getLogger(__name__)
+
+MONITOR = "monitor"
+EPOCH = datetime(1970, 1, 1)
+
+
+def slot_offset(user_id, period):
+    # Fast, jævnt fordelt placering i perioden pr. bruger – kræver ingen lagret plan
+    digest = hashlib.sha1(str(user_id).encode()).hexdigest()
+    return int(digest, 16) % int(period.total_seconds())
+
+
+def slot_key(user_id, period, now):
+    # Samme nøgle i alle processer for samme bruger og slot (ScanJob.dedup_key)
+    start = slot_start(user_id, period, now)
+    return f"{MONITOR}:{user_id}:{int((start - EPOCH).total_seconds())}"
+
+
+def slot_start(user_id, period, now):
+    # Starttidspunktet for brugerens seneste slot ≤ now
+    seconds = int((now - EPOCH).total_seconds())
+    offset = slot_offset(user_id, period)
+    since = (seconds - offset) % int(period.total_seconds())
+    return now - timedelta(seconds=since)
+
+
+# Genscanner registrerede brugeres website_url med fast kadence. Hver bruger
+# har sit eget slot i perioden, så scanningerne spredes jævnt. Selve
+# scanningerne kører som baggrundsjobs i ScanWorkerPool, som højst kører
+# MONITOR_BROWSER_BUDGET af dem ad gangen og altid tager interaktive jobs først.
+class SiteMonitor:
+    def __init__(self, app=None):
+        self.app = None
+        self.period = timedelta(days=7)
+        self.tick = 60
+        self.catchup = timedelta(hours=1)
+        self.tier = "browser"
+        self.regression_threshold = 10
+        self._stop = threading.Event()
+        self._thread = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.period = timedelta(seconds=app.config.get("MONITOR_PERIOD", self.period.total_seconds()))
+        self.tick = app.config.get("MONITOR_TICK", self.tick)
+        self.catchup = timedelta(seconds=app.config.get("MONITOR_CATCHUP", self.catchup.total_seconds()))
+        self.tier = app.config.get("MONITOR_TIER", self.tier)
+        self.regression_threshold = app.config.get("MONITOR_REGRESSION_THRESHOLD", self.regression_threshold)
+        app.extensions["site_monitor"] = self
+
+        if app.config.get("MONITOR_AUTOSTART"):
+            self.start()
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="site-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def due_users(self, now=None):
+        from app.extensions import db
+        from app.models import User, ScanJob
+
+        now = now or datetime.utcnow()
+        last_jobs = dict(
+            db.session.query(ScanJob.user_id, db.func.max(ScanJob.created_at))
+            .filter(ScanJob.source == MONITOR)
+            .group_by(ScanJob.user_id)
+            .all()
+        )
+
+        due = []
+        users = User.query.filter(User.website_url.isnot(None), User.website_url != "").all()
+        for user in users:
+            start = slot_start(user.id, self.period, now)
+            last = last_jobs.get(user.id)
+            if last is not None and last >= start:
+                continue
+            # Aldrig overvågede brugere tages først ved deres slot, så en ny
+            # installation ikke scanner alle sites på én gang
+            if last is None and now - start > self.catchup:
+                continue
+            due.append(user)
+        return due
+
+    def run_due(self, now=None):
+        # Kører monitoren i flere processer (MONITOR_AUTOSTART), ser de samme
+        # brugere som forfaldne; dedup_key sikrer at kun én af dem lægger jobbet
+        from app.extensions import scan_workers
+
+        now = now or datetime.utcnow()
+        count = 0
+        for user in self.due_users(now):
+            job = scan_workers.enqueue(
+                user.website_url,
+                user_id=user.id,
+                tier=self.tier,
+                source=MONITOR,
+                priority=BACKGROUND_PRIORITY,
+                dedup_key=slot_key(user.id, self.period, now)
+            )
+            if job is not None:
+                count += 1
+        if count:
+            logger.info("Overvågning: %d sites lagt i kø", count)
+        return count
+
+    def _loop(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    self.run_due()
+                except Exception:
+                    logger.exception("Overvågning fejlede")
+            self._stop.wait(self.tick)
+
+    def check_regression(self, job):
+        # Sammenligner en overvågningsscanning med brugerens forrige analyse af
+        # samme URL og opretter en ScoreAlert hvis scoren er faldet markant
+        from app.extensions import db
+        from app.models import Analysis, ScoreAlert
+
+        analysis = job.analysis
+        if job.status != DONE or analysis is None or analysis.score is None:
+            return None
+
+        previous = Analysis.query.filter(
+            Analysis.user_id == job.user_id,
+            Analysis.url == analysis.url,
+            Analysis.id != analysis.id,
+            Analysis.score.isnot(None)
+        ).order_by(Analysis.created_at.desc()).first()
+
+        if previous is None or previous.score - analysis.score < self.regression_threshold:
+            return None
+
+        alert = ScoreAlert(
+            user_id=job.user_id,
+            url=analysis.url,
+            analysis_id=analysis.id,
+            previous_analysis_id=previous.id,
+            previous_score=previous.score,
+            score=analysis.score
+        )
+        db.session.add(alert)
+        db.session.commit()
+        logger.info("Score faldet fra %s til %s for %s", previous.score, analysis.score, analysis.url)
+        return alert
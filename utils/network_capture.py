@@ -0,0 +1,131 @@
+import json
+import logging
+from urllib.parse import urlsplit
+
+from utils.trackers import get_tracker_index
+
+logger = logging.getLogger(__name__)
+
+# Ressourcer som tjekkene ikke bruger. CSS blokeres ikke – overlay-tjekket
+# afhænger af layoutet.
+BLOCKED_URL_PATTERNS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*", "*.bmp*",
+    "*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*", "*.mov*", "*.m4v*", "*.mp3*", "*.m4a*", "*.ogg*", "*.wav*",
+]
+
+# Typisk overførselsstørrelse pr. ressourcetype – bruges til at estimere hvad
+# blokeringen har sparet, da blokerede requests aldrig får en størrelse
+AVERAGE_BYTES = {
+    "Image": 45_000,
+    "Font": 35_000,
+    "Media": 250_000,
+}
+DEFAULT_AVERAGE_BYTES = 20_000
+
+
+# Kræver at Chrome er startet med performance-logging (se BrowserPool)
+def start_capture(driver, block=True):
+    # Tøm loggen for events fra tidligere sider, så kun denne scanning tælles
+    driver.get_log("performance")
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS if block else []})
+
+
+def stop_capture(driver):
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+    driver.execute_cdp_cmd("Network.disable", {})
+    driver.get_log("performance")
+
+
+def _network_events(driver):
+    for entry in driver.get_log("performance"):
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        if message.get("method", "").startswith("Network."):
+            yield message["method"], message.get("params", {})
+
+
+def _cookie_names(headers):
+    # Set-Cookie kan komme som én header med linjeskift mellem cookies
+    for key, value in headers.items():
+        if key.lower() == "set-cookie":
+            for line in value.split("\n"):
+                name = line.split("=", 1)[0].strip()
+                if name:
+                    yield name
+
+
+def collect_capture(driver, page_url):
+    index = get_tracker_index()
+    site_domain = index.registrable_domain(urlsplit(page_url).hostname or "")
+
+    requests = {}
+    set_cookies = []
+    bytes_loaded = 0
+    blocked = 0
+    bytes_avoided = 0
+
+    for method, params in _network_events(driver):
+        request_id = params.get("requestId")
+
+        if method == "Network.requestWillBeSent":
+            requests[request_id] = {"url": params["request"]["url"], "type": params.get("type")}
+        elif method == "Network.responseReceivedExtraInfo":
+            for name in _cookie_names(params.get("headers", {})):
+                set_cookies.append((request_id, name))
+        elif method == "Network.loadingFinished":
+            bytes_loaded += int(params.get("encodedDataLength") or 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason") == "inspector":
+            blocked += 1
+            bytes_avoided += AVERAGE_BYTES.get(params.get("type"), DEFAULT_AVERAGE_BYTES)
+
+    hosts = {}
+    vendors = {}
+    for request in requests.values():
+        if not request["url"].startswith("http"):
+            continue
+        info = index.classify(request["url"], site_domain)
+        if not info or info["host"] in hosts:
+            continue
+        hosts[info["host"]] = info
+        if info["vendor"] and info["vendor"] not in vendors:
+            vendors[info["vendor"]] = {"name": info["vendor"], "category": info["category"], "domain": info["domain"]}
+
+    cookies = []
+    for request_id, name in set_cookies:
+        request = requests.get(request_id)
+        info = index.classify(request["url"], site_domain) if request else None
+        cookies.append({
+            "name": name,
+            "host": info["host"] if info else None,
+            "third_party": info["third_party"] if info else None
+        })
+
+    load_ms = _page_load_ms(driver)
+
+    # Estimeret sparet tid: de undgåede bytes ved sidens observerede gennemløb
+    saved_ms = None
+    if load_ms and bytes_loaded:
+        saved_ms = round(bytes_avoided / (bytes_loaded / load_ms))
+
+    return {
+        "request_count": len(requests),
+        "third_party_hosts": sorted(h for h, info in hosts.items() if info["third_party"]),
+        "vendors": list(vendors.values()),
+        "set_cookies": cookies,
+        "blocked_requests": blocked,
+        "bytes_loaded": bytes_loaded,
+        "bytes_avoided_estimate": bytes_avoided,
+        "load_ms": load_ms,
+        "time_saved_ms_estimate": saved_ms
+    }
+
+
+def _page_load_ms(driver):
+    return driver.execute_script(
+        "var t = performance.timing;"
+        "return t.loadEventEnd > 0 ? t.loadEventEnd - t.navigationStart : null;"
+    )
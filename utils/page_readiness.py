@@ -0,0 +1,72 @@
+import time
+
+# Kendte cookie-/samtykkebannere – dukker et af dem op, er siden klar til analyse
+BANNER_SELECTORS = [
+    "#CybotCookiebotDialog",
+    "#onetrust-banner-sdk",
+    "#usercentrics-root",
+    ".klaro .cookie-notice",
+    ".osano-cm-dialog",
+    "#cookie-banner",
+    "#cookie-notice",
+    "[class*='cookie-banner']",
+    "[class*='cookie-consent']",
+    "[id*='cookieconsent']",
+]
+
+# Installerer en MutationObserver første gang og returnerer sidens aktuelle
+# tilstand. Netværk regnes som stille når der ikke er afsluttet en ressource
+# inden for quiet-vinduet.
+READINESS_SCRIPT = """
+var selectors = arguments[0];
+if (!window.__gdprReadiness && document.documentElement) {
+    window.__gdprReadiness = {lastMutation: performance.now()};
+    new MutationObserver(function () {
+        window.__gdprReadiness.lastMutation = performance.now();
+    }).observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+}
+var lastResource = 0;
+var entries = performance.getEntriesByType('resource');
+for (var i = 0; i < entries.length; i++) {
+    if (entries[i].responseEnd > lastResource) lastResource = entries[i].responseEnd;
+}
+var banner = false;
+for (var j = 0; j < selectors.length && !banner; j++) {
+    try { banner = !!document.querySelector(selectors[j]); } catch (e) {}
+}
+return {
+    readyState: document.readyState,
+    now: performance.now(),
+    lastMutation: window.__gdprReadiness ? window.__gdprReadiness.lastMutation : performance.now(),
+    lastResource: lastResource,
+    banner: banner
+};
+"""
+
+
+def wait_until_ready(driver, max_wait=5.0, quiet_ms=500, poll_interval=0.1, banner_selectors=BANNER_SELECTORS):
+    started = time.monotonic()
+    reason = "timeout"
+
+    while True:
+        state = driver.execute_script(READINESS_SCRIPT, banner_selectors)
+
+        if state["banner"]:
+            reason = "banner"
+            break
+
+        if state["readyState"] == "complete":
+            network_idle = state["now"] - state["lastResource"] >= quiet_ms
+            dom_idle = state["now"] - state["lastMutation"] >= quiet_ms
+            if network_idle and dom_idle:
+                reason = "idle"
+                break
+
+        if time.monotonic() - started >= max_wait:
+            break
+        time.sleep(poll_interval)
+
+    return {
+        "wait_time": round(time.monotonic() - started, 3),
+        "reason": reason
+    }
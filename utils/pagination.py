@@ -0,0 +1,50 @@
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+CURSOR_HEADER = "X-Next-Cursor"
+
+
+# Keyset-paginering på (created_at, id) – nyeste først. Cursoren peger på
+# sidste række i forrige side, så hver side er ét indeksopslag uanset hvor
+# langt brugeren har bladret.
+def encode_cursor(created_at, id):
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    # ValueError ved ugyldig cursor
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except (UnicodeDecodeError, TypeError, ValueError, base64.binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def page_limit(value, default=50, maximum=200):
+    try:
+        limit = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+def keyset_page(query, created_col, id_col, cursor=None, limit=50):
+    # Returnerer (rækker, næste cursor eller None)
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.filter(or_(
+            created_col < created_at,
+            and_(created_col == created_at, id_col < id)
+        ))
+
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import os
+import stat
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.blobs import content_hash
+
+logger = logging.getLogger(__name__)
+
+
+def render_pdf(html, path):
+    # Kører i en worker-proces: WeasyPrint skriver PDF'en til en midlertidig fil,
+    # som omdøbes på plads, så en halvfærdig fil aldrig kan serveres
+    from weasyprint import HTML
+
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            HTML(string=html).write_pdf(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+# Disk-cache af renderede PDF'er, adresseret på sha256 af html_output og
+# stylesheet-versionen – samme politik renderes kun én gang, og nøglen bruges
+# som ETag. Rendering sker i en procespulje, så web-workeren ikke bruger CPU
+# på WeasyPrint; samtidige forespørgsler på samme PDF venter på samme job.
+# Når cachen fylder mere end max_bytes, slettes de mindst brugte filer.
+# Mappen ligger som standard i instance-mappen og skal være privat (0700), så
+# andre brugere på maskinen ikke kan lægge en PDF eller et symlink i cachen.
+class PdfCache:
+    def __init__(self, app=None):
+        self.cache_dir = None
+        self.max_bytes = 500 * 1024 * 1024
+        self.workers = 2
+        self.timeout = 60
+        self.stylesheet_version = "1"
+        self._executor = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+        self.evictions = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.cache_dir = app.config.get("PDF_CACHE_DIR") or os.path.join(app.instance_path, "pdf-cache")
+        self.max_bytes = app.config.get("PDF_CACHE_MAX_BYTES", self.max_bytes)
+        self.workers = app.config.get("PDF_RENDER_WORKERS", self.workers)
+        self.timeout = app.config.get("PDF_RENDER_TIMEOUT", self.timeout)
+        self.stylesheet_version = str(app.config.get("PDF_STYLESHEET_VERSION", self.stylesheet_version))
+        app.extensions["pdf_cache"] = self
+
+    def key(self, html):
+        return self.key_for_hash(content_hash(html))
+
+    def key_for_hash(self, digest):
+        # digest er sha256 af HTML'en (PrivacyPolicy.html_hash), så nøglen kan
+        # beregnes uden at hente selve HTML'en
+        return hashlib.sha256(f"{self.stylesheet_version}\0{digest}".encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pdf")
+
+    def _private_dir(self):
+        # Som SingleFlight._private_dir: cache_dir oprettes med 0700, og en
+        # eksisterende mappe bruges kun hvis den er vores egen
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            info = os.lstat(self.cache_dir)
+            if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+                raise PermissionError(f"{self.cache_dir} er ikke en mappe ejet af denne bruger")
+            if info.st_mode & 0o077:
+                os.chmod(self.cache_dir, 0o700)
+            return True
+        except OSError:
+            logger.warning("PDF-cache-mappen %s kan ikke bruges", self.cache_dir, exc_info=True)
+            return False
+
+    def open(self, key):
+        # Åben fil med den cachede PDF eller None. Filen åbnes med O_NOFOLLOW og
+        # skal være en almindelig fil ejet af os; mtime opdateres til LRU-oprydningen
+        try:
+            fd = os.open(self.path(key), os.O_RDONLY | os.O_NOFOLLOW)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.warning("Ignorerer cachet PDF %s", key, exc_info=True)
+            return None
+        info = os.fstat(fd)
+        if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid():
+            os.close(fd)
+            logger.warning("Ignorerer cachet PDF %s: ikke en fil ejet af denne bruger", key)
+            return None
+        os.utime(fd)
+        self.hits += 1
+        return os.fdopen(fd, "rb")
+
+    def render(self, html, key=None):
+        # Returnerer en åben fil med PDF'en; renderer i puljen hvis den ikke er
+        # cachet. TimeoutError hvis renderingen tager længere end timeout.
+        key = key or self.key(html)
+        if not self._private_dir():
+            raise PermissionError(f"PDF-cache-mappen {self.cache_dir} kan ikke bruges")
+        cached = self.open(key)
+        if cached is not None:
+            return cached
+        self.submit(html, key).result(timeout=self.timeout)
+        cached = self.open(key)
+        if cached is None:
+            raise FileNotFoundError(f"Renderet PDF {key} findes ikke i cachen")
+        return cached
+
+    def prefetch(self, html):
+        # Starter rendering i baggrunden (fx lige efter en politik er genereret)
+        key = self.key(html)
+        if self._private_dir() and not os.path.lexists(self.path(key)):
+            self.submit(html, key)
+        return key
+
+    def submit(self, html, key):
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            try:
+                future = self._executor.submit(render_pdf, html, self.path(key))
+            except BrokenProcessPool:
+                # En worker døde (fx OOM) – puljen kan ikke bruges igen og erstattes
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                future = self._executor.submit(render_pdf, html, self.path(key))
+            self._pending[key] = future
+            self.renders += 1
+        future.add_done_callback(lambda f: self._finished(key, f))
+        return future
+
+    def _finished(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+        if future.exception() is not None:
+            logger.error("PDF-rendering fejlede for %s", key, exc_info=future.exception())
+            return
+        self.evict()
+
+    def evict(self):
+        # Sletter de mindst brugte PDF'er, til cachen er under 90 % af max_bytes
+        with self._evict_lock:
+            files = []
+            total = 0
+            for root, _, names in os.walk(self.cache_dir):
+                for name in names:
+                    if not name.endswith(".pdf"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return
+
+            target = self.max_bytes * 0.9
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "hits": self.hits,
+            "renders": self.renders,
+            "evictions": self.evictions,
+            "pending": pending,
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,231 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from jinja2 import Environment
+
+# Øges når teksterne ændres – indgår i dedupliceringen, så ens input med
+# gamle tekster ikke genbruges (se PrivacyPolicy.generator)
+ENGINE_VERSION = "template-1"
+
+env = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+
+# Et afsnit er en forkompileret Jinja-skabelon. keys er de felter fra
+# normalize() afsnittet afhænger af; afsnit der kun afhænger af form-flagene
+# memoiseres, så kun virksomhedens egne oplysninger renderes pr. politik.
+# Et afsnit der renderer tomt, udelades.
+Section = namedtuple("Section", ["title", "template", "keys", "memo"])
+
+SECTIONS = []
+
+
+def section(title, body, keys=(), memo=True):
+    SECTIONS.append(Section(title, env.from_string(body.strip()), tuple(keys), memo))
+
+
+section("Hvem er vi?", """
+<p>{{ navn }} er dataansvarlig for behandlingen af de personoplysninger, vi modtager om dig.
+{%- if lokation %} Vi har adresse i {{ lokation }}.{% endif %}</p>
+<p>Har du spørgsmål til vores behandling af dine oplysninger, kan du kontakte os på
+<a href="mailto:{{ email }}">{{ email }}</a>.</p>
+""", keys=("navn", "email", "lokation"), memo=False)
+
+section("Hvilke oplysninger indsamler vi?", """
+<ul>
+{% if kontaktformular %}
+<li>Navn, e-mail og de oplysninger, du selv skriver, når du kontakter os via vores kontaktformular.</li>
+{% endif %}
+{% if nyhedsbrev %}
+<li>E-mailadresse og evt. navn, når du tilmelder dig vores nyhedsbrev.</li>
+{% endif %}
+{% if webshop %}
+<li>Navn, adresse, e-mail, telefonnummer og ordreoplysninger, når du handler i vores webshop.
+Betalingskortoplysninger behandles af vores betalingsudbyder og gemmes ikke hos os.</li>
+{% endif %}
+{% if cookies %}
+<li>Oplysninger om din enhed og din brug af hjemmesiden (fx IP-adresse, browsertype og besøgte sider)
+via cookies, hvis du har givet samtykke.</li>
+{% endif %}
+<li>Tekniske oplysninger, der er nødvendige for at levere hjemmesiden sikkert, fx IP-adresse i serverlogs.</li>
+</ul>
+""", keys=("kontaktformular", "nyhedsbrev", "webshop", "cookies"))
+
+section("Formål og retsgrundlag", """
+<ul>
+{% if kontaktformular %}
+<li>At besvare din henvendelse. Retsgrundlaget er vores legitime interesse i at kunne svare dig
+(databeskyttelsesforordningens artikel 6, stk. 1, litra f).</li>
+{% endif %}
+{% if nyhedsbrev %}
+<li>At sende dig vores nyhedsbrev. Retsgrundlaget er dit samtykke (artikel 6, stk. 1, litra a),
+som du til enhver tid kan trække tilbage via linket i nyhedsbrevet.</li>
+{% endif %}
+{% if webshop %}
+<li>At behandle og levere din ordre samt håndtere reklamationer. Retsgrundlaget er opfyldelse af en aftale
+(artikel 6, stk. 1, litra b) og vores forpligtelser efter bogføringsloven (artikel 6, stk. 1, litra c).</li>
+{% endif %}
+{% if cookies %}
+<li>At føre statistik over brugen af hjemmesiden og forbedre den. Retsgrundlaget er dit samtykke
+(artikel 6, stk. 1, litra a).</li>
+{% endif %}
+<li>At drive og sikre hjemmesiden. Retsgrundlaget er vores legitime interesse (artikel 6, stk. 1, litra f).</li>
+</ul>
+""", keys=("kontaktformular", "nyhedsbrev", "webshop", "cookies"))
+
+section("Helbredsoplysninger", """
+{% if branche == "sundhed" %}
+<p>Som led i vores ydelser kan vi behandle helbredsoplysninger, som er følsomme personoplysninger.
+Det sker kun, når det er nødvendigt for behandlingen, og efter databeskyttelsesforordningens artikel 9
+og sundhedslovgivningen.</p>
+{% endif %}
+""", keys=("branche",))
+
+section("Legitimation efter hvidvaskloven", """
+{% if branche == "finans" %}
+<p>Vi er underlagt hvidvaskloven og er derfor forpligtet til at indhente og opbevare
+legitimationsoplysninger, herunder CPR-nummer, i mindst 5 år efter kundeforholdets ophør.</p>
+{% endif %}
+""", keys=("branche",))
+
+section("Børn", """
+{% if boern %}
+<p>Behandler vi oplysninger om børn under 13 år på grundlag af samtykke, indhenter vi samtykket
+fra forældremyndighedens indehaver.</p>
+{% endif %}
+""", keys=("boern",))
+
+section("Modtagere af dine oplysninger", """
+<p>Vi bruger databehandlere til fx hosting og IT-drift. De behandler kun oplysningerne efter vores instruks
+og på baggrund af en databehandleraftale.</p>
+{% if webshop %}
+<p>Ved køb videregiver vi de nødvendige oplysninger til betalingsudbyder og fragtfirma, så vi kan
+gennemføre og levere din ordre.</p>
+{% endif %}
+{% if nyhedsbrev %}
+<p>Vores nyhedsbrev udsendes via en ekstern e-mailplatform, der er databehandler for os.</p>
+{% endif %}
+""", keys=("webshop", "nyhedsbrev"))
+
+section("Cookies", """
+{% if cookies %}
+<p>Vi bruger cookies til at få hjemmesiden til at fungere og – med dit samtykke – til statistik og
+markedsføring. Cookies fra tredjeparter sættes kun, hvis du har givet samtykke. Du kan til enhver tid
+ændre eller trække dit samtykke tilbage via cookie-banneret.</p>
+{% else %}
+<p>Vi anvender kun cookies, der er strengt nødvendige for, at hjemmesiden fungerer. De kræver ikke samtykke.</p>
+{% endif %}
+""", keys=("cookies",))
+
+section("Opbevaring", """
+<ul>
+{% if kontaktformular %}
+<li>Henvendelser slettes senest 12 måneder efter, at sagen er afsluttet.</li>
+{% endif %}
+{% if nyhedsbrev %}
+<li>Din e-mailadresse slettes fra modtagerlisten, når du framelder dig nyhedsbrevet.</li>
+{% endif %}
+{% if webshop %}
+<li>Ordre- og regnskabsoplysninger opbevares i 5 år efter udgangen af regnskabsåret, jf. bogføringsloven.</li>
+{% endif %}
+<li>Vi opbevarer ikke dine oplysninger længere, end det er nødvendigt til de formål, de er indsamlet til.</li>
+</ul>
+""", keys=("kontaktformular", "nyhedsbrev", "webshop"))
+
+section("Dine rettigheder", """
+<p>Du har ret til indsigt i de oplysninger, vi behandler om dig, og til at få urigtige oplysninger rettet.
+Du kan også have ret til sletning, begrænsning af behandlingen, dataportabilitet og til at gøre indsigelse
+mod behandlingen. Har du givet samtykke, kan du altid trække det tilbage.</p>
+<p>Kontakt os på <a href="mailto:{{ email }}">{{ email }}</a>, hvis du vil gøre brug af dine rettigheder.</p>
+""", keys=("email",), memo=False)
+
+section("Klage til Datatilsynet", """
+<p>Du kan klage over vores behandling af dine personoplysninger til Datatilsynet, Carl Jacobsens Vej 35,
+2500 Valby, <a href="https://www.datatilsynet.dk">www.datatilsynet.dk</a>.</p>
+""")
+
+HEADER = env.from_string("<h1>Privatlivspolitik for {{ navn }}</h1>")
+
+# Branche-tekst fra formularen -> afsnit med særlige regler
+BRANCHER = {
+    "sundhed": ("sundhed", "klinik", "læge", "tandlæge", "fysioterap", "psykolog", "kiropraktor"),
+    "finans": ("finans", "bank", "forsikring", "revision", "revisor", "regnskab", "bogføring", "ejendomsmægler"),
+}
+
+TRUE_VALUES = {"ja", "true", "1", "on", "yes", "y"}
+
+
+def flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
+
+
+def branche_key(value):
+    text = str(value or "").lower()
+    for key, words in BRANCHER.items():
+        if any(word in text for word in words):
+            return key
+    return None
+
+
+def text(value):
+    return str(value).strip() if value is not None else ""
+
+
+def normalize(data):
+    # Form-input -> de felter skabelonerne bruger; flag kan komme som bool eller "ja"/"nej"
+    brugertyper = data.get("brugertyper")
+    if isinstance(brugertyper, (list, tuple)):
+        brugertyper = " ".join(str(b) for b in brugertyper)
+    return {
+        "navn": text(data.get("virksomhed_navn")),
+        "email": text(data.get("email")),
+        "lokation": text(data.get("lokation")),
+        "kontaktformular": flag(data.get("kontaktformular")),
+        "nyhedsbrev": flag(data.get("nyhedsbrev")),
+        "webshop": flag(data.get("webshop")),
+        "cookies": flag(data.get("cookies")),
+        "branche": branche_key(data.get("branche")),
+        "boern": "børn" in text(brugertyper).lower(),
+    }
+
+
+def validate(data):
+    # Fejlbesked eller None
+    if not isinstance(data, dict):
+        return "Policy data must be an object"
+    missing = [field for field in ("virksomhed_navn", "email") if not text(data.get(field))]
+    if missing:
+        return f"Missing fields: {', '.join(missing)}"
+    return None
+
+
+@lru_cache(maxsize=512)
+def render_section(index, values):
+    return render_uncached(index, values)
+
+
+def render_uncached(index, values):
+    entry = SECTIONS[index]
+    return entry.template.render(dict(zip(entry.keys, values))).strip()
+
+
+def iter_policy(data):
+    # Politikken afsnit for afsnit (til streaming); samlet er det render_policy()
+    options = normalize(data)
+    yield HEADER.render(navn=options["navn"]) + "\n"
+    number = 0
+    for index, entry in enumerate(SECTIONS):
+        values = tuple(options[key] for key in entry.keys)
+        body = render_section(index, values) if entry.memo else render_uncached(index, values)
+        if not body:
+            continue
+        number += 1
+        yield f"<h2>{number}. {entry.title}</h2>\n{body}\n"
+
+
+def render_policy(data):
+    return "".join(iter_policy(data))
+
+
+def cache_info():
+    return render_section.cache_info()._asdict()
@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+# Høflighed over for målsites ved massescanning: højst per_host samtidige
+# scanninger pr. host, og mindst min_interval sekunder mellem to starter.
+class HostThrottle:
+    def __init__(self, min_interval=2.0, per_host=1):
+        self.min_interval = min_interval
+        self.per_host = per_host
+        self._cond = threading.Condition()
+        self._active = defaultdict(int)
+        self._next_start = {}
+
+    @contextmanager
+    def slot(self, host):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready_at = self._next_start.get(host, 0)
+                if self._active[host] < self.per_host and now >= ready_at:
+                    self._active[host] += 1
+                    self._next_start[host] = now + self.min_interval
+                    break
+                self._cond.wait(timeout=max(ready_at - now, 0.05) if now < ready_at else None)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active[host] -= 1
+                self._cond.notify_all()
+
+
+def interleave_by_host(items, host_of):
+    # Round-robin på tværs af hosts, så workers ikke alle venter på samme site
+    queues = defaultdict(list)
+    for item in items:
+        queues[host_of(item)].append(item)
+
+    ordered = []
+    while queues:
+        for host in list(queues):
+            ordered.append(queues[host].pop(0))
+            if not queues[host]:
+                del queues[host]
+    return ordered
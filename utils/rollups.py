@@ -0,0 +1,178 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+ROLLUP = "daily"
+BUCKET_SIZE = 10
+
+
+def score_bucket(score):
+    # 0-9, 10-19, ..., 90-100
+    return min(score // BUCKET_SIZE, 100 // BUCKET_SIZE - 1) * BUCKET_SIZE
+
+
+# Daglige rollups over alle analyser til admin-dashboardet. Nye analyser tælles
+# med inkrementelt fra et vandmærke (sidste behandlede analysis.id), så hver
+# kørsel kun læser det der er kommet til. Analyser yngre end lag springes over
+# til næste kørsel, så transaktioner der committer sent ikke overses.
+class RollupJob:
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 300
+        self.lag = timedelta(minutes=5)
+        self.batch_size = 1000
+        self._stop = threading.Event()
+        self._thread = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get("ROLLUP_INTERVAL", self.interval)
+        self.lag = timedelta(seconds=app.config.get("ROLLUP_LAG", self.lag.total_seconds()))
+        self.batch_size = app.config.get("ROLLUP_BATCH_SIZE", self.batch_size)
+        app.extensions["rollups"] = self
+
+        if app.config.get("ROLLUP_AUTOSTART"):
+            self.start()
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="rollups", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _loop(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    self.run()
+                except Exception:
+                    logger.exception("Rollup fejlede")
+            self._stop.wait(self.interval)
+
+    def run(self, now=None):
+        # Behandler alle nye analyser i batches; returnerer antal talte analyser
+        total = 0
+        while True:
+            count = self.run_batch(now)
+            total += count
+            if count < self.batch_size:
+                return total
+
+    def run_batch(self, now=None):
+        from app.extensions import db
+        from app.models import (
+            Analysis, AnalysisFinding, RollupState, DailyScoreBucket, DailyFindingCount, DailyVendorCount
+        )
+
+        cutoff = (now or datetime.utcnow()) - self.lag
+
+        # Låser vandmærket, så to samtidige kørsler ikke tæller det samme
+        state = RollupState.query.filter_by(name=ROLLUP).with_for_update().first()
+        if state is None:
+            state = RollupState(name=ROLLUP, last_analysis_id=0)
+            db.session.add(state)
+            db.session.flush()
+
+        rows = (
+            db.session.query(Analysis.id, Analysis.score, Analysis.vendors, Analysis.created_at)
+            .filter(Analysis.id > state.last_analysis_id)
+            .order_by(Analysis.id)
+            .limit(self.batch_size)
+            .all()
+        )
+        ready = []
+        for row in rows:
+            if row.created_at >= cutoff:
+                break
+            ready.append(row)
+        if not ready:
+            db.session.commit()
+            return 0
+
+        days = {row.id: row.created_at.date() for row in ready}
+        scans = defaultdict(lambda: [0, 0, 0])   # dag -> [scans, scored, score_sum]
+        buckets = Counter()
+        vendors = Counter()
+        for row in ready:
+            day = days[row.id]
+            scans[day][0] += 1
+            if row.score is not None:
+                scans[day][1] += 1
+                scans[day][2] += row.score
+                buckets[(day, score_bucket(row.score))] += 1
+            for vendor in row.vendors or []:
+                vendors[(day, vendor)] += 1
+
+        findings = Counter()
+        codes = db.session.query(AnalysisFinding.analysis_id, AnalysisFinding.code).filter(
+            AnalysisFinding.analysis_id.in_(list(days))
+        )
+        for analysis_id, code in codes:
+            findings[(days[analysis_id], code)] += 1
+
+        self._add_scans(scans)
+        self._add_counts(DailyScoreBucket, "bucket", buckets)
+        self._add_counts(DailyFindingCount, "code", findings)
+        self._add_counts(DailyVendorCount, "vendor", vendors)
+
+        state.last_analysis_id = ready[-1].id
+        state.updated_at = datetime.utcnow()
+        db.session.commit()
+        return len(ready)
+
+    def _add_scans(self, scans):
+        from app.extensions import db
+        from app.models import DailyScanRollup
+
+        existing = {r.day: r for r in DailyScanRollup.query.filter(DailyScanRollup.day.in_(list(scans)))}
+        for day, (count, scored, score_sum) in scans.items():
+            row = existing.get(day)
+            if row is None:
+                row = DailyScanRollup(day=day, scans=0, scored=0, score_sum=0)
+                db.session.add(row)
+            row.scans += count
+            row.scored += scored
+            row.score_sum += score_sum
+
+    def _add_counts(self, model, key_name, counts):
+        from app.extensions import db
+
+        if not counts:
+            return
+        key_col = getattr(model, key_name)
+        days = {day for day, _ in counts}
+        keys = {key for _, key in counts}
+        existing = {
+            (r.day, getattr(r, key_name)): r
+            for r in model.query.filter(model.day.in_(days), key_col.in_(keys))
+        }
+        for (day, key), count in counts.items():
+            row = existing.get((day, key))
+            if row is None:
+                row = model(day=day, count=0, **{key_name: key})
+                db.session.add(row)
+            row.count += count
+
+    def rebuild(self, now=None):
+        # Tømmer alle rollups og tæller forfra (fx efter `flask rescore`)
+        from app.extensions import db
+        from app.models import RollupState, DailyScanRollup, DailyScoreBucket, DailyFindingCount, DailyVendorCount
+
+        for model in (DailyScanRollup, DailyScoreBucket, DailyFindingCount, DailyVendorCount):
+            model.query.delete(synchronize_session=False)
+        RollupState.query.filter_by(name=ROLLUP).delete(synchronize_session=False)
+        db.session.commit()
+        return self.run(now)
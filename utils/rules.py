@@ -0,0 +1,147 @@
+from collections import namedtuple
+
+# Severity bruges til sortering/visning; scoren beregnes stadig i build_report
+HIGH = "high"
+MEDIUM = "medium"
+LOW = "low"
+INFO = "info"
+
+Rule = namedtuple("Rule", ["id", "patterns", "severity", "message"])
+
+
+# Finder alle keywords fra alle regler i ét lineært gennemløb af teksten
+# (Aho-Corasick). Mønstrene bygges til en trie med failure-links, som derefter
+# foldes ud til en fuld overgangstabel, så hvert tegn koster ét dict-opslag:
+# O(tekstlængde + antal hits) uanset hvor mange mønstre der er. Hver tilstand
+# kender de regler hvis mønstre ender der – også via failure-kæden, så et
+# mønster indeholdt i et længere ("privat" i "privatliv") også krediteres.
+# Forventer lowercased tekst.
+class KeywordMatcher:
+    def __init__(self, rules):
+        self.rule_ids = {}
+        for rule in rules:
+            for pattern in rule.patterns:
+                if pattern:
+                    self.rule_ids.setdefault(pattern.lower(), set()).add(rule.id)
+
+        # Trie: goto[tilstand][tegn] -> tilstand, rod = 0
+        goto = [{}]
+        hits = [set()]
+        for pattern, ids in self.rule_ids.items():
+            state = 0
+            for char in pattern:
+                if char not in goto[state]:
+                    goto.append({})
+                    hits.append(set())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            hits[state] |= ids
+
+        # Failure-links i bredden-først orden; overgange der mangler i trien
+        # kopieres fra failure-tilstanden, så find() aldrig skal følge links
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, child in goto[state].items():
+                queue.append(child)
+                target = fail[state]
+                while target and char not in goto[target]:
+                    target = fail[target]
+                fail[child] = goto[target][char] if state and char in goto[target] else 0
+                hits[child] |= hits[fail[child]]
+        for state in queue:
+            goto[state] = {**goto[fail[state]], **goto[state]}
+
+        self._goto = goto
+        self._hits = [frozenset(ids) for ids in hits]
+
+    def find(self, text):
+        return self.scan(text)[1]
+
+    def scan(self, text, state=0):
+        # Returnerer (sluttilstand, hits); tilstanden kan gives videre til næste bid
+        found = set()
+        if not text:
+            return state, found
+        goto = self._goto
+        rule_hits = self._hits
+        for char in text:
+            state = goto[state].get(char, 0)
+            if rule_hits[state]:
+                found |= rule_hits[state]
+        return state, found
+
+    def stream(self):
+        return MatchStream(self)
+
+
+# Matcher over tekst der kommer i bidder (fx markup fra en parser). Automatens
+# tilstand føres videre mellem bidderne, så et keyword over en bid-grænse
+# stadig findes.
+class MatchStream:
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.hits = set()
+        self._state = 0
+
+    def feed(self, chunk):
+        self._state, found = self.matcher.scan(chunk, self._state)
+        self.hits |= found
+        return self.hits
+
+
+class RuleRegistry:
+    def __init__(self):
+        self._rules = {}
+        self._matcher = None
+
+    def rule(self, id, patterns, severity=INFO, message=""):
+        if id in self._rules:
+            raise ValueError(f"Regel findes allerede: {id}")
+        self._rules[id] = Rule(id, tuple(patterns), severity, message)
+        self._matcher = None
+        return self._rules[id]
+
+    def __getitem__(self, id):
+        return self._rules[id]
+
+    def __iter__(self):
+        return iter(self._rules.values())
+
+    def compile(self):
+        self._matcher = KeywordMatcher(self._rules.values())
+        return self._matcher
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            self.compile()
+        return self._matcher
+
+    def find(self, text):
+        return self.matcher.find(text)
+
+
+rules = RuleRegistry()
+
+# --- Scanner: analyze_website ---
+rules.rule("cookie_banner", ["cookie", "accept", "afvis", "privacy", "samtykke"], HIGH,
+           "Tilføj synligt cookie-banner med valgmuligheder")
+rules.rule("banner_categories", ["nødvendige", "statistik", "marketing", "valg", "indstillinger"], MEDIUM,
+           "Cookie-banner mangler kategorier (nødvendige/statistik/marketing) og valg-muligheder")
+rules.rule("privacy_link", ["privat", "policy"], HIGH,
+           "Tilføj link til privatlivspolitik (fx i footer)")
+rules.rule("form_consent", ["samtykke", "gdpr", "privatliv"], MEDIUM,
+           "Formularer mangler samtykketekst i nærheden")
+
+# Selvhostede samtykkeplatforme genkendes på filnavnet i script-src (hostede
+# CMP'er findes via utils.trackers); message er platformens navn
+rules.rule("cmp_klaro", ["klaro.js"], INFO, "Klaro")
+CMP_RULES = ["cmp_klaro"]
+
+# --- Policy-tekst: utils.text_analysis ---
+rules.rule("policy_cookies", ["cookie"], MEDIUM, "Tilføj en sektion om cookies og cookie-banner.")
+rules.rule("policy_rights", ["rettigheder"], HIGH, "Beskriv brugernes rettigheder i henhold til GDPR.")
+rules.rule("policy_processors", ["databehandler"], MEDIUM, "Angiv eventuelle databehandlere og formål.")
+rules.rule("policy_retention", ["opbevaring"], MEDIUM, "Forklar hvor længe data opbevares og hvorfor.")
+POLICY_RULES = ["policy_cookies", "policy_rights", "policy_processors", "policy_retention"]
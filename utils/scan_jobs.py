@@ -0,0 +1,213 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from utils.findings import render_pages
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Lavest hentes først: interaktive scanninger før baggrundsjobs
+INTERACTIVE_PRIORITY = 0
+BACKGROUND_PRIORITY = 10
+
+
+# Lokal worker-pulje til scanninger. Køen ligger i ScanJob-tabellen, så jobs
+# overlever genstart uden en ekstern broker; workers kan køre i web-processen
+# (SCAN_WORKERS_AUTOSTART) eller som separat proces via `flask scan-worker`.
+class ScanWorkerPool:
+    def __init__(self, app=None):
+        self.app = None
+        self.workers = 2
+        self.poll_interval = 2
+        self.stale_after = 600
+        self.background_budget = 1
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config.get("SCAN_WORKERS", self.workers)
+        self.poll_interval = app.config.get("SCAN_JOB_POLL_INTERVAL", self.poll_interval)
+        self.stale_after = app.config.get("SCAN_JOB_STALE_AFTER", self.stale_after)
+        self.background_budget = app.config.get("MONITOR_BROWSER_BUDGET", self.background_budget)
+        app.extensions["scan_workers"] = self
+
+        if app.config.get("SCAN_WORKERS_AUTOSTART"):
+            self.start()
+
+    def enqueue(self, url, user_id=None, tier="browser", crawl=None, source=None, priority=INTERACTIVE_PRIORITY,
+                dedup_key=None):
+        # Med dedup_key oprettes jobbet kun hvis ingen anden (proces) allerede har
+        # lagt et job med samme nøgle i kø – så returneres None
+        from app.extensions import db
+        from app.models import ScanJob
+
+        job = ScanJob(url=url, user_id=user_id, tier=tier, status=QUEUED, source=source, priority=priority,
+                      options={"crawl": crawl} if crawl is not None else None, dedup_key=dedup_key)
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            if dedup_key is None:
+                raise
+            db.session.rollback()
+            return None
+        self._wake.set()
+        return job
+
+    def start(self):
+        if self._threads:
+            return
+        with self.app.app_context():
+            self.requeue_stale()
+
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"scan-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def requeue_stale(self):
+        from app.extensions import db
+        from app.models import ScanJob
+
+        # Jobs der stadig står som "running" efter stale_after er efterladt af en
+        # worker der er død – læg dem tilbage i køen
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        count = ScanJob.query.filter(
+            ScanJob.status == RUNNING, ScanJob.started_at < cutoff
+        ).update({"status": QUEUED, "started_at": None}, synchronize_session=False)
+        db.session.commit()
+        if count:
+            logger.info("Lagde %d hængende scan-jobs tilbage i køen", count)
+
+    def _claim(self):
+        from app.extensions import db
+        from app.models import ScanJob
+
+        # Baggrundsjobs (fx overvågning) må højst optage background_budget
+        # browsere på tværs af alle workers; resten er til interaktive scanninger.
+        # Budgettet tjekkes i selve UPDATE'en, så to workers ikke begge kan se
+        # en ledig plads og tage hver sit baggrundsjob. Tællingen ligger i en
+        # afledt tabel, fordi MySQL ikke tillader en subquery på den tabel der
+        # opdateres; InnoDB tager delte låse på de talte rækker, så samtidige
+        # claims serialiseres (taberen får en deadlock og prøver igen i _loop).
+        running_background = db.select(db.func.count()).select_from(
+            db.select(ScanJob.id).where(
+                ScanJob.status == RUNNING, ScanJob.priority > INTERACTIVE_PRIORITY
+            ).subquery()
+        ).scalar_subquery()
+        within_budget = db.or_(
+            ScanJob.priority == INTERACTIVE_PRIORITY, running_background < self.background_budget
+        )
+
+        interactive_only = False
+        while True:
+            query = ScanJob.query.filter_by(status=QUEUED)
+            if interactive_only:
+                query = query.filter(ScanJob.priority == INTERACTIVE_PRIORITY)
+            job = query.order_by(ScanJob.priority, ScanJob.created_at).first()
+            if not job:
+                db.session.commit()
+                return None
+            background = job.priority > INTERACTIVE_PRIORITY
+
+            # Betinget UPDATE så kun én worker (også på tværs af processer) får jobbet
+            claimed = ScanJob.query.filter(
+                ScanJob.id == job.id, ScanJob.status == QUEUED, within_budget
+            ).update({"status": RUNNING, "started_at": datetime.utcnow()}, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                return db.session.get(ScanJob, job.id)
+            if not background or interactive_only:
+                return None
+            # Budgettet er brugt – se om der står interaktive jobs i kø
+            interactive_only = True
+
+    def _run(self, job):
+        from app.extensions import db
+        from app.routes.analysis import conditional_scan, crawl_site, save_analysis, remember_scan
+        from utils.monitor import MONITOR
+
+        probe = None
+        try:
+            crawl = (job.options or {}).get("crawl")
+            if crawl is not None:
+                result = crawl_site(job.url, **crawl)
+            else:
+                result, probe = conditional_scan(job.url, tier=job.tier or "browser")
+            if "error" in result:
+                job.status = FAILED
+                job.error = result["error"]
+            else:
+                job.analysis = save_analysis(job.url, result, user_id=job.user_id, source=job.source)
+                job.status = DONE
+        except Exception as e:
+            logger.exception("Scan-job %s fejlede", job.id)
+            db.session.rollback()
+            job.status = FAILED
+            job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+        if job.status == DONE:
+            remember_scan(job.url, job.tier or "browser", result, probe, job.analysis)
+            if job.source == MONITOR:
+                self.app.extensions["site_monitor"].check_regression(job)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    job = self._claim()
+                except Exception:
+                    logger.exception("Kunne ikke hente scan-job fra køen")
+                    job = None
+                if job:
+                    self._run(job)
+                    continue
+
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+
+def serialize_job(job):
+    analysis = job.analysis
+    return {
+        "id": job.id,
+        "url": job.url,
+        "status": job.status,
+        "source": job.source,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "analysis": {
+            "id": analysis.id,
+            "url": analysis.url,
+            "score": analysis.score,
+            "missing": analysis.missing,
+            "suggestions": analysis.suggestions,
+            "page_count": analysis.page_count,
+            "pages": render_pages(analysis.pages),
+            "created_at": analysis.created_at.isoformat()
+        } if analysis else None
+    }
@@ -0,0 +1,126 @@
+from urllib.parse import urlparse
+from utils.dom_extract import extract_features
+from utils.rules import rules, CMP_RULES
+from utils.trackers import get_tracker_index, CONSENT
+from utils.findings import make, render_missing, render_suggestions, score as score_findings
+
+HTTP = "http"
+BROWSER = "browser"
+
+# Tjek der kun kræver markup, og tjek der kræver en kørende browser
+STATIC_CHECKS = ["scripts", "cookie_banner", "banner_categories", "frameworks", "privacy_link", "forms"]
+RUNTIME_CHECKS = ["cookies", "overlay"]
+
+# Sider med mindre synlig tekst end dette er sandsynligvis en JS-app-skal
+MIN_STATIC_TEXT = 200
+
+
+def extract_static(html, url):
+    features = extract_features(html)
+
+    index = get_tracker_index()
+    site_domain = index.registrable_domain(urlparse(url).hostname or "")
+
+    third_party = []
+    vendors = {}
+    found_frameworks = []
+    for src in features["script_sources"]:
+        hits = rules.find(src)
+        for rule_id in CMP_RULES:
+            if rule_id in hits and rules[rule_id].message not in found_frameworks:
+                found_frameworks.append(rules[rule_id].message)
+
+        info = index.classify(src, site_domain)
+        if info is None:
+            continue
+        if info["third_party"]:
+            third_party.append(src)
+        if info["vendor"] and info["vendor"] not in vendors:
+            vendors[info["vendor"]] = {"name": info["vendor"], "category": info["category"], "domain": info["domain"]}
+            if info["category"] == CONSENT and info["vendor"] not in found_frameworks:
+                found_frameworks.append(info["vendor"])
+
+    return {
+        **features,
+        "third_party": third_party,
+        "vendors": list(vendors.values()),
+        "found_frameworks": found_frameworks
+    }
+
+
+def extract_runtime(driver):
+    cookies = driver.get_cookies()
+    early_cookies = [c["name"] for c in cookies if "consent" not in c["name"].lower()]
+
+    overlay_found = False
+    try:
+        banners = driver.find_elements("xpath", "//*[contains(@style,'position:fixed') or contains(@class,'cookie')]")
+        for banner in banners:
+            size = banner.size
+            if size["height"] > 40 and size["width"] > 100:
+                overlay_found = True
+                break
+    except:
+        pass
+
+    return {
+        "early_cookies": early_cookies,
+        "overlay_found": overlay_found
+    }
+
+
+def looks_js_rendered(static):
+    # Næsten ingen tekst i markup men scripts til stede → indholdet bygges i browseren
+    return static["visible_text"] < MIN_STATIC_TEXT and static["script_count"] > 0
+
+
+def build_report(static, runtime, tiers):
+    # runtime["overlay_found"] er None når overlay-tjekket ikke er kørt (HTTP-tier)
+    early_cookies = runtime["early_cookies"]
+    overlay_found = runtime["overlay_found"]
+
+    findings = []
+
+    if not static["has_cookie_banner"]:
+        findings.append(make("cookie_banner"))
+    elif not static["banner_advanced_ok"]:
+        findings.append(make("banner_categories"))
+
+    if overlay_found is False:
+        findings.append(make("overlay"))
+
+    if not static["has_privacy"]:
+        findings.append(make("privacy_link"))
+
+    if early_cookies:
+        findings.append(make("early_cookies", cookies=early_cookies[:5]))
+
+    if not static["consent_near_form"] and static["form_count"]:
+        findings.append(make("form_consent"))
+
+    if not static["third_party"]:
+        findings.append(make("no_third_party"))
+
+    found_frameworks = static["found_frameworks"]
+    if found_frameworks:
+        findings.append(make("cmp_found", frameworks=found_frameworks))
+    else:
+        findings.append(make("cmp_missing"))
+
+    return {
+        "score": score_findings(findings),
+        "findings": findings,
+        "missing": render_missing(findings),
+        "suggestions": render_suggestions(findings),
+        "scripts": static["third_party"],
+        "vendors": static["vendors"],
+        "cookies": early_cookies,
+        "tiers": tiers
+    }
+
+
+def tier_map(static_tier, cookies_tier, overlay_tier):
+    tiers = {check: static_tier for check in STATIC_CHECKS}
+    tiers["cookies"] = cookies_tier
+    tiers["overlay"] = overlay_tier
+    return tiers
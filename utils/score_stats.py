@@ -0,0 +1,116 @@
+import logging
+
+from sqlalchemy import case, event, insert, update
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+# Vægt på nyeste score i det glidende gennemsnit (trend)
+TREND_ALPHA = 0.3
+
+
+# Holder UserScoreStats opdateret i samme transaktion som hver ny Analysis:
+# after_flush kører en atomisk UPDATE (count+1, sum+score, ...) på brugerens
+# række – eller opretter den – så læsning af gennemsnit og trend er ét opslag.
+def track_score_stats(session):
+    # create_app kan køre flere gange i samme proces (tests, CLI) – lytteren
+    # må kun registreres én gang, ellers tælles hver analyse flere gange
+    if not event.contains(session, "after_flush", _after_flush):
+        event.listen(session, "after_flush", _after_flush)
+
+
+def _after_flush(session, flush_context):
+    from app.models import Analysis
+
+    new = [obj for obj in session.new if isinstance(obj, Analysis)]
+    if not new:
+        return
+    connection = session.connection()
+    for analysis in sorted(new, key=lambda a: a.id):
+        if analysis.user_id is not None and analysis.score is not None:
+            apply_score(connection, analysis.user_id, analysis.score, analysis.created_at)
+
+
+def apply_score(connection, user_id, score, scanned_at):
+    from app.models import UserScoreStats
+
+    stats = UserScoreStats.__table__
+    # MySQL bruger allerede opdaterede kolonner i resten af SET – previous_score
+    # skal derfor sættes før last_score
+    statement = update(stats).where(stats.c.user_id == user_id).ordered_values(
+        (stats.c.analysis_count, stats.c.analysis_count + 1),
+        (stats.c.score_sum, stats.c.score_sum + score),
+        (stats.c.min_score, case((stats.c.min_score <= score, stats.c.min_score), else_=score)),
+        (stats.c.max_score, case((stats.c.max_score >= score, stats.c.max_score), else_=score)),
+        (stats.c.previous_score, stats.c.last_score),
+        (stats.c.last_score, score),
+        (stats.c.trend, case(
+            (stats.c.trend.is_(None), float(score)),
+            else_=stats.c.trend * (1 - TREND_ALPHA) + score * TREND_ALPHA
+        )),
+        (stats.c.last_scan_at, scanned_at),
+    )
+    if connection.execute(statement).rowcount:
+        return
+
+    # Første analyse for brugeren – savepoint, så en samtidig oprettelse ikke
+    # ruller brugerens transaktion tilbage
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(stats).values(
+                user_id=user_id,
+                analysis_count=1,
+                score_sum=score,
+                min_score=score,
+                max_score=score,
+                last_score=score,
+                previous_score=None,
+                trend=float(score),
+                last_scan_at=scanned_at
+            ))
+    except IntegrityError:
+        connection.execute(statement)
+
+
+def rebuild_score_stats(batch_size=1000):
+    # Genberegner alle brugeres statistik fra Analysis-tabellen (backfill,
+    # eller efter `flask rescore`). Analyserne streames i rækkefølge pr. bruger.
+    from app.extensions import db
+    from app.models import Analysis, UserScoreStats
+
+    rows = (
+        db.session.query(Analysis.user_id, Analysis.score, Analysis.created_at)
+        .filter(Analysis.user_id.isnot(None), Analysis.score.isnot(None))
+        .order_by(Analysis.user_id, Analysis.created_at, Analysis.id)
+        .yield_per(batch_size)
+    )
+
+    stats = {}
+    for user_id, score, created_at in rows:
+        entry = stats.get(user_id)
+        if entry is None:
+            stats[user_id] = {
+                "user_id": user_id,
+                "analysis_count": 1,
+                "score_sum": score,
+                "min_score": score,
+                "max_score": score,
+                "last_score": score,
+                "previous_score": None,
+                "trend": float(score),
+                "last_scan_at": created_at
+            }
+            continue
+        entry["analysis_count"] += 1
+        entry["score_sum"] += score
+        entry["min_score"] = min(entry["min_score"], score)
+        entry["max_score"] = max(entry["max_score"], score)
+        entry["previous_score"] = entry["last_score"]
+        entry["last_score"] = score
+        entry["trend"] = entry["trend"] * (1 - TREND_ALPHA) + score * TREND_ALPHA
+        entry["last_scan_at"] = created_at
+
+    UserScoreStats.query.delete(synchronize_session=False)
+    db.session.bulk_insert_mappings(UserScoreStats, list(stats.values()))
+    db.session.commit()
+    return len(stats)
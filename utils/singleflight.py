@@ -0,0 +1,170 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows – kun deduplikering i processen
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+# Felter der ikke deles via filerne – snapshottet indeholder sidens HTML
+PRIVATE_FIELDS = ("snapshot",)
+
+
+# Samler samtidige kald med samme nøgle til ét kald. I processen venter
+# efterfølgende tråde på den første tråds resultat; på tværs af workers
+# serialiseres kaldet med en fil-lås, og resultatet lægges i en JSON-fil ved
+# siden af låsen, så processer der ventede på låsen kan genbruge det.
+# Mappen ligger under app'ens instance-mappe og må kun tilhøre os (0700);
+# fejlresultater deles ikke, så ventende kald prøver selv igen.
+class SingleFlight:
+    def __init__(self, app=None):
+        self.lock_dir = None
+        self.wait_timeout = 120
+        self.result_ttl = 300
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.lock_dir = app.config.get("SCAN_LOCK_DIR") or os.path.join(app.instance_path, "scan-locks")
+        self.wait_timeout = app.config.get("SCAN_LOCK_TIMEOUT", self.wait_timeout)
+        app.extensions["singleflight"] = self
+
+    def do(self, key, fn):
+        # Returnerer (resultat, shared) – shared er True når resultatet kom fra
+        # et kald en anden tråd eller proces allerede havde i gang
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(self.wait_timeout) and call.result is not None and "error" not in call.result[0]:
+                return copy.deepcopy(call.result[0]), True
+            return fn(), False
+
+        try:
+            call.result = self._do_locked(key, fn)
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return copy.deepcopy(call.result[0]), call.result[1]
+
+    def _do_locked(self, key, fn):
+        if fcntl is None or self.lock_dir is None or not self._private_dir():
+            return fn(), False
+
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        lock_path = os.path.join(self.lock_dir, name + ".lock")
+        result_path = os.path.join(self.lock_dir, name + ".json")
+        started = time.time()
+
+        try:
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        except OSError:
+            logger.warning("Kunne ikke åbne scan-lås %s – kører uden deduplikering", lock_path, exc_info=True)
+            return fn(), False
+
+        with os.fdopen(fd, "r+") as lock_file:
+            if not self._acquire(lock_file):
+                logger.warning("Timeout på scan-lås for %s – kører uden deduplikering", key)
+                return fn(), False
+            try:
+                shared = self._read_result(result_path, started)
+                if shared is not None:
+                    return shared, True
+
+                result = fn()
+                if "error" not in result:
+                    self._write_result(result_path, result)
+                return result, False
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _acquire(self, lock_file):
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.1)
+
+    def _private_dir(self):
+        # Opretter lock_dir med 0700; en eksisterende mappe bruges kun hvis den
+        # er vores egen og ikke kan læses eller skrives af andre
+        try:
+            os.makedirs(self.lock_dir, mode=0o700, exist_ok=True)
+            info = os.lstat(self.lock_dir)
+            if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+                raise PermissionError(f"{self.lock_dir} er ikke en mappe ejet af denne bruger")
+            if info.st_mode & 0o077:
+                os.chmod(self.lock_dir, 0o700)
+            return True
+        except OSError:
+            logger.warning("Scan-lås-mappen %s kan ikke bruges – kører uden deduplikering", self.lock_dir,
+                           exc_info=True)
+            return False
+
+    def _read_result(self, path, since):
+        # Kun et resultat skrevet mens vi ventede på låsen hører til samme "flight"
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+        except OSError:
+            return None
+        try:
+            with os.fdopen(fd, encoding="utf-8") as f:
+                info = os.fstat(f.fileno())
+                if info.st_mtime < since or info.st_uid != os.getuid():
+                    return None
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return result if isinstance(result, dict) and "error" not in result else None
+
+    def _write_result(self, path, result):
+        shared = {k: v for k, v in result.items() if k not in PRIVATE_FIELDS}
+        try:
+            # mkstemp opretter filen med 0600 og et uforudsigeligt navn
+            fd, tmp_path = tempfile.mkstemp(dir=self.lock_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(shared, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError):
+            logger.warning("Kunne ikke dele scanresultat via %s", path, exc_info=True)
+        self._cleanup()
+
+    def _cleanup(self):
+        cutoff = time.time() - self.result_ttl
+        try:
+            for entry in os.scandir(self.lock_dir):
+                if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+        except OSError:
+            pass
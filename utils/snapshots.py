@@ -0,0 +1,132 @@
+import base64
+import hashlib
+import json
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+from utils.scanner import extract_static, build_report
+from utils.trackers import get_tracker_index
+
+# Version af snapshot-formatet – øges hvis felterne ændres
+SNAPSHOT_VERSION = 1
+
+
+# Rå input til en scanning: HTML, cookies sat før samtykke, overlay-tjekket,
+# script-srcs og (hvis optaget) netværksloggen. Gemmes zlib-komprimeret, så
+# scoren kan genberegnes med nye regler uden at hente siden igen.
+def take_snapshot(url, html, static, runtime, network, tiers):
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "url": url,
+        "html": html,
+        "cookies": runtime["early_cookies"],
+        "overlay_found": runtime["overlay_found"],
+        "scripts": static["script_sources"],
+        "network": network,
+        "tiers": tiers
+    }
+    # base64, så resultatet stadig kan ligge i scan-cachen og singleflight-filer som JSON
+    return base64.b64encode(compress(payload)).decode("ascii")
+
+
+def compress(payload):
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decompress(data):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def decode_snapshot(encoded):
+    return base64.b64decode(encoded)
+
+
+def snapshot_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def network_vendors(url, network):
+    # Tredjepartshosts fra netværksloggen klassificeres igen med den nuværende
+    # trackerliste – som add_browser_details ved selve scanningen
+    index = get_tracker_index()
+    site_domain = index.registrable_domain(urlparse(url).hostname or "")
+    vendors = []
+    for host in network.get("third_party_hosts", []):
+        info = index.classify(f"https://{host}/", site_domain)
+        if info and info["vendor"] and info["vendor"] not in vendors:
+            vendors.append(info["vendor"])
+    return vendors
+
+
+def rescore(item):
+    # Kører i en worker-proces: (snapshot_id, komprimeret snapshot) -> ny rapport
+    snapshot_id, data = item
+    snapshot = decompress(data)
+
+    static = extract_static(snapshot["html"], snapshot["url"])
+    runtime = {"early_cookies": snapshot["cookies"], "overlay_found": snapshot["overlay_found"]}
+    report = build_report(static, runtime, snapshot["tiers"])
+
+    vendors = [v["name"] for v in static["vendors"]]
+    if snapshot.get("network"):
+        vendors += [v for v in network_vendors(snapshot["url"], snapshot["network"]) if v not in vendors]
+    return snapshot_id, report["score"], report["findings"], vendors
+
+
+def rescore_all(workers=None, batch_size=500, since=None, dry_run=False, progress=None):
+    # Genberegner score, fund og leverandører for alle analyser med snapshot med
+    # de nuværende regler. Analyser hentes i batches på id; hvert unikt snapshot
+    # scores én gang i en procespulje, og rækkerne opdateres samlet pr. batch.
+    from app.extensions import db
+    from app.models import Analysis, AnalysisFinding, ScanSnapshot
+    from utils.findings import codes
+
+    query = db.session.query(Analysis.id, Analysis.score, Analysis.snapshot_id).filter(
+        Analysis.snapshot_id.isnot(None)
+    )
+    if since:
+        query = query.filter(Analysis.created_at >= since)
+
+    last_id = 0
+    totals = {"analyses": 0, "changed": 0}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = query.filter(Analysis.id > last_id).order_by(Analysis.id).limit(batch_size).all()
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            snapshot_ids = {row.snapshot_id for row in batch}
+            snapshots = db.session.query(ScanSnapshot.id, ScanSnapshot.data).filter(
+                ScanSnapshot.id.in_(snapshot_ids)
+            ).all()
+            reports = {
+                snapshot_id: (score, findings, vendors)
+                for snapshot_id, score, findings, vendors in pool.map(rescore, snapshots, chunksize=8)
+            }
+
+            now = datetime.utcnow()
+            rows = []
+            code_rows = []
+            for row in batch:
+                score, findings, vendors = reports[row.snapshot_id]
+                if score != row.score:
+                    totals["changed"] += 1
+                rows.append({"id": row.id, "score": score, "findings": findings, "vendors": vendors,
+                             "rescored_at": now})
+                code_rows += [{"analysis_id": row.id, "code": code} for code in codes(findings)]
+            totals["analyses"] += len(rows)
+
+            if not dry_run:
+                db.session.bulk_update_mappings(Analysis, rows)
+                AnalysisFinding.query.filter(
+                    AnalysisFinding.analysis_id.in_([row.id for row in batch])
+                ).delete(synchronize_session=False)
+                db.session.bulk_insert_mappings(AnalysisFinding, code_rows)
+                db.session.commit()
+            if progress:
+                progress(totals)
+
+    return totals
@@ -1,14 +1,9 @@
-def analyze_policy_text(text):
-    suggestions = []
+from utils.rules import rules, POLICY_RULES
+
 
-    if "cookie" not in text.lower():
-        suggestions.append("Tilføj en sektion om cookies og cookie-banner.")
-    if "rettigheder" not in text.lower():
-        suggestions.append("Beskriv brugernes rettigheder i henhold til GDPR.")
-    if "databehandler" not in text.lower():
-        suggestions.append("Angiv eventuelle databehandlere og formål.")
-    if "opbevaring" not in text.lower():
-        suggestions.append("Forklar hvor længe data opbevares og hvorfor.")
+def analyze_policy_text(text):
+    hits = rules.find(text.lower())
+    suggestions = [rules[rule_id].message for rule_id in POLICY_RULES if rule_id not in hits]
 
     if not suggestions:
         suggestions.append("Alt ser godt ud – men dobbelttjek altid med en jurist.")
@@ -0,0 +1,159 @@
+import ipaddress
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+TRACKERS_FILE = os.path.join(DATA_DIR, "trackers.json")
+SUFFIXES_FILE = os.path.join(DATA_DIR, "public_suffixes.txt")
+
+# Kategorier der regnes som samtykkeplatforme (CMP)
+CONSENT = "consent"
+
+# Ekstra lister (adskilt med os.pathsep) der lægges oven i trackers.json – fx
+# Disconnects services.json. Den medfølgende fil er en kurateret grundliste;
+# fulde lister har egne licenser og hentes derfor ikke ind i repoet
+EXTRA_LISTS_ENV = "TRACKER_LISTS"
+
+# Disconnect-kategori -> vores kategori (ukendte kategorier lowercases)
+DISCONNECT_CATEGORIES = {
+    "Advertising": "advertising",
+    "Analytics": "analytics",
+    "Social": "social",
+    "Content": "embed",
+    "Email": "marketing",
+    "EmailAggressive": "marketing",
+    "Fingerprinting": "fingerprinting",
+    "FingerprintingGeneral": "fingerprinting",
+    "FingerprintingInvasive": "fingerprinting",
+    "Cryptomining": "cryptomining",
+    "Anti-fraud": "security",
+    "ConsentManagers": CONSENT,
+}
+
+
+# Signaturdatabase over tracker-, analytics- og CMP-domæner. Domænerne ligger i
+# et hash-indeks, så et host slås op ved at prøve dets suffikser fra længste til
+# korteste – O(antal labels) uanset databasens størrelse. Samme teknik bruges
+# til public suffix-listen, så tredjepartsstatus afgøres på eTLD+1.
+class TrackerIndex:
+    def __init__(self, vendors, domains, suffixes, wildcard_suffixes):
+        self.vendors = vendors                  # [(navn, kategori)]
+        self.domains = domains                  # domæne -> index i vendors
+        self.suffixes = suffixes                # {"co.uk", ...}
+        self.wildcard_suffixes = wildcard_suffixes  # "*.x" gemt som "x"
+
+    @classmethod
+    def from_files(cls, trackers_path=TRACKERS_FILE, suffixes_path=SUFFIXES_FILE, extra_paths=()):
+        # Ved dubletter vinder den første liste, så trackers.json kan rette
+        # kategorier fra de eksterne lister
+        vendors = []
+        domains = {}
+        for path in (trackers_path, *extra_paths):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            for name, category, vendor_domains in vendor_entries(data):
+                vendors.append((name, category))
+                for domain in vendor_domains:
+                    domains.setdefault(domain.lower().strip("."), len(vendors) - 1)
+
+        suffixes = set()
+        wildcard_suffixes = set()
+        with open(suffixes_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip().lower()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("*."):
+                    wildcard_suffixes.add(line[2:])
+                else:
+                    suffixes.add(line)
+
+        return cls(vendors, domains, suffixes, wildcard_suffixes)
+
+    def registrable_domain(self, host):
+        host = (host or "").lower().strip(".")
+        if not host or _is_ip(host):
+            return host
+
+        labels = host.split(".")
+        suffix_start = len(labels) - 1
+        for i in range(len(labels) - 1):
+            if ".".join(labels[i:]) in self.suffixes or ".".join(labels[i + 1:]) in self.wildcard_suffixes:
+                suffix_start = i
+                break
+
+        if suffix_start == 0:
+            return host
+        return ".".join(labels[suffix_start - 1:])
+
+    def lookup(self, host):
+        labels = (host or "").lower().strip(".").split(".")
+        for i in range(len(labels) - 1):
+            domain = ".".join(labels[i:])
+            vendor_id = self.domains.get(domain)
+            if vendor_id is not None:
+                name, category = self.vendors[vendor_id]
+                return {"vendor": name, "category": category, "domain": domain}
+        return None
+
+    def classify(self, url, site_domain=""):
+        # Relative URL'er (uden host) er førstepart og returnerer None
+        host = urlsplit(url).hostname
+        if not host:
+            return None
+
+        domain = self.registrable_domain(host)
+        match = self.lookup(host) or {}
+        return {
+            "host": host,
+            "domain": domain,
+            "third_party": domain != site_domain,
+            "vendor": match.get("vendor"),
+            "category": match.get("category")
+        }
+
+
+def vendor_entries(data):
+    # (navn, kategori, domæner) fra vores format eller Disconnects services.json
+    if "vendors" in data:
+        for vendor in data["vendors"]:
+            yield vendor["name"], vendor["category"], vendor["domains"]
+        return
+
+    for category, entries in data.get("categories", {}).items():
+        category = DISCONNECT_CATEGORIES.get(category, category.lower())
+        for entry in entries:
+            for name, properties in entry.items():
+                vendor_domains = [
+                    domain for value in properties.values() if isinstance(value, list) for domain in value
+                ]
+                yield name, category, vendor_domains
+
+
+def extra_lists():
+    return [path for path in os.getenv(EXTRA_LISTS_ENV, "").split(os.pathsep) if path]
+
+
+def _is_ip(host):
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_tracker_index():
+    # Bygges én gang pr. proces ved første opslag (få millisekunder), så
+    # opstart ikke betaler for det
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TrackerIndex.from_files(extra_paths=extra_lists())
+    return _index